@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from stand_in import ARTICLE_PATH, StandInSite, article_slug
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common import metrics
+
+
+RESULT_MARKER = "BENCH_RESULT "
+# lab2 и lab3 - скраперы целиком (нужен Chrome), lab2-http - только aiohttp-скачивание PDF
+SCRAPERS = ("lab3", "lab2", "lab2-http")
+QUERY = "машинное обучение"
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса и самого большого завершенного дочернего (Chrome) в МБ"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: модуля resource нет
+        return None, None
+    # ru_maxrss: килобайты в Linux, байты в macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def stage_totals():
+    """Суммарное время по этапам из common.metrics"""
+    stages = {}
+    for histogram in metrics.METRICS.snapshot()['histograms']:
+        if histogram['name'] != "stage_seconds":
+            continue
+        labels = dict(histogram['labels'])
+        name = labels.pop('stage')
+        if labels:
+            name += "[" + ",".join(f"{key}={value}" for key, value in sorted(labels.items())) + "]"
+        stages[name] = {'count': histogram['count'], 'seconds': round(histogram['sum'], 4)}
+    return stages
+
+
+def bench_limiter():
+    """Ограничитель без ограничений для прогона против локального стенда.
+
+    С общим RATE_LIMITER (2 запр./с, 2 одновременно) все уровни
+    параллельности упирались бы в него и замер не показывал бы разницы.
+    Нижние границы равны верхним, чтобы AIMD не сбавлял скорость.
+    """
+    from common.rate_limit import RateLimiter
+    return RateLimiter(rate=10000.0, burst=10000, min_rate=10000.0, max_rate=10000.0,
+                       concurrency=1024, min_concurrency=1024, max_concurrency=1024,
+                       latency_target=float("inf"))
+
+
+def run_case(case):
+    """Один прогон в отдельном процессе (чтобы пиковый RSS не копился между прогонами)"""
+    os.chdir(case['workdir'])
+    scraper = case['scraper']
+    count = case['count']
+    concurrency = case['concurrency']
+
+    from common.http_cache import HTTPCache
+    cache = HTTPCache(os.path.join(case['workdir'], "cache"))
+    limiter = bench_limiter()
+    started = time.perf_counter()
+
+    if scraper == "lab3":
+        sys.path.insert(0, os.path.join(ROOT_DIR, "lab3"))
+        from parser import CyberLeninkaParser
+        client = CyberLeninkaParser("articles", workers=concurrency, cache=cache, rate_limiter=limiter)
+        client.base_url = case['base_url']
+        ready = time.perf_counter()
+        try:
+            succeeded = len(client.search_articles(QUERY, count))
+        finally:
+            client.close()
+    elif scraper == "lab2":
+        sys.path.insert(0, os.path.join(ROOT_DIR, "lab2"))
+        from cyberleninka_pdf import CyberLeninkaPDFScraper
+        client = CyberLeninkaPDFScraper(max_concurrent_per_host=concurrency, workers=concurrency, cache=cache,
+                                        rate_limiter=limiter)
+        client.base_url = case['base_url']
+        ready = time.perf_counter()
+        try:
+            results = client.search_and_download_articles(QUERY, count)
+            succeeded = sum(1 for result in results if result['success'])
+        finally:
+            client.close()
+    else:
+        sys.path.insert(0, os.path.join(ROOT_DIR, "lab2"))
+        from async_downloader import AsyncPDFDownloader
+        downloader = AsyncPDFDownloader("downloaded_articles_pdf", base_url=case['base_url'],
+                                        max_concurrent_per_host=concurrency, cache=cache,
+                                        rate_limiter=limiter)
+        urls = [f"{case['base_url']}{ARTICLE_PATH}{article_slug(number)}" for number in range(1, count + 1)]
+        ready = time.perf_counter()
+        succeeded = sum(1 for result in downloader.run(urls) if result['success'])
+
+    finished = time.perf_counter()
+    cache.close()
+    own_rss, browser_rss = peak_rss_mb()
+    elapsed = finished - ready
+    return {
+        'scraper': scraper,
+        'count': count,
+        'concurrency': concurrency,
+        'succeeded': succeeded,
+        'startup_s': round(ready - started, 3),
+        'elapsed_s': round(elapsed, 3),
+        'latency_per_article_s': round(elapsed / count, 4) if count else None,
+        'articles_per_min': round(succeeded * 60 / elapsed, 1) if elapsed > 0 else None,
+        'peak_rss_mb': round(own_rss, 1) if own_rss is not None else None,
+        'browser_peak_rss_mb': round(browser_rss, 1) if browser_rss is not None else None,
+        'stages': stage_totals()
+    }
+
+
+def spawn_case(case, timeout, verbose):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+        capture_output=True, text=True, encoding="utf-8", errors="replace", timeout=timeout
+    )
+    if verbose:
+        sys.stdout.write(completed.stdout)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"прогон {case['scraper']} x{case['count']} завершился без результата:\n"
+                       + (completed.stderr or completed.stdout)[-2000:])
+
+
+def summarize(runs):
+    """Медианы повторов одной конфигурации"""
+    summary = dict(runs[0], repeats=len(runs))
+    summary.pop('stages')
+    for key in ('startup_s', 'elapsed_s', 'latency_per_article_s', 'articles_per_min',
+                'peak_rss_mb', 'browser_peak_rss_mb'):
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = round(statistics.median(values), 4) if values else None
+    summary['succeeded'] = min(run['succeeded'] for run in runs)
+    summary['runs'] = runs
+    return summary
+
+
+def format_table(summaries):
+    header = (f"{'скрапер':<10} {'статей':>6} {'парал.':>6} {'успех':>6} {'старт, с':>9} "
+              f"{'время, с':>9} {'с/статья':>9} {'статей/мин':>11} {'RSS, МБ':>8} {'Chrome, МБ':>11}")
+    lines = [header, "-" * len(header)]
+
+    def cell(value, width, digits=2):
+        return f"{'н/д':>{width}}" if value is None else f"{value:>{width}.{digits}f}"
+
+    for summary in summaries:
+        lines.append(
+            f"{summary['scraper']:<10} {summary['count']:>6} {summary['concurrency']:>6} "
+            f"{summary['succeeded']:>6} {cell(summary['startup_s'], 9)} {cell(summary['elapsed_s'], 9)} "
+            f"{cell(summary['latency_per_article_s'], 9, 3)} {cell(summary['articles_per_min'], 11, 1)} "
+            f"{cell(summary['peak_rss_mb'], 8, 1)} {cell(summary['browser_peak_rss_mb'], 11, 1)}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Офлайн-бенчмарк скраперов на локальном стенде CyberLeninka")
+    arg_parser.add_argument("--case", help=argparse.SUPPRESS)
+    arg_parser.add_argument("--scrapers", nargs="+", choices=SCRAPERS, default=["lab3", "lab2"])
+    arg_parser.add_argument("--counts", nargs="+", type=int, default=[10, 50], help="числа статей")
+    arg_parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4],
+                            help="параллельность: потоки пула (lab3), соединения на хост (lab2)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="повторов каждой конфигурации")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="задержка ответа стенда, с")
+    arg_parser.add_argument("--pdf-kb", type=int, default=256, help="размер PDF на стенде, КБ")
+    arg_parser.add_argument("--fixtures", default=None, help="папка с записанными страницами для стенда")
+    arg_parser.add_argument("--timeout", type=float, default=600, help="предел одного прогона, с")
+    arg_parser.add_argument("--output", default=None, help="JSON с результатами всех прогонов")
+    arg_parser.add_argument("--keep", action="store_true", help="не удалять рабочие папки прогонов")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="показывать вывод скраперов")
+    args = arg_parser.parse_args(argv)
+
+    if args.case:
+        print(RESULT_MARKER + json.dumps(run_case(json.loads(args.case)), ensure_ascii=False))
+        return 0
+
+    site = StandInSite(articles=max(args.counts), pdf_kb=args.pdf_kb, latency=args.latency,
+                       fixtures=args.fixtures).start()
+    print(f"🌐 Стенд: {site.base_url}, статей: {site.articles}, задержка {args.latency} с")
+
+    summaries = []
+    try:
+        for scraper in args.scrapers:
+            for count in args.counts:
+                for concurrency in args.concurrency:
+                    runs = []
+                    for attempt in range(1, args.repeat + 1):
+                        workdir = tempfile.mkdtemp(prefix=f"bench_{scraper}_")
+                        case = {'scraper': scraper, 'count': count, 'concurrency': concurrency,
+                                'base_url': site.base_url, 'workdir': workdir}
+                        print(f"⏱️ {scraper}: {count} статей, параллельность {concurrency}, "
+                              f"прогон {attempt}/{args.repeat}...")
+                        try:
+                            runs.append(spawn_case(case, args.timeout, args.verbose))
+                        except (RuntimeError, subprocess.TimeoutExpired) as e:
+                            print(f"❌ {e}")
+                        finally:
+                            if not args.keep:
+                                shutil.rmtree(workdir, ignore_errors=True)
+                    if runs:
+                        summaries.append(summarize(runs))
+    finally:
+        site.stop()
+
+    if not summaries:
+        print("❌ Ни один прогон не завершился")
+        return 1
+
+    print()
+    print(format_table(summaries))
+    if args.output:
+        report = {
+            'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'settings': {'latency': args.latency, 'pdf_kb': args.pdf_kb, 'repeat': args.repeat,
+                         'fixtures': args.fixtures},
+            'results': summaries
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Результаты сохранены: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# Слова для детерминированных текстов статей
+WORDS = (
+    "исследование анализ метод модель данные система обучение сеть результат задача "
+    "алгоритм оценка процесс развитие управление структура качество эксперимент выборка "
+    "признак точность классификация регрессия оптимизация параметр функция значение "
+    "показатель технология информация знание подход теория практика влияние уровень"
+).split()
+
+ARTICLE_PATH = "/article/n/"
+
+
+def article_slug(number):
+    return f"bench-article-{number:05d}"
+
+
+class StandInSite:
+    """Локальная замена cyberleninka.ru для бенчмарков.
+
+    Отдает страницы поиска (/search?q=...&page=N), страницы статей
+    (/article/n/<slug>) и PDF (/article/n/<slug>/pdf) с теми же адресами
+    и разметкой, что ищут скраперы. Содержимое генерируется
+    детерминированно по номеру статьи, поэтому прогоны воспроизводимы.
+    Если задана папка fixtures, записанные ответы берутся из нее:
+    search_<N>.html, <slug>.html и <slug>.pdf.
+    """
+
+    def __init__(self, articles=200, per_page=20, paragraphs=40, pdf_kb=256,
+                 latency=0.0, fixtures=None, host="127.0.0.1", port=0):
+        self.articles = articles
+        self.per_page = per_page
+        self.paragraphs = paragraphs
+        self.pdf_kb = pdf_kb
+        self.latency = latency
+        self.fixtures = fixtures
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site._serve(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _serve(self, request):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlparse(request.path)
+        response = None
+        if url.path == "/search":
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            response = self._fixture(f"search_{page}.html") or (self.search_page(page), "text/html; charset=utf-8")
+        elif url.path.startswith(ARTICLE_PATH):
+            slug, _, tail = url.path[len(ARTICLE_PATH):].partition("/")
+            number = self._article_number(slug)
+            if number is not None and tail == "pdf":
+                response = self._fixture(f"{slug}.pdf") or (self.pdf(number), "application/pdf")
+            elif number is not None and not tail:
+                response = self._fixture(f"{slug}.html") or (self.article_page(number), "text/html; charset=utf-8")
+
+        if response is None:
+            self._send(request, 404, b"not found", "text/plain")
+        else:
+            self._send(request, 200, *response)
+
+    def _send(self, request, status, body, content_type):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("ETag", '"' + hashlib.md5(body).hexdigest() + '"')
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _fixture(self, name):
+        if not self.fixtures:
+            return None
+        path = os.path.join(self.fixtures, name)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            body = f.read()
+        return body, "application/pdf" if name.endswith(".pdf") else "text/html; charset=utf-8"
+
+    def _article_number(self, slug):
+        prefix = article_slug(0)[:-5]
+        if not slug.startswith(prefix) or not slug[len(prefix):].isdigit():
+            return None
+        number = int(slug[len(prefix):])
+        return number if 1 <= number <= self.articles else None
+
+    def search_page(self, page):
+        first = (page - 1) * self.per_page + 1
+        numbers = range(first, min(first + self.per_page, self.articles + 1))
+        items = "\n".join(
+            f'<div class="search-result"><h2><a href="{ARTICLE_PATH}{article_slug(number)}">'
+            f'{escape(self.title(number))}</a></h2></div>'
+            for number in numbers
+        )
+        return (f"<html><head><title>Поиск - КиберЛенинка</title></head>"
+                f"<body><main>{items}</main></body></html>")
+
+    def title(self, number):
+        words = random.Random(number).sample(WORDS, 5)
+        return f"Статья {number}: " + " ".join(words)
+
+    def article_text(self, number):
+        rng = random.Random(number * 7919)
+        paragraphs = []
+        for _ in range(self.paragraphs):
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+                sentences.append(" ".join(words).capitalize() + ".")
+            paragraphs.append(" ".join(sentences))
+        return paragraphs
+
+    def article_page(self, number):
+        slug = article_slug(number)
+        paragraphs = "\n".join(f"<p>{escape(text)}</p>" for text in self.article_text(number))
+        annotation = escape(self.article_text(number)[0])
+        return (
+            f"<html><head><title>{escape(self.title(number))} - КиберЛенинка</title></head><body>"
+            f"<h1>{escape(self.title(number))}</h1>"
+            f'<div class="abstract"><p>{annotation}</p></div>'
+            f'<a class="download" href="{ARTICLE_PATH}{slug}/pdf">Скачать PDF</a>'
+            f'<div class="fulltext">{paragraphs}</div>'
+            f"</body></html>"
+        )
+
+    def pdf(self, number):
+        # Достаточно для проверки %PDF/%%EOF в download_manager.is_valid_pdf
+        filler = random.Random(number).randbytes(self.pdf_kb * 1024)
+        return b"%PDF-1.4\n% stand-in\n" + filler + b"\n%%EOF\n"
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Локальная замена cyberleninka.ru для бенчмарков")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--articles", type=int, default=200, help="число статей в выдаче")
+    arg_parser.add_argument("--per-page", type=int, default=20, help="статей на странице поиска")
+    arg_parser.add_argument("--pdf-kb", type=int, default=256, help="размер PDF в КБ")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа в секундах")
+    arg_parser.add_argument("--fixtures", default=None, help="папка с записанными страницами")
+    args = arg_parser.parse_args(argv)
+
+    site = StandInSite(args.articles, args.per_page, pdf_kb=args.pdf_kb, latency=args.latency,
+                       fixtures=args.fixtures, port=args.port).start()
+    print(f"🌐 Стенд запущен: {site.base_url}/search?q=тест (Ctrl+C - остановить)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
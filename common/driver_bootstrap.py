@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "cyberleninka", "chromedriver.json")
+
+_lock = threading.Lock()
+_resolved_path = None
+
+# Статистика запусков Chrome за время работы процесса
+startup_stats = []
+
+# Облегченный профиль: скраперам нужны только HTML и ссылки на PDF
+LEAN_BLOCKED_URLS = [
+    # Картинки, шрифты, стили
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+    # Счетчики и реклама
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*mc.yandex.ru*", "*an.yandex.ru*", "*yastatic.net/metrika*",
+    "*adfox.ru*", "*top-fwz1.mail.ru*", "*vk.com/rtrg*", "*connect.facebook.net*"
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.media_stream": 2
+}
+LEAN_WINDOW_SIZE = "1280,800"
+
+
+def _load_cached_path():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            path = json.load(f).get("path")
+    except (OSError, ValueError):
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def _save_cached_path(path):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "resolved_at": time.time()}, f)
+    except OSError as e:
+        print(f"⚠️ Не удалось сохранить путь к chromedriver: {e}")
+
+
+def resolve_driver_path(refresh=False):
+    """Путь к chromedriver: из памяти, из кэша на диске или через ChromeDriverManager.
+
+    Возвращает (путь, источник).
+    """
+    global _resolved_path
+    with _lock:
+        if _resolved_path and not refresh:
+            return _resolved_path, "memory"
+
+        path = None if refresh else _load_cached_path()
+        source = "disk"
+        if path is None:
+            path = ChromeDriverManager().install()
+            source = "manager"
+            _save_cached_path(path)
+
+        _resolved_path = path
+        return path, source
+
+
+def apply_lean_profile(chrome_options):
+    """Облегченный профиль: без картинок, меньше окно, ответ driver.get по DOMContentLoaded.
+
+    Шрифты, стили и счетчики блокируются после запуска через
+    launch_chrome(..., blocked_urls=LEAN_BLOCKED_URLS). Готовность
+    страниц по-прежнему проверяет PageWaiter.
+    """
+    prefs = dict(chrome_options.experimental_options.get("prefs", {}))
+    prefs.update(LEAN_PREFS)
+    chrome_options.add_experimental_option("prefs", prefs)
+
+    chrome_options.arguments[:] = [
+        argument for argument in chrome_options.arguments if not argument.startswith("--window-size=")
+    ]
+    chrome_options.add_argument(f"--window-size={LEAN_WINDOW_SIZE}")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--disable-features=Translate,OptimizationHints,MediaRouter")
+    chrome_options.page_load_strategy = "eager"
+    return chrome_options
+
+
+def block_urls(driver, patterns):
+    """Блокировка запросов по шаблонам через CDP (Network.setBlockedURLs)"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        print(f"⚠️ Не удалось включить блокировку запросов: {e}")
+
+
+def launch_chrome(chrome_options, blocked_urls=None):
+    """Запуск Chrome с закэшированным драйвером и замером времени старта.
+
+    blocked_urls - шаблоны URL, которые браузер не будет загружать.
+    """
+    start = time.perf_counter()
+    path, source = resolve_driver_path()
+    resolved = time.perf_counter()
+
+    try:
+        driver = webdriver.Chrome(service=Service(path), options=chrome_options)
+    except SessionNotCreatedException:
+        if source == "manager":
+            raise
+        # Chrome обновился и закэшированный драйвер устарел - определяем заново
+        print("🔄 Закэшированный chromedriver не подошел, определяем заново...")
+        path, source = resolve_driver_path(refresh=True)
+        resolved = time.perf_counter()
+        driver = webdriver.Chrome(service=Service(path), options=chrome_options)
+
+    if blocked_urls:
+        block_urls(driver, blocked_urls)
+
+    finished = time.perf_counter()
+    stats = {
+        # Холодный старт - с определением версии драйвера через менеджер
+        'kind': "cold" if source == "manager" else "warm",
+        'driver_source': source,
+        'resolve_time': resolved - start,
+        'launch_time': finished - resolved,
+        'total_time': finished - start
+    }
+    with _lock:
+        startup_stats.append(stats)
+
+    kind = "Холодный" if stats['kind'] == "cold" else "Теплый"
+    print(f"🚀 {kind} старт Chrome за {stats['total_time']:.2f} с "
+          f"(драйвер: {source}, {stats['resolve_time']:.3f} с)")
+    return driver
+
+
+def startup_report():
+    """Сводка по холодным и теплым запускам Chrome"""
+    with _lock:
+        stats = list(startup_stats)
+
+    if not stats:
+        return "🚀 Chrome еще не запускался"
+
+    lines = ["🚀 Запуски Chrome:"]
+    for kind, label in (("cold", "холодный"), ("warm", "теплый")):
+        times = [s['total_time'] for s in stats if s['kind'] == kind]
+        if times:
+            lines.append(f"   {label}: {len(times)} шт., сред. {sum(times) / len(times):.2f} с")
+    return "\n".join(lines)
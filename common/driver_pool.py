@@ -0,0 +1,133 @@
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+# Конец входных данных imap_unordered (None может быть обычным элементом)
+_END = object()
+
+
+class DriverPool:
+    """Пул прогретых Chrome-драйверов для параллельной обработки статей.
+
+    factory(worker_id) создает новый драйвер для слота worker_id.
+    После каждого использования драйвер проверяется и при падении,
+    лишних вкладках или разросшейся памяти пересоздается.
+    """
+
+    def __init__(self, factory, size=2, max_uses=100, max_heap_mb=512, log=print):
+        self.factory = factory
+        self.log = log
+        self.size = size
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.recycled = 0
+        self._workers = [{'id': i, 'driver': None, 'uses': 0} for i in range(size)]
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def warm(self):
+        """Запуск всех драйверов заранее (параллельно)"""
+        def start(worker):
+            if worker['driver'] is None:
+                self._start(worker)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            list(executor.map(start, self._workers))
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """Взять свободный драйвер из пула на время блока with"""
+        worker = self._idle.get(timeout=timeout)
+        try:
+            if worker['driver'] is None:
+                self._start(worker)
+            yield worker['driver']
+        finally:
+            worker['uses'] += 1
+            if worker['driver'] is not None and not self._is_healthy(worker):
+                self._recycle(worker)
+            self._idle.put(worker)
+
+    def map(self, func, items):
+        """Параллельно вызывает func(driver, item) для каждого элемента, сохраняя порядок"""
+        def call(item):
+            with self.acquire() as driver:
+                return func(driver, item)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(call, items))
+
+    def imap_unordered(self, func, items):
+        """Как map, но отдает результаты по мере готовности.
+
+        В работе одновременно не больше size элементов, поэтому в памяти
+        не копятся результаты, которые потребитель еще не забрал.
+        При досрочной остановке генератора незапущенные задачи отменяются.
+        """
+        def call(item):
+            with self.acquire() as driver:
+                return func(driver, item)
+
+        items = iter(items)
+        executor = ThreadPoolExecutor(max_workers=self.size)
+        pending = set()
+        try:
+            for item in items:
+                pending.add(executor.submit(call, item))
+                if len(pending) >= self.size:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    next_item = next(items, _END)
+                    if next_item is not _END:
+                        pending.add(executor.submit(call, next_item))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _start(self, worker):
+        worker['driver'] = self.factory(worker['id'])
+        worker['uses'] = 0
+
+    def _is_healthy(self, worker):
+        """Проверка драйвера: отвечает, одна вкладка, не течет память"""
+        if worker['uses'] >= self.max_uses:
+            return False
+        try:
+            driver = worker['driver']
+            if len(driver.window_handles) > 1:
+                return False
+            heap = driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0"
+            ) or 0
+        except WebDriverException:
+            return False
+        return heap < self.max_heap_mb * 1024 * 1024
+
+    def _recycle(self, worker):
+        """Закрыть драйвер; новый будет создан при следующем запросе"""
+        self.log(f"♻️ Перезапуск драйвера #{worker['id']} после {worker['uses']} страниц")
+        self._quit(worker)
+        with self._lock:
+            self.recycled += 1
+
+    def _quit(self, worker):
+        try:
+            if worker['driver'] is not None:
+                worker['driver'].quit()
+        except Exception:
+            pass
+        worker['driver'] = None
+        worker['uses'] = 0
+
+    def close(self):
+        """Закрытие всех драйверов пула"""
+        for worker in self._workers:
+            self._quit(worker)
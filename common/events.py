@@ -0,0 +1,49 @@
+import queue
+import threading
+import time
+
+
+class EventChannel:
+    """Потокобезопасный канал событий от скачивания к интерфейсу.
+
+    Рабочие потоки вызывают emit()/log() и никогда не ждут: если
+    интерфейс не успевает, лишние строки лога отбрасываются (события
+    прогресса сохраняются). Интерфейс забирает события пачками через drain().
+    """
+
+    def __init__(self, max_log_events=5000):
+        self.max_log_events = max_log_events
+        self.dropped = 0
+        self._events = queue.SimpleQueue()
+        self._log_events = 0
+        self._lock = threading.Lock()
+
+    def emit(self, kind, **data):
+        data['kind'] = kind
+        data['time'] = time.time()
+        if kind == 'log':
+            with self._lock:
+                if self._log_events >= self.max_log_events:
+                    self.dropped += 1
+                    return
+                self._log_events += 1
+        self._events.put(data)
+
+    def log(self, message):
+        self.emit('log', message=message)
+
+    def drain(self, limit=500):
+        """До limit накопившихся событий (не блокируется)"""
+        events = []
+        while len(events) < limit:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            events.append(event)
+
+        logged = sum(1 for event in events if event['kind'] == 'log')
+        if logged:
+            with self._lock:
+                self._log_events -= logged
+        return events
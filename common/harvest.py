@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+
+
+class LinkProducer:
+    """Фоновый обход выдачи: ссылки на статьи складываются в ограниченную очередь.
+
+    Итерация по объекту отдает пары (номер, url) по мере их появления.
+    Пока очередь полна, обход страниц приостанавливается, поэтому
+    память не растет с числом статей.
+    """
+
+    _DONE = object()
+
+    def __init__(self, links, max_items, queue_size=100, skip=None, log=print):
+        self.links = links
+        self.log = log
+        self.max_items = max_items
+        self.skip = skip
+        self.produced = 0
+        self.skipped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for url in self.links:
+                if self._stop.is_set() or self.produced >= self.max_items:
+                    break
+                if self.skip and self.skip(url):
+                    self.skipped += 1
+                    continue
+                self.produced += 1
+                if not self._put((self.produced, url)):
+                    break
+        except Exception as e:
+            self.log(f"⚠️ Ошибка при обходе страниц поиска: {e}")
+        finally:
+            self._put(self._DONE)
+
+    def _put(self, item):
+        # Не блокируемся навсегда, если потребитель уже остановился
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            yield item
+
+    def stop(self):
+        self._stop.set()
+
+
+class ThroughputMeter:
+    """Счетчик обработанных статей со скоростью в статьях в минуту"""
+
+    def __init__(self, label="статей", report_every=25, log=print):
+        self.label = label
+        self.log = log
+        self.report_every = report_every
+        self.count = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, success=True, nbytes=0):
+        with self._lock:
+            if success:
+                self.count += 1
+                self.bytes += nbytes
+            else:
+                self.failed += 1
+            should_report = success and self.count % self.report_every == 0
+        if should_report:
+            self.log(self.report())
+
+    def rate_per_minute(self):
+        elapsed = time.perf_counter() - self.started
+        return self.count * 60 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return {
+            'processed': self.count,
+            'failed': self.failed,
+            'bytes': self.bytes,
+            'elapsed': time.perf_counter() - self.started,
+            'per_minute': self.rate_per_minute()
+        }
+
+    def report(self):
+        return (f"📈 Обработано {self.count} {self.label} (ошибок: {self.failed}), "
+                f"{self.rate_per_minute():.1f} в минуту")
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from cachetools import LRUCache
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cyberleninka", "http")
+# Файлы (PDF) и крупные тела в памяти не держим - только на диске
+FILE_KINDS = ("pdf",)
+
+
+class HTTPCache:
+    """Дисковый кэш страниц, извлеченного текста и PDF по URL.
+
+    Тела ответов хранятся по sha256 содержимого (одинаковые файлы - один блоб),
+    индекс - в SQLite. Записи старше ttl перепроверяются по ETag/Last-Modified,
+    при превышении max_bytes вытесняются давно не использованные.
+
+    Блоб может быть вытеснен другим потоком между lookup() и чтением:
+    тогда read() возвращает None, copy_to() - False, а запись удаляется
+    из индекса (промах кэша).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=24 * 3600, max_bytes=512 * 1024 * 1024,
+                 memory_items=64, memory_item_bytes=256 * 1024):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_item_bytes = memory_item_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._memory = LRUCache(maxsize=memory_items)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                blob TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.commit()
+
+    # --- Поиск и чтение ---
+
+    def lookup(self, url, kind="page"):
+        """Запись кэша для URL или None. Поле 'fresh' - не истек ли TTL"""
+        key = f"{kind}:{url}"
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob, size, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or not os.path.exists(self._blob_path(row[0])):
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        blob, size, etag, last_modified, stored_at = row
+        return {
+            'key': key,
+            'blob': blob,
+            'path': self._blob_path(blob),
+            'size': size,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': time.time() - stored_at < self.ttl
+        }
+
+    def read(self, entry):
+        """Содержимое записи (bytes) или None, если блоб уже вытеснен.
+
+        Горячие небольшие записи читаются из памяти.
+        """
+        with self._lock:
+            body = self._memory.get(entry['blob'])
+        if body is None:
+            try:
+                with open(entry['path'], "rb") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self._drop(entry)
+                return None
+            if self._memory_tier(entry):
+                with self._lock:
+                    self._memory[entry['blob']] = body
+        return body
+
+    def _memory_tier(self, entry):
+        kind = entry['key'].split(":", 1)[0]
+        return kind not in FILE_KINDS and entry['size'] <= self.memory_item_bytes
+
+    def copy_to(self, entry, filepath):
+        """Копирование закэшированного файла (например, PDF) по пути filepath.
+
+        False, если блоб уже вытеснен - файл нужно скачать заново.
+        """
+        try:
+            shutil.copyfile(entry['path'], filepath)
+        except FileNotFoundError:
+            self._drop(entry)
+            return False
+        return True
+
+    def _drop(self, entry):
+        """Запись, блоб которой пропал с диска, удаляется из индекса"""
+        with self._lock:
+            self.misses += 1
+            self._memory.pop(entry['blob'], None)
+            self._db.execute("DELETE FROM entries WHERE key = ? AND blob = ?", (entry['key'], entry['blob']))
+            self._db.commit()
+
+    def get_json(self, url, kind="text"):
+        """Свежие извлеченные данные (JSON) или None"""
+        entry = self.lookup(url, kind)
+        if entry is None or not entry['fresh']:
+            return None
+        body = self.read(entry)
+        if body is None:
+            return None
+        self.hits += 1
+        return json.loads(body.decode("utf-8"))
+
+    # --- Запись ---
+
+    def put(self, url, body, kind="page", headers=None):
+        """Сохранение тела ответа"""
+        blob = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(blob)
+        if not os.path.exists(path):
+            self._write_atomic(path, body)
+        self._store_entry(url, kind, blob, len(body), headers)
+
+    def put_file(self, url, filepath, kind="pdf", headers=None):
+        """Сохранение уже скачанного файла без чтения целиком в память"""
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        blob = digest.hexdigest()
+        path = self._blob_path(blob)
+        if not os.path.exists(path):
+            # Свой временный файл: потоки пула могут сохранять один и тот же блоб одновременно
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                shutil.copyfile(filepath, tmp_path)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        self._store_entry(url, kind, blob, os.path.getsize(filepath), headers)
+
+    def put_json(self, url, data, kind="text"):
+        self.put(url, json.dumps(data, ensure_ascii=False).encode("utf-8"), kind)
+
+    def mark_revalidated(self, entry, headers=None):
+        """Ответ 304: продлеваем срок жизни записи"""
+        self.revalidated += 1
+        self.hits += 1
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (time.time(), _header(headers, "ETag"), _header(headers, "Last-Modified"), entry['key'])
+            )
+            self._db.commit()
+
+    # --- HTTP ---
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Заголовки условного запроса для перепроверки устаревшей записи"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def fetch(self, session, url, kind="page", limiter=None, **kwargs):
+        """GET через requests.Session с кэшем. Возвращает bytes.
+
+        limiter (common.rate_limit.RateLimiter) ограничивает только
+        запросы к сайту - ответы из кэша отдаются без ожидания.
+        """
+        entry = self.lookup(url, kind)
+        if entry and entry['fresh']:
+            body = self.read(entry)
+            if body is not None:
+                self.hits += 1
+                return body
+            entry = None
+
+        request_headers = kwargs.pop('headers', None)
+        headers = dict(request_headers or {})
+        headers.update(self.conditional_headers(entry))
+        if limiter is None:
+            response = session.get(url, headers=headers, **kwargs)
+        else:
+            with limiter.request(url) as slot:
+                response = session.get(url, headers=headers, **kwargs)
+                slot.set_response(response)
+
+        if response.status_code == 304 and entry:
+            self.mark_revalidated(entry, response.headers)
+            body = self.read(entry)
+            if body is not None:
+                return body
+            # Блоб вытеснен во время запроса - запрашиваем заново без условий
+            return self.fetch(session, url, kind, limiter, headers=request_headers, **kwargs)
+
+        response.raise_for_status()
+        self.put(url, response.content, kind, response.headers)
+        return response.content
+
+    # --- Служебное ---
+
+    def _blob_path(self, blob):
+        return os.path.join(self.blob_dir, blob[:2], blob)
+
+    def _write_atomic(self, path, body):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _store_entry(self, url, kind, blob, size, headers):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, blob, size, etag, last_modified, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (f"{kind}:{url}", blob, size, _header(headers, "ETag"),
+                 _header(headers, "Last-Modified"), now, now)
+            )
+            self._db.commit()
+            self._evict()
+
+    def _total_bytes(self):
+        """Размер блобов на диске: один блоб может принадлежать нескольким записям"""
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY blob)"
+        ).fetchone()[0]
+
+    def _evict(self):
+        """Вытеснение давно не использованных записей сверх max_bytes"""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute("SELECT key, blob, size FROM entries ORDER BY accessed_at").fetchall()
+        for key, blob, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            # Блоб удаляем (и место освобождается), только если на него больше никто не ссылается
+            if not self._db.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob,)).fetchone():
+                total -= size
+                self._memory.pop(blob, None)
+                try:
+                    os.remove(self._blob_path(blob))
+                except OSError:
+                    pass
+        self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = self._total_bytes()
+        return {
+            'entries': count,
+            'bytes': total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _header(headers, name):
+    if not headers:
+        return None
+    return headers.get(name)
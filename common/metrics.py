@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Границы корзин гистограмм времени (секунды) и скорости скачивания (байт/с)
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATE_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+
+
+class Histogram:
+    """Распределение значений по корзинам (как histogram в Prometheus)"""
+
+    def __init__(self, buckets=TIME_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self):
+        # Корзины накопительные: число значений не больше границы
+        cumulative = []
+        total = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            total += bucket_count
+            cumulative.append([bound, total])
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'buckets': cumulative
+        }
+
+
+class Metrics:
+    """Счетчики и гистограммы этапов работы скраперов.
+
+    Метрика определяется именем и метками (stage="navigation" и т.п.).
+    Запись потокобезопасна; метрики процессов пула сюда не попадают -
+    их время возвращается из процесса и записывается в родителе.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def count(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Время блока в гистограмму stage_seconds{stage=...}; работает и как декоратор"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def observe_download(self, nbytes, elapsed, **labels):
+        """Скачанный файл: байты в счетчик, скорость в гистограмму"""
+        self.count("download_bytes_total", nbytes, **labels)
+        if elapsed > 0:
+            self.observe("download_bytes_per_second", nbytes / elapsed, RATE_BUCKETS, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._counters = {}
+            self._histograms = {}
+
+    def snapshot(self):
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                dict({'name': name, 'labels': dict(labels)}, **histogram.snapshot())
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {
+            'started': self.started,
+            'elapsed': time.time() - self.started,
+            'counters': counters,
+            'histograms': histograms
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, namespace="cyberleninka"):
+        """Текстовый формат экспозиции Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for counter in snapshot['counters']:
+            name = f"{namespace}_{counter['name']}"
+            declare(name, "counter")
+            lines.append(f"{name}{_labels(counter['labels'])} {_number(counter['value'])}")
+
+        for histogram in snapshot['histograms']:
+            name = f"{namespace}_{histogram['name']}"
+            declare(name, "histogram")
+            labels = histogram['labels']
+            for bound, total in histogram['buckets']:
+                lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {total}")
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {histogram['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(histogram['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """Текстовый отчет о запуске: время по этапам и счетчики"""
+        snapshot = self.snapshot()
+        if not snapshot['counters'] and not snapshot['histograms']:
+            return "📈 Метрик нет"
+
+        lines = [f"📈 Метрики запуска ({snapshot['elapsed']:.1f} с):"]
+        for histogram in snapshot['histograms']:
+            if histogram['name'] == "stage_seconds":
+                average = histogram['sum'] / histogram['count']
+                lines.append(
+                    f"   {_describe(histogram['labels'])}: {histogram['count']} раз, "
+                    f"всего {histogram['sum']:.2f} с, сред. {average * 1000:.1f} мс, "
+                    f"макс. {histogram['max'] * 1000:.1f} мс"
+                )
+            elif histogram['name'] == "download_bytes_per_second":
+                average = histogram['sum'] / histogram['count']
+                lines.append(
+                    f"   скорость скачивания{_suffix(histogram['labels'])}: {histogram['count']} файлов, "
+                    f"сред. {average / 1024:.0f} КБ/с, мин. {histogram['min'] / 1024:.0f} КБ/с"
+                )
+            else:
+                lines.append(f"   {histogram['name']}{_suffix(histogram['labels'])}: "
+                             f"{histogram['count']} значений, сумма {histogram['sum']:.2f}")
+        for counter in snapshot['counters']:
+            lines.append(f"   {counter['name']}{_suffix(counter['labels'])}: {_number(counter['value'])}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Запись метрик в файл: .prom/.txt - формат Prometheus, иначе JSON"""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in sorted(labels.items())
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _describe(labels):
+    labels = dict(labels)
+    stage = labels.pop('stage', '?')
+    return stage + _suffix(labels)
+
+
+def _suffix(labels):
+    return f" ({', '.join(f'{key}={value}' for key, value in sorted(labels.items()))})" if labels else ""
+
+
+# Общий реестр процесса: модули пишут в него через функции ниже
+METRICS = Metrics()
+count = METRICS.count
+observe = METRICS.observe
+observe_download = METRICS.observe_download
+timer = METRICS.timer
+
+
+def add_metrics_argument(arg_parser):
+    """Ключ --metrics ФАЙЛ для командной строки"""
+    arg_parser.add_argument("--metrics", metavar="ФАЙЛ", default=None,
+                            help="после запуска напечатать отчет по этапам и сохранить метрики "
+                                 "(.prom/.txt - формат Prometheus, иначе JSON)")
+
+
+def dump_metrics(path):
+    """Отчет о запуске в консоль и метрики в файл (если путь задан)"""
+    if not path:
+        return
+    print(METRICS.report())
+    METRICS.dump(path)
+    print(f"💾 Метрики сохранены: {path}")
@@ -0,0 +1,47 @@
+# Все атрибуты ссылок собираются одним execute_script вместо
+# отдельного запроса к WebDriver на каждый element.get_attribute()
+ELEMENT_ATTRIBUTES_JS = """
+const seen = new Set();
+const result = [];
+for (const selector of arguments[0]) {
+    let elements;
+    try {
+        elements = document.querySelectorAll(selector);
+    } catch (e) {
+        continue;
+    }
+    for (const element of elements) {
+        if (seen.has(element)) continue;
+        seen.add(element);
+        result.push({
+            href: element.href || element.getAttribute('href'),
+            onclick: element.getAttribute('onclick'),
+            data_url: element.getAttribute('data-url'),
+            data_href: element.getAttribute('data-href')
+        });
+    }
+}
+return result;
+"""
+
+
+def element_attributes(driver, selectors):
+    """Атрибуты (href, onclick, data_url, data_href) элементов по селекторам.
+
+    Элементы идут в порядке селекторов, каждый элемент - один раз.
+    """
+    return driver.execute_script(ELEMENT_ATTRIBUTES_JS, list(selectors)) or []
+
+
+def find_article_links(driver, selectors, max_results):
+    """Ссылки на статьи (/article/, без страниц поиска) без повторов"""
+    links = []
+    seen = set()
+    for attributes in element_attributes(driver, selectors):
+        href = attributes.get('href')
+        if href and "/article/" in href and "search" not in href and href not in seen:
+            seen.add(href)
+            links.append(href)
+            if len(links) >= max_results:
+                break
+    return links
@@ -0,0 +1,260 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from common import metrics
+
+
+# Сайт просит притормозить (с Retry-After) или перегружен
+THROTTLE_STATUSES = {429, 503}
+MAX_RETRY_AFTER = 120.0
+
+
+class HostLimiter:
+    """Ограничение запросов к одному хосту: token bucket + AIMD.
+
+    Запрос ждет свободного слота (не больше limit одновременно) и токена
+    (в среднем не чаще rate в секунду). Успешные (2xx/3xx) быстрые ответы
+    понемногу увеличивают limit и rate (аддитивно), прочие 4xx (403 -
+    блокировка, 404) их не меняют, а 429/503, 5xx, сетевые ошибки
+    и ответы медленнее latency_target уменьшают их вдвое - не чаще раза
+    в cooldown секунд, чтобы одна пачка ошибок не обнулила скорость.
+    """
+
+    def __init__(self, host, rate=2.0, burst=4, min_rate=0.2, max_rate=20.0, rate_increase=1.0,
+                 concurrency=2, min_concurrency=1, max_concurrency=8, latency_target=10.0,
+                 decrease=0.5, cooldown=2.0):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase = rate_increase
+        self.limit = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'slow': 0, 'waited': 0.0}
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _try_acquire(self, now):
+        """(True, 0) - слот и токен получены, иначе (False, сколько подождать)"""
+        if now < self._paused_until:
+            return False, self._paused_until - now
+        if self._in_flight >= int(self.limit):
+            # Освобождение слота будит ожидающих через notify_all
+            return False, 0.5
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False, max((1 - self._tokens) / self.rate, 0.01)
+        self._tokens -= 1
+        self._in_flight += 1
+        self.stats['requests'] += 1
+        return True, 0
+
+    def acquire(self):
+        start = time.perf_counter()
+        with self._cond:
+            while True:
+                acquired, wait = self._try_acquire(time.monotonic())
+                if acquired:
+                    break
+                self._cond.wait(wait)
+        self._record_wait(time.perf_counter() - start)
+
+    async def acquire_async(self):
+        """acquire для asyncio: ждет через asyncio.sleep, не блокируя цикл событий"""
+        start = time.perf_counter()
+        while True:
+            with self._cond:
+                acquired, wait = self._try_acquire(time.monotonic())
+            if acquired:
+                break
+            await asyncio.sleep(min(wait, 0.1))
+        self._record_wait(time.perf_counter() - start)
+
+    def _record_wait(self, waited):
+        with self._cond:
+            self.stats['waited'] += waited
+        if waited > 0.001:
+            metrics.observe("stage_seconds", waited, stage="throttle", host=self.host)
+
+    def release(self, latency, status=None, error=False, retry_after=None):
+        """Запрос завершен: освобождение слота и подстройка скорости"""
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if status in THROTTLE_STATUSES:
+                self.stats['throttled'] += 1
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + min(retry_after, MAX_RETRY_AFTER))
+                self._back_off(now, "throttled")
+            elif error or (status is not None and status >= 500):
+                self.stats['errors'] += 1
+                self._back_off(now, "error")
+            elif latency > self.latency_target:
+                self.stats['slow'] += 1
+                self._back_off(now, "slow")
+            elif status is not None and status >= 400:
+                # Отказ или отсутствующая страница - не повод ускоряться
+                pass
+            else:
+                # Аддитивный рост: примерно +1 слот за каждые limit успешных запросов
+                # (status None - навигация браузера без кода ответа - тоже успех)
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + self.rate_increase / max(self.rate, 1.0))
+            self._cond.notify_all()
+
+    def _back_off(self, now, reason):
+        metrics.count("rate_limit_backoff_total", host=self.host, reason=reason)
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * self.decrease)
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.stats, host=self.host, rate=self.rate, limit=int(self.limit))
+
+
+class RequestSlot:
+    """Итог запроса внутри RateLimiter.request(): статус ответа и Retry-After"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.responded = None
+        self.status = None
+        self.retry_after = None
+        self.error = False
+
+    def latency(self):
+        # Время до заголовков ответа: долгое скачивание большого PDF - не перегрузка
+        return (self.responded or time.perf_counter()) - self.started
+
+    def set_response(self, response):
+        """Статус и Retry-After из ответа requests или aiohttp"""
+        if response is None:
+            return
+        self.responded = self.responded or time.perf_counter()
+        self.status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+        self.retry_after = _retry_after(response.headers.get('Retry-After'))
+
+
+def _retry_after(value):
+    """Retry-After в секундах (число или HTTP-дата)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Ограничители по хостам; общий для Selenium, requests и aiohttp.
+
+    Использование:
+        with limiter.request(url) as slot:
+            response = session.get(url)
+            slot.set_response(response)
+
+    Исключение без ответа (таймаут, обрыв) считается ошибкой сети.
+    Вложенный request() к тому же хосту из того же потока выполняется
+    в слоте внешнего: иначе при limit=1 поток ждал бы сам себя.
+    """
+
+    def __init__(self, **host_settings):
+        self.host_settings = host_settings
+        self._hosts = {}
+        self._lock = threading.Lock()
+        # Хосты, слот которых уже занят текущим потоком
+        self._held = threading.local()
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc or url
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                limiter = self._hosts[host] = HostLimiter(host, **self.host_settings)
+            return limiter
+
+    @contextmanager
+    def request(self, url):
+        limiter = self.for_url(url)
+        held = self._held.__dict__.setdefault('hosts', set())
+        if limiter.host in held:
+            # Вложенный запрос: слот и подстройку скорости учитывает внешний
+            yield RequestSlot()
+            return
+        limiter.acquire()
+        held.add(limiter.host)
+        slot = RequestSlot()
+        try:
+            yield slot
+        except Exception as e:
+            self._fail(slot, e)
+            raise
+        finally:
+            held.discard(limiter.host)
+            limiter.release(slot.latency(), slot.status, slot.error, slot.retry_after)
+
+    @asynccontextmanager
+    async def async_request(self, url):
+        limiter = self.for_url(url)
+        await limiter.acquire_async()
+        slot = RequestSlot()
+        try:
+            yield slot
+        except Exception as e:
+            self._fail(slot, e)
+            raise
+        finally:
+            limiter.release(slot.latency(), slot.status, slot.error, slot.retry_after)
+
+    def _fail(self, slot, error):
+        # HTTPError requests несет ответ; у aiohttp ClientResponseError есть status
+        response = getattr(error, 'response', None)
+        if response is not None and slot.status is None:
+            slot.set_response(response)
+        status = getattr(error, 'status', None)
+        if slot.status is None and isinstance(status, int):
+            slot.status = status
+        if slot.status is None:
+            slot.error = True
+
+    def report(self):
+        """Текстовый отчет: текущая скорость и число замедлений по хостам"""
+        with self._lock:
+            hosts = list(self._hosts.values())
+        if not hosts:
+            return "🚦 Запросов к сайтам не было"
+
+        lines = ["🚦 Ограничение запросов по хостам:"]
+        for snapshot in (limiter.snapshot() for limiter in hosts):
+            lines.append(
+                f"   {snapshot['host']}: {snapshot['requests']} запр., сейчас {snapshot['rate']:.1f} запр./с "
+                f"и до {snapshot['limit']} одновременно; 429/503: {snapshot['throttled']}, "
+                f"ошибок: {snapshot['errors']}, медленных: {snapshot['slow']}, "
+                f"суммарное ожидание {snapshot['waited']:.1f} с"
+            )
+        return "\n".join(lines)
+
+
+# Общий ограничитель процесса: оба скрапера и все пути загрузки делят его
+RATE_LIMITER = RateLimiter()
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from common import metrics
+
+
+def document_complete(driver):
+    """Страница полностью загружена (document.readyState == complete)"""
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+# Условия готовности для каждого типа страниц CyberLeninka
+PAGE_CONDITIONS = {
+    # Результаты поиска подгружаются скриптом - ждем первую ссылку на статью
+    'search': lambda: EC.presence_of_element_located((By.CSS_SELECTOR, 'a[href*="/article/"]')),
+    # Страница статьи: документ загружен и есть текст, аннотация или заголовок
+    'article': lambda: EC.all_of(
+        document_complete,
+        EC.any_of(
+            EC.presence_of_element_located((By.CSS_SELECTOR, '.fulltext')),
+            EC.presence_of_element_located((By.CSS_SELECTOR, '.abstract')),
+            EC.presence_of_element_located((By.CSS_SELECTOR, 'h1'))
+        )
+    )
+}
+
+DEFAULT_TIMEOUTS = {
+    'search': 15,
+    'article': 10
+}
+
+
+class PageWaiter:
+    """Ожидание готовности страниц по условиям вместо фиксированных пауз.
+
+    Считает, сколько времени ушло на ожидание на каждом этапе.
+    """
+
+    def __init__(self, timeouts=None, poll_frequency=0.2):
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.poll_frequency = poll_frequency
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def wait_for(self, driver, page_type, stage=None, timeout=None):
+        """Ждет готовности страницы, возвращает False по таймауту"""
+        stage = stage or page_type
+        timeout = timeout if timeout is not None else self.timeouts.get(page_type, 10)
+        condition = PAGE_CONDITIONS[page_type]()
+
+        start = time.perf_counter()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+        self._record(stage, time.perf_counter() - start, ready)
+        return ready
+
+    def _record(self, stage, elapsed, ready):
+        metrics.observe("stage_seconds", elapsed, stage="wait", page=stage)
+        if not ready:
+            metrics.count("wait_timeouts_total", page=stage)
+        with self._lock:
+            stage_stats = self.stats.setdefault(stage, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            stage_stats['count'] += 1
+            stage_stats['total'] += elapsed
+            stage_stats['max'] = max(stage_stats['max'], elapsed)
+            if not ready:
+                stage_stats['timeouts'] += 1
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def report(self):
+        """Текстовый отчет о времени ожидания по этапам"""
+        with self._lock:
+            stats = {stage: dict(values) for stage, values in self.stats.items()}
+
+        if not stats:
+            return "⏱️ Ожиданий не было"
+
+        lines = ["⏱️ Время ожидания по этапам:"]
+        for stage, values in stats.items():
+            average = values['total'] / values['count']
+            lines.append(
+                f"   {stage}: {values['count']} ожид., всего {values['total']:.2f} с, "
+                f"сред. {average:.2f} с, макс. {values['max']:.2f} с, таймаутов {values['timeouts']}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from runner import SCRAPERS, JobRunner, load_jobs
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common import metrics
+from common.rate_limit import RATE_LIMITER
+
+
+def totals(results):
+    """Сводка по всем заданиям"""
+    summary = {'jobs': len(results), 'ok': 0, 'empty': 0, 'error': 0, 'articles': 0, 'failed_articles': 0}
+    for result in results:
+        summary[result['status']] += 1
+        summary['articles'] += result['succeeded']
+        summary['failed_articles'] += result['failed']
+    return summary
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description="Пакетный запуск запросов CyberLeninka без интерфейса",
+        epilog='Строка JSONL: {"query": "нейросети", "count": 20, "scraper": "lab2", "id": "nn"}; '
+               "CSV - те же поля в заголовке. Обязательно только query."
+    )
+    arg_parser.add_argument("jobs", help="файл заданий (.jsonl или .csv)")
+    arg_parser.add_argument("-o", "--output", default="batch_summary.json", help="JSON со сводкой по заданиям")
+    arg_parser.add_argument("-j", "--concurrency", type=int, default=2,
+                            help="одновременных заданий (= драйверов в пуле каждого скрапера)")
+    arg_parser.add_argument("--scraper", choices=SCRAPERS, default="lab3", help="скрапер по умолчанию")
+    arg_parser.add_argument("-n", "--count", type=int, default=10, help="число статей по умолчанию")
+    arg_parser.add_argument("--full-browser", action="store_true",
+                            help="обычный профиль Chrome (с картинками, стилями и шрифтами)")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    try:
+        jobs = load_jobs(args.jobs, args.scraper, args.count)
+    except (OSError, ValueError) as e:
+        print(f"❌ Не удалось прочитать задания: {e}")
+        return 2
+    if not jobs:
+        print("❌ В файле нет заданий")
+        return 2
+
+    print(f"📋 Заданий: {len(jobs)}, одновременно: {args.concurrency}")
+    runner = JobRunner(concurrency=args.concurrency, lean=not args.full_browser)
+    started = time.perf_counter()
+    lock = threading.Lock()
+    done = []
+
+    def on_result(result):
+        with lock:
+            done.append(result)
+            mark = {"ok": "✅", "empty": "⚠️", "error": "❌"}[result['status']]
+            print(f"{mark} [{len(done)}/{len(jobs)}] {result['scraper']} '{result['query']}': "
+                  f"{result['succeeded']} статей за {result['elapsed_s']:.1f} с")
+
+    try:
+        results = runner.run_all(jobs, on_result)
+    except KeyboardInterrupt:
+        # run_all уже отменил задания из очереди - сводка пишется сразу по готовым
+        print("\n⚠️ Пакет прерван пользователем, задания из очереди отменены")
+        results = list(done)
+    finally:
+        runner.close()
+        metrics.dump_metrics(args.metrics)
+
+    summary = {
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'jobs_file': os.path.abspath(args.jobs),
+        'concurrency': args.concurrency,
+        'elapsed_s': round(time.perf_counter() - started, 3),
+        'totals': totals(results),
+        'jobs': results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    counts = summary['totals']
+    print(f"\n🎉 Пакет завершен за {summary['elapsed_s']:.1f} с: успешно {counts['ok']}, "
+          f"без статей {counts['empty']}, с ошибкой {counts['error']}; статей: {counts['articles']}")
+    print(RATE_LIMITER.report())
+    print(f"💾 Сводка сохранена: {args.output}")
+    return 1 if counts['error'] or len(results) < len(jobs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
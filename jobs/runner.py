@@ -0,0 +1,237 @@
+import csv
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Скраперы лежат в папках лабораторных, общие модули - в корне репозитория
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "lab2"), os.path.join(ROOT_DIR, "lab3")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from common import metrics
+from common.http_cache import HTTPCache
+from cyberleninka_pdf import CyberLeninkaPDFScraper
+from download_manager import BatchCheckpoint
+from parser import CyberLeninkaParser
+
+
+# lab3 - статьи с пересказом в хранилище, lab2 - PDF
+SCRAPERS = ("lab3", "lab2")
+
+
+def make_job(data, number, scraper="lab3", count=10):
+    """Задание из словаря (строка JSONL/CSV или тело запроса к сервису).
+
+    Обязательно поле query; count и scraper берутся по умолчанию, id - номер задания.
+    """
+    query = str(data.get('query') or "").strip()
+    if not query:
+        raise ValueError("не указан запрос (query)")
+
+    kind = str(data.get('scraper') or scraper).strip()
+    if kind not in SCRAPERS:
+        raise ValueError(f"неизвестный скрапер '{kind}', допустимы: {', '.join(SCRAPERS)}")
+
+    if data.get('count') not in (None, ""):
+        count = data['count']
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        raise ValueError(f"count должен быть числом: {data.get('count')!r}")
+    if count < 1:
+        raise ValueError("count должен быть больше нуля")
+
+    return {'id': str(data.get('id') or number), 'query': query, 'scraper': kind, 'count': count}
+
+
+def load_jobs(path, scraper="lab3", count=10):
+    """Задания из JSONL (объект на строку) или CSV с заголовком query,count,scraper,id.
+
+    Пустые строки и строки JSONL, начинающиеся с #, пропускаются.
+    Ошибка в любой строке - ValueError с номером строки.
+    """
+    rows = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            # Строка 1 - заголовок
+            rows = list(enumerate(csv.DictReader(f), 2))
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    rows.append((line_number, json.loads(line)))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: некорректный JSON: {e}")
+
+    jobs = []
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"{path}:{line_number}: ожидался объект с полем query")
+        try:
+            jobs.append(make_job(row, len(jobs) + 1, scraper, count))
+        except ValueError as e:
+            raise ValueError(f"{path}:{line_number}: {e}")
+    return jobs
+
+
+def pdf_article(result):
+    """Запись о статье lab2 для сводки (без служебных полей make_result)"""
+    return {
+        'number': result['number'],
+        'title': result['title'],
+        'url': result['url'],
+        'filepath': result['filepath'],
+        'size': result['size'],
+        'skipped': result['skipped'],
+        'success': result['success'],
+        'error': result['error']
+    }
+
+
+class JobRunner:
+    """Выполнение заданий на общих скраперах без перезапуска Chrome.
+
+    На каждый вид скрапера создается один экземпляр с пулом из concurrency
+    драйверов; параллельные задания берут по драйверу из пула
+    (pooled_driver), поэтому основной драйвер скрапера не запускается.
+    Кэш HTTP и ограничитель запросов общие для всех заданий.
+    """
+
+    def __init__(self, concurrency=2, lean=True, cache=None):
+        self.concurrency = concurrency
+        self.lean = lean
+        self._owns_cache = cache is None
+        self.cache = HTTPCache() if cache is None else cache
+        self._scrapers = {}
+        self._lock = threading.Lock()
+        # Создание скрапера (запуск Chrome) - под блокировкой своего вида,
+        # чтобы задания другого вида и warmed() его не ждали
+        self._building = {kind: threading.Lock() for kind in SCRAPERS}
+
+    def scraper(self, kind):
+        """Скрапер вида kind (создается при первом задании)"""
+        with self._lock:
+            if kind in self._scrapers:
+                return self._scrapers[kind]
+        with self._building[kind]:
+            with self._lock:
+                if kind in self._scrapers:
+                    return self._scrapers[kind]
+            if kind == "lab3":
+                scraper = CyberLeninkaParser(
+                    "articles", workers=self.concurrency, cache=self.cache, lean=self.lean, main_driver=False
+                )
+            else:
+                scraper = CyberLeninkaPDFScraper(
+                    workers=self.concurrency, cache=self.cache, lean=self.lean, main_driver=False
+                )
+            with self._lock:
+                self._scrapers[kind] = scraper
+            return scraper
+
+    def warmed(self):
+        """Виды уже созданных скраперов"""
+        with self._lock:
+            return sorted(self._scrapers)
+
+    def warm(self, kinds=SCRAPERS):
+        """Создание скраперов и запуск всех драйверов их пулов заранее"""
+        for kind in kinds:
+            self.scraper(kind).warm_pool()
+
+    def run(self, job, on_article=None):
+        """Выполнение одного задания.
+
+        Ошибка задания не выбрасывается, а попадает в результат (status="error").
+        on_article(job, article) вызывается после каждой обработанной статьи.
+        """
+        started = time.perf_counter()
+        result = dict(job, status="ok", succeeded=0, failed=0, articles=[], error=None)
+        print(f"▶️ Задание {job['id']} ({job['scraper']}): '{job['query']}', до {job['count']} статей")
+        try:
+            scraper = self.scraper(job['scraper'])
+            with scraper.pooled_driver():
+                if job['scraper'] == "lab3":
+                    articles = self._run_lab3(scraper, job, on_article)
+                else:
+                    articles = self._run_lab2(scraper, job, on_article)
+            result['articles'] = articles
+            result['succeeded'] = sum(1 for article in articles if article['success'])
+            result['failed'] = len(articles) - result['succeeded']
+            if not result['succeeded']:
+                result['status'] = "empty"
+        except Exception as e:
+            result['status'] = "error"
+            result['error'] = str(e)
+            print(f"❌ Задание {job['id']} завершилось ошибкой: {e}")
+
+        result['elapsed_s'] = round(time.perf_counter() - started, 3)
+        metrics.count("jobs_total", scraper=job['scraper'], status=result['status'])
+        metrics.observe("stage_seconds", result['elapsed_s'], stage="job", scraper=job['scraper'])
+        return result
+
+    def _run_lab3(self, scraper, job, on_article):
+        articles = []
+        # Полный текст уже записан в хранилище - в памяти его не держим
+        for article_data in scraper.iter_articles(job['query'], job['count'], include_content=False):
+            article = {
+                'number': article_data['number'],
+                'title': article_data['title'],
+                'url': article_data['url'],
+                'filename': article_data['filename'],
+                'success': True
+            }
+            articles.append(article)
+            if on_article:
+                on_article(job, article)
+        return sorted(articles, key=lambda article: article['number'])
+
+    def _run_lab2(self, scraper, job, on_article):
+        # Своя контрольная точка на запрос: общая для папки затиралась бы параллельными заданиями
+        key = hashlib.sha1(f"{job['query']}|{job['count']}".encode("utf-8")).hexdigest()[:12]
+        checkpoint = BatchCheckpoint(os.path.join(scraper.download_dir, f".checkpoint_{key}.json"))
+        on_result = (lambda result: on_article(job, pdf_article(result))) if on_article else None
+        results = scraper.search_and_download_articles(
+            job['query'], job['count'], checkpoint=checkpoint, on_result=on_result
+        )
+        return [pdf_article(result) for result in results]
+
+    def run_all(self, jobs, on_result=None):
+        """Параллельное выполнение заданий (не больше concurrency одновременно).
+
+        on_result(result) вызывается по мере завершения; возвращаются
+        результаты в порядке заданий. При Ctrl+C задания из очереди
+        отменяются сразу, не дожидаясь выполнения (KeyboardInterrupt
+        передается вызывающему).
+        """
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job")
+        try:
+            futures = [executor.submit(self.run, job) for job in jobs]
+            for future in as_completed(futures):
+                if on_result:
+                    on_result(future.result())
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Закрытие скраперов (драйверы, пулы, хранилища) и общего кэша"""
+        with self._lock:
+            scrapers = list(self._scrapers.values())
+            self._scrapers.clear()
+        for scraper in scrapers:
+            try:
+                scraper.close()
+            except Exception as e:
+                print(f"⚠️ Ошибка при закрытии скрапера: {e}")
+        if self._owns_cache:
+            self.cache.close()
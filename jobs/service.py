@@ -0,0 +1,340 @@
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import parse_qs, urlparse
+
+from runner import SCRAPERS, JobRunner, make_job
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common import metrics
+from common.driver_bootstrap import startup_report
+from common.rate_limit import RATE_LIMITER
+
+
+MAX_BODY_BYTES = 64 * 1024
+# Сколько завершенных заданий хранить для GET /jobs/<id>
+MAX_FINISHED_JOBS = 200
+FINISHED_STATUSES = ("ok", "empty", "error")
+# Сколько заданий может ждать в очереди и сколько статей можно запросить в одном
+MAX_QUEUED_JOBS = 50
+MAX_JOB_COUNT = 200
+
+
+class QueueFull(Exception):
+    """Очередь заданий заполнена (ответ 429)"""
+
+
+class JobService:
+    """Очередь заданий на прогретом JobRunner.
+
+    Задания выполняются не больше runner.concurrency одновременно.
+    По каждому заданию копится список событий (queued, start, article,
+    finish) с порядковым номером seq - клиенты читают их потоком
+    через events() и могут переподключиться с нужного места.
+    """
+
+    def __init__(self, runner, scraper="lab3", count=10, max_queued=MAX_QUEUED_JOBS, max_count=MAX_JOB_COUNT):
+        self.runner = runner
+        self.scraper = scraper
+        self.count = count
+        self.max_queued = max_queued
+        self.max_count = max_count
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=runner.concurrency, thread_name_prefix="job")
+
+    def submit(self, data):
+        """Постановка задания в очередь.
+
+        ValueError при неверных полях или count больше max_count,
+        QueueFull - если в очереди уже max_queued заданий.
+        """
+        job = make_job(data, 0, self.scraper, self.count)
+        if job['count'] > self.max_count:
+            raise ValueError(f"count не может быть больше {self.max_count}")
+        state = {
+            'job': job,
+            'status': "queued",
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'progress': 0,
+            'events': [],
+            'result': None
+        }
+        with self._cond:
+            queued = sum(1 for other in self._jobs.values() if other['status'] == "queued")
+            if queued >= self.max_queued:
+                raise QueueFull(f"в очереди уже {queued} заданий, повторите позже")
+            # id выдает сервис: клиентские id разных клиентов могли бы совпасть
+            job['id'] = str(next(self._ids))
+            self._jobs[job['id']] = state
+            self._prune()
+        self._event(job['id'], "queued")
+        self._executor.submit(self._run, job['id'])
+        return self.get(job['id'])
+
+    def _run(self, job_id):
+        with self._cond:
+            state = self._jobs[job_id]
+            state['status'] = "running"
+            state['started_at'] = time.time()
+        self._event(job_id, "start")
+
+        def on_article(job, article):
+            with self._cond:
+                state['progress'] += 1
+            self._event(job_id, "article", article=article)
+
+        result = self.runner.run(state['job'], on_article)
+        # Статус и событие finish - под одной блокировкой: читатель events() не увидит одно без другого
+        with self._cond:
+            state['result'] = result
+            state['status'] = result['status']
+            state['finished_at'] = time.time()
+            self._event(job_id, "finish", status=result['status'], succeeded=result['succeeded'],
+                        failed=result['failed'], elapsed_s=result['elapsed_s'], error=result['error'])
+
+    def _event(self, job_id, kind, **data):
+        with self._cond:
+            events = self._jobs[job_id]['events']
+            events.append(dict(data, kind=kind, job=job_id, seq=len(events), time=time.time()))
+            self._cond.notify_all()
+
+    def _prune(self):
+        """Удаление самых старых завершенных заданий сверх MAX_FINISHED_JOBS"""
+        finished = [job_id for job_id, state in self._jobs.items() if state['status'] in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id, with_result=False):
+        """Состояние задания без списка событий или None"""
+        with self._cond:
+            state = self._jobs.get(job_id)
+            if state is None:
+                return None
+            view = {key: value for key, value in state.items() if key not in ('events', 'result')}
+            view['id'] = job_id
+            if with_result:
+                view['result'] = state['result']
+            return view
+
+    def list(self):
+        with self._cond:
+            job_ids = list(self._jobs)
+        return [view for view in map(self.get, job_ids) if view]
+
+    def events(self, job_id, since=0, timeout=30.0):
+        """События задания начиная с since, по мере появления, до finish.
+
+        Если timeout секунд нет новых событий, отдается {"kind": "ping"},
+        чтобы клиент и прокси не закрыли соединение.
+        """
+        def ready():
+            state = self._jobs.get(job_id)
+            return state is None or len(state['events']) > since or state['status'] in FINISHED_STATUSES
+
+        while True:
+            with self._cond:
+                # Условие общее для всех заданий - ждем именно своих событий
+                self._cond.wait_for(ready, timeout)
+                state = self._jobs.get(job_id)
+                if state is None:
+                    return
+                new_events = state['events'][since:]
+                finished = state['status'] in FINISHED_STATUSES
+            for event in new_events:
+                yield event
+            since += len(new_events)
+            if finished:
+                return
+            if not new_events:
+                yield {'kind': "ping", 'job': job_id, 'time': time.time()}
+
+    def health(self):
+        with self._cond:
+            statuses = [state['status'] for state in self._jobs.values()]
+        return {
+            'status': "ok",
+            'concurrency': self.runner.concurrency,
+            'scrapers': self.runner.warmed(),
+            'queued': statuses.count("queued"),
+            'running': statuses.count("running")
+        }
+
+    def close(self):
+        """Ожидание текущих заданий; задания из очереди отменяются"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.0: соединение закрывается после ответа, поток событий - без Content-Length
+        protocol_version = "HTTP/1.0"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [part for part in url.path.split("/") if part]
+            if parts == ["health"]:
+                self._send_json(200, service.health())
+            elif parts == ["metrics"]:
+                self._send(200, metrics.METRICS.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            elif parts == ["jobs"]:
+                self._send_json(200, {'jobs': service.list()})
+            elif len(parts) == 2 and parts[0] == "jobs":
+                job = service.get(parts[1], with_result=True)
+                if job is None:
+                    self._send_json(404, {'error': "задание не найдено"})
+                else:
+                    self._send_json(200, job)
+            elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+                self._stream_events(parts[1], url.query)
+            else:
+                self._send_json(404, {'error': "неизвестный адрес"})
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip("/") != "/jobs":
+                self._send_json(404, {'error': "неизвестный адрес"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    raise ValueError("слишком большое тело запроса")
+                data = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(data, dict):
+                    raise ValueError("ожидался JSON-объект с полем query")
+                job = service.submit(data)
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            except QueueFull as e:
+                self._send_json(429, {'error': str(e)})
+                return
+            self._send_json(202, dict(job, events_url=f"/jobs/{job['id']}/events"))
+
+        def _stream_events(self, job_id, query):
+            if service.get(job_id) is None:
+                self._send_json(404, {'error': "задание не найдено"})
+                return
+            try:
+                since = int(parse_qs(query).get("since", ["0"])[0])
+            except ValueError:
+                since = 0
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            try:
+                for event in service.events(job_id, since):
+                    self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # Клиент отключился - задание продолжает выполняться
+                pass
+
+        def _send_json(self, status, data):
+            self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"),
+                       "application/json; charset=utf-8")
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            # У Unix-сокета адреса клиента нет
+            return self.client_address[0] if self.client_address else "unix"
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(service, host="127.0.0.1", port=8770, unix_socket=None):
+    handler = make_handler(service)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        return ThreadingUnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description="Сервис заданий CyberLeninka с прогретыми браузерами",
+        epilog="Пример: curl -d '{\"query\": \"нейросети\", \"count\": 5}' http://127.0.0.1:8770/jobs, "
+               "затем curl -N http://127.0.0.1:8770/jobs/1/events"
+    )
+    arg_parser.add_argument("--host", default="127.0.0.1", help="адрес (по умолчанию только локальный)")
+    arg_parser.add_argument("--port", type=int, default=8770)
+    arg_parser.add_argument("--unix", default=None, metavar="ПУТЬ", help="слушать Unix-сокет вместо TCP")
+    arg_parser.add_argument("-j", "--concurrency", type=int, default=2,
+                            help="одновременных заданий (= драйверов в пуле каждого скрапера)")
+    arg_parser.add_argument("--scraper", choices=SCRAPERS, default="lab3", help="скрапер по умолчанию")
+    arg_parser.add_argument("-n", "--count", type=int, default=10, help="число статей по умолчанию")
+    arg_parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_JOBS,
+                            help=f"заданий в очереди не больше (по умолчанию {MAX_QUEUED_JOBS}), сверх - ответ 429")
+    arg_parser.add_argument("--max-count", type=int, default=MAX_JOB_COUNT,
+                            help=f"статей в одном задании не больше (по умолчанию {MAX_JOB_COUNT})")
+    arg_parser.add_argument("--warm", nargs="*", choices=SCRAPERS, default=None,
+                            help="запустить драйверы скраперов при старте (без списка - всех)")
+    arg_parser.add_argument("--full-browser", action="store_true",
+                            help="обычный профиль Chrome (с картинками, стилями и шрифтами)")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    if args.count > args.max_count:
+        print(f"❌ Число статей по умолчанию ({args.count}) больше --max-count ({args.max_count})")
+        return 2
+
+    if args.unix and not hasattr(socket, "AF_UNIX"):
+        print("❌ Unix-сокеты не поддерживаются в этой системе")
+        return 2
+
+    runner = JobRunner(concurrency=args.concurrency, lean=not args.full_browser)
+    if args.warm is not None:
+        print("🔥 Прогрев драйверов...")
+        runner.warm(args.warm or SCRAPERS)
+        print(startup_report())
+
+    service = JobService(runner, args.scraper, args.count, args.max_queued, args.max_count)
+    server = create_server(service, args.host, args.port, args.unix)
+    address = args.unix or f"http://{args.host}:{server.server_address[1]}"
+    print(f"🌐 Сервис заданий запущен: {address} (Ctrl+C - остановить)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Остановка сервиса...")
+    finally:
+        server.server_close()
+        service.close()
+        runner.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+        print(RATE_LIMITER.report())
+        metrics.dump_metrics(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import asyncio
+import html
+import os
+import re
+import sys
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin
+
+import aiohttp
+
+from download_manager import commit_pdf, part_path, resume_request, save_validator
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common import metrics
+from common.rate_limit import RequestSlot
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# Ссылки на PDF в HTML страницы статьи (href="/article/n/.../pdf", "...pdf")
+PDF_HREF_RE = re.compile(r'href=["\']([^"\']*(?:\.pdf|/pdf)[^"\']*)["\']', re.IGNORECASE)
+TITLE_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+PAGE_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def make_result(article_number, article_url):
+    """Результат обработки одной статьи"""
+    return {
+        'number': article_number,
+        'url': article_url,
+        'title': None,
+        'pdf_url': None,
+        'filepath': None,
+        'size': 0,
+        'success': False,
+        'skipped': False,
+        'error': None
+    }
+
+
+@asynccontextmanager
+async def _unlimited():
+    yield RequestSlot()
+
+
+class AsyncPDFDownloader:
+    """Параллельное скачивание PDF статей без браузера (aiohttp)"""
+
+    def __init__(self, download_dir, base_url="https://cyberleninka.ru",
+                 max_concurrent_per_host=4, timeout=30, chunk_size=64 * 1024,
+                 safe_filename=None, cache=None, on_result=None, rate_limiter=None, log=print):
+        self.download_dir = download_dir
+        self.log = log
+        self.base_url = base_url
+        self.max_concurrent_per_host = max_concurrent_per_host
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.safe_filename = safe_filename or (lambda title: re.sub(r'[<>:"/\\|?*]', '_', title)[:100])
+        self.cache = cache
+        self.on_result = on_result
+        # common.rate_limit.RateLimiter; без него ограничивает только limit_per_host соединения
+        self.rate_limiter = rate_limiter
+        os.makedirs(self.download_dir, exist_ok=True)
+
+    def run(self, article_urls, start_number=1, numbers=None):
+        """Синхронная обертка: скачивает все статьи и возвращает список результатов"""
+        return asyncio.run(self.download_all(article_urls, start_number, numbers))
+
+    async def download_all(self, article_urls, start_number=1, numbers=None):
+        """Скачивание всех статей с ограничением параллельности на хост.
+
+        numbers - номера статей для имен файлов (по умолчанию подряд с start_number).
+        on_result(result) вызывается сразу после обработки каждой статьи.
+        """
+        if numbers is None:
+            numbers = range(start_number, start_number + len(article_urls))
+
+        async with self._session() as session:
+            tasks = [
+                self._download_one(session, url, number)
+                for url, number in zip(article_urls, numbers)
+            ]
+            return await asyncio.gather(*tasks)
+
+    def run_stream(self, work_items, workers=8):
+        """Синхронная обертка над download_stream"""
+        return asyncio.run(self.download_stream(work_items, workers))
+
+    async def download_stream(self, work_items, workers=8):
+        """Скачивание статей из потока пар (номер, url) по мере их поступления.
+
+        work_items может блокироваться (например, ждать обход следующей
+        страницы поиска) - чтение идет в отдельном потоке. Одновременно
+        обрабатывается не больше workers статей, результаты не накапливаются:
+        их получает on_result. Возвращает число обработанных статей.
+        """
+        work_items = iter(work_items)
+        loop = asyncio.get_running_loop()
+        next_lock = asyncio.Lock()
+        processed = 0
+
+        async def next_item():
+            # Генератор нельзя продвигать из двух потоков одновременно
+            async with next_lock:
+                return await loop.run_in_executor(None, next, work_items, None)
+
+        async def worker(session):
+            nonlocal processed
+            while True:
+                item = await next_item()
+                if item is None:
+                    return
+                number, url = item
+                await self._download_one(session, url, number)
+                processed += 1
+
+        async with self._session() as session:
+            await asyncio.gather(*(worker(session) for _ in range(workers)))
+        return processed
+
+    def _session(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrent_per_host)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        headers = {'User-Agent': USER_AGENT}
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+
+    async def _download_one(self, session, article_url, article_number):
+        """Скачивание PDF одной статьи: страница -> ссылка на PDF -> файл"""
+        start = time.perf_counter()
+        result = await self._download_article(session, article_url, article_number)
+        metrics.observe("stage_seconds", time.perf_counter() - start, stage="article", client="aiohttp")
+        metrics.count("articles_total", result="ok" if result['success'] else "failed")
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+    async def _download_article(self, session, article_url, article_number):
+        result = make_result(article_number, article_url)
+        try:
+            page_html = await self._get_page(session, article_url)
+
+            result['title'] = self._extract_title(page_html) or f"Статья_{article_number}"
+
+            for pdf_url in self._pdf_candidates(article_url, page_html):
+                filepath = await self._stream_pdf(session, pdf_url, article_url, result['title'], article_number)
+                if filepath:
+                    result['pdf_url'] = pdf_url
+                    result['filepath'] = filepath
+                    result['size'] = os.path.getsize(filepath)
+                    result['success'] = True
+                    self.log(f"   ✅ [{article_number}] PDF сохранен: {os.path.basename(filepath)} ({result['size']} байт)")
+                    return result
+
+            result['error'] = "PDF ссылка не найдена"
+        except Exception as e:
+            result['error'] = str(e)
+
+        self.log(f"   ❌ [{article_number}] Не удалось скачать PDF: {result['error']}")
+        return result
+
+    async def _get_page(self, session, url):
+        """HTML страницы с учетом кэша и перепроверкой по ETag/Last-Modified"""
+        entry = self.cache.lookup(url, 'page') if self.cache else None
+        if entry and entry['fresh']:
+            body = self.cache.read(entry)
+            if body is not None:
+                self.cache.hits += 1
+                return body.decode('utf-8', errors='replace')
+            entry = None
+
+        async with self._limited(url) as slot:
+            with metrics.timer("fetch", client="aiohttp"):
+                async with session.get(url, headers=self._conditional_headers(entry)) as response:
+                    slot.set_response(response)
+                    body = None
+                    if response.status == 304 and entry:
+                        self.cache.mark_revalidated(entry, response.headers)
+                        body = self.cache.read(entry)
+                        if body is not None:
+                            return body.decode('utf-8', errors='replace')
+                    else:
+                        response.raise_for_status()
+                        body = await response.read()
+
+        if body is None:
+            # Блоб вытеснен во время запроса - запрашиваем заново без условий
+            return await self._get_page(session, url)
+
+        if self.cache:
+            self.cache.put(url, body, 'page', response.headers)
+        return body.decode(response.charset or 'utf-8', errors='replace')
+
+    def _limited(self, url):
+        if self.rate_limiter is None:
+            return _unlimited()
+        return self.rate_limiter.async_request(url)
+
+    def _conditional_headers(self, entry):
+        return self.cache.conditional_headers(entry) if entry else {}
+
+    def _extract_title(self, page_html):
+        """Заголовок статьи из HTML (h1, затем <title>)"""
+        for pattern in (TITLE_RE, PAGE_TITLE_RE):
+            match = pattern.search(page_html)
+            if match:
+                title = html.unescape(TAG_RE.sub(' ', match.group(1)))
+                title = re.sub(r'\s+', ' ', title).replace(" - КиберЛенинка", "").strip()
+                if len(title) > 5:
+                    return title
+        return None
+
+    def _pdf_candidates(self, article_url, page_html):
+        """Кандидаты на URL PDF: ссылки со страницы, затем стандартные пути"""
+        candidates = []
+        for href in PDF_HREF_RE.findall(page_html):
+            candidates.append(urljoin(article_url, html.unescape(href)))
+
+        article_url = article_url.rstrip('/')
+        candidates.extend([
+            article_url + "/pdf",
+            article_url + ".pdf",
+            article_url.replace("/article/", "/pdf/")
+        ])
+        return list(dict.fromkeys(candidates))
+
+    async def _stream_pdf(self, session, pdf_url, referer, title, article_number):
+        """Потоковая запись PDF в download_dir, возвращает путь или None"""
+        filename = f"{article_number:02d}_{self.safe_filename(title)}.pdf"
+        filepath = os.path.join(self.download_dir, filename)
+
+        entry = self.cache.lookup(pdf_url, 'pdf') if self.cache else None
+        if entry and entry['fresh']:
+            if self.cache.copy_to(entry, filepath):
+                self.cache.hits += 1
+                return filepath
+            entry = None
+
+        headers = {'Referer': referer}
+        # .part - по адресу статьи (referer), как и в браузерном пути
+        part = part_path(filepath, referer)
+        offset, resume_headers = resume_request(part)
+        if offset:
+            # Продолжаем прерванное скачивание с места остановки (Range + If-Range)
+            headers.update(resume_headers)
+        else:
+            headers.update(self._conditional_headers(entry))
+
+        received = 0
+        evicted = False
+        try:
+            async with self._limited(pdf_url) as slot, session.get(pdf_url, headers=headers) as response:
+                slot.set_response(response)
+                if response.status == 304 and entry:
+                    self.cache.mark_revalidated(entry, response.headers)
+                    if self.cache.copy_to(entry, filepath):
+                        return filepath
+                    evicted = True
+                else:
+                    if response.status == 416 and offset:
+                        return filepath if commit_pdf(filepath, part) else None
+                    if response.status not in (200, 206):
+                        return None
+                    if 'html' in response.headers.get('Content-Type', ''):
+                        return None
+
+                    # 206 - сервер продолжил с offset, 200 - отдает файл заново
+                    mode = 'ab' if response.status == 206 else 'wb'
+                    if mode == 'wb':
+                        save_validator(part, response.headers)
+                    with open(part, mode) as f:
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            f.write(chunk)
+                            received += len(chunk)
+                    response_headers = response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # .part остается на диске для докачки при следующей попытке
+            return None
+
+        if evicted:
+            # Блоб вытеснен во время запроса - скачиваем заново без условий (слот уже освобожден)
+            return await self._stream_pdf(session, pdf_url, referer, title, article_number)
+
+        # Проверка %PDF/%%EOF и атомарное переименование
+        if not commit_pdf(filepath, part):
+            return None
+        # Время от получения слота ограничителя, без ожидания в очереди
+        metrics.observe_download(received, time.perf_counter() - slot.started, client="aiohttp")
+
+        if self.cache:
+            self.cache.put_file(pdf_url, filepath, 'pdf', response_headers)
+        return filepath
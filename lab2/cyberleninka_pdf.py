@@ -1,32 +1,100 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+import argparse
 import time
 import os
+import sys
 import re
-import requests
+import itertools
+import threading
+from contextlib import contextmanager
 from urllib.parse import urljoin, quote
 from pathlib import Path
+from async_downloader import AsyncPDFDownloader, make_result
+from dedup_index import DedupIndex
+from download_manager import DownloadManager, BatchCheckpoint
+from pdf_resolver import PDFResolver, PatternCache
+
+# Общие модули обеих лабораторных лежат в корне репозитория (common/)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.waits import PageWaiter
+from common.driver_pool import DriverPool
+from common.driver_bootstrap import LEAN_BLOCKED_URLS, apply_lean_profile, launch_chrome
+from common.http_cache import HTTPCache
+from common.harvest import LinkProducer, ThroughputMeter
+from common.page_links import element_attributes, find_article_links
+from common import metrics
+from common.rate_limit import RATE_LIMITER
 
 class CyberLeninkaPDFScraper:
-    def __init__(self):
+    DOWNLOAD_DIR = "downloaded_articles_pdf"
+    # Больше статей, чем выдает одна страница поиска
+    PAGE_LINK_LIMIT = 100
+
+    def __init__(self, max_concurrent_per_host=4, wait_timeouts=None, workers=1, cache=None, events=None,
+                 rate_limiter=None, lean=True, debug=False, main_driver=True):
+        # Канал событий для интерфейса (common.events.EventChannel); без него - только print
+        self.events = events
+        # Общий для браузера, requests и aiohttp ограничитель запросов к хосту
+        self.rate_limiter = RATE_LIMITER if rate_limiter is None else rate_limiter
+        # lean - облегченный профиль Chrome; debug - скриншоты страниц для отладки
+        self.lean = lean
+        self.debug = debug
         self.base_url = "https://cyberleninka.ru"
-        self.download_dir = "downloaded_articles_pdf"
+        self.download_dir = self.DOWNLOAD_DIR
+        self.max_concurrent_per_host = max_concurrent_per_host
+        self.waiter = PageWaiter(wait_timeouts)
+        self.workers = workers
+        self.pool = None
+        self._owns_cache = cache is None
+        self.cache = HTTPCache() if cache is None else cache
         os.makedirs(self.download_dir, exist_ok=True)
+        self.index = DedupIndex(self.download_dir)
+        # Сообщения компонентов идут через _log - в консоль и в лог интерфейса
+        self.download_manager = DownloadManager(log=self._log)
+        self.pdf_resolver = PDFResolver(self.download_manager.session, patterns=PatternCache(log=self._log),
+                                        rate_limiter=self.rate_limiter, cache=self.cache)
+        self.checkpoint = BatchCheckpoint(os.path.join(self.download_dir, ".checkpoint.json"))
+        for duplicate in self.index.scan_directory():
+            self._log(f"🗑️ Удалена копия уже скачанной статьи: {os.path.basename(duplicate)}")
+        self._local = threading.local()
         self.driver = None
-        self.setup_driver()
+        # main_driver=False - только драйверы пула (pooled_driver), как в режиме заданий
+        if main_driver:
+            self.setup_driver()
+        
+    def _log(self, message):
+        print(message)
+        if self.events is not None:
+            self.events.log(message)
+    
+    def _emit(self, kind, **data):
+        if self.events is not None:
+            self.events.emit(kind, **data)
+        
+    @property
+    def driver(self):
+        """Драйвер текущего потока: из пула в рабочих потоках, иначе основной"""
+        return getattr(self._local, 'driver', None) or self._driver
+    
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
         
     def setup_driver(self):
         """Настройка Chrome драйвера для скачивания PDF"""
+        self.driver = self._build_driver(self.download_dir)
+        
+    def _build_driver(self, download_dir):
+        """Создание нового Chrome драйвера со своей папкой загрузок"""
         chrome_options = Options()
         
         # Настройки для скачивания файлов
         prefs = {
-            "download.default_directory": os.path.abspath(self.download_dir),
+            "download.default_directory": os.path.abspath(download_dir),
             "download.prompt_for_download": False,
             "download.directory_upgrade": True,
             "plugins.always_open_pdf_externally": True,  # Всегда открывать PDF внешне
@@ -44,143 +112,348 @@ class CyberLeninkaPDFScraper:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        if self.lean:
+            apply_lean_profile(chrome_options)
+        
+        driver = launch_chrome(chrome_options, LEAN_BLOCKED_URLS if self.lean else None)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
+    
+    def _build_worker_driver(self, worker_id):
+        """Драйвер для слота пула с отдельной папкой загрузок"""
+        worker_dir = os.path.join(self.download_dir, f"worker_{worker_id}")
+        os.makedirs(worker_dir, exist_ok=True)
+        return self._build_driver(worker_dir)
+    
+    def _get_pool(self):
+        """Пул драйверов для параллельной обработки (создается по требованию)"""
+        if self.pool is None:
+            self.pool = DriverPool(self._build_worker_driver, size=self.workers, log=self._log)
+        return self.pool
+    
+    def warm_pool(self):
+        """Запуск всех драйверов пула заранее (режим сервиса)"""
+        self._get_pool().warm()
+    
+    @contextmanager
+    def pooled_driver(self):
+        """Драйвер из пула как основной для текущего потока на время блока with.
+
+        Так несколько запросов идут параллельно на одном пуле прогретых
+        драйверов (см. jobs/runner.py).
+        """
+        with self._get_pool().acquire() as driver:
+            self._local.driver = driver
+            try:
+                yield driver
+            finally:
+                self._local.driver = None
+    
+    def _run_in_pool(self, func, items):
+        """Параллельный вызов func(*item), где self.driver - драйвер из пула"""
+        def call(driver, item):
+            self._local.driver = driver
+            try:
+                return func(*item)
+            finally:
+                self._local.driver = None
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return self._get_pool().map(call, items)
         
-    def search_and_download_articles(self, query, max_results=12):
-        """Поиск и автоматическое скачивание статей в PDF"""
-        print(f"🔍 Поиск и скачивание PDF статей по запросу: '{query}'")
+    def search_and_download_articles(self, query, max_results=12, checkpoint=None, on_result=None):
+        """Поиск и автоматическое скачивание статей в PDF.
+
+        Возвращает список результатов по каждой статье (см. make_result).
+        checkpoint - своя контрольная точка (BatchCheckpoint) для параллельных
+        запросов; по умолчанию общая для папки загрузок. on_result(result)
+        вызывается сразу после каждой статьи (статья, скачанная повторно
+        через браузер, приходит второй раз).
+        """
+        checkpoint = self.checkpoint if checkpoint is None else checkpoint
+        
+        def done(result):
+            self._on_article_done(result, checkpoint)
+            if on_result:
+                on_result(result)
+        
+        self._log(f"🔍 Поиск и скачивание PDF статей по запросу: '{query}'")
         
         try:
             # Поиск статей
-            search_url = f"{self.base_url}/search?q={quote(query)}"
-            self.driver.get(search_url)
-            time.sleep(8)
+            article_links = checkpoint.resume(query, max_results)
+            if article_links:
+                self._log("⏯️ Продолжаем прерванный пакет с контрольной точки")
+            else:
+                article_links = self._get_article_links(query, max_results)
+            self._log(f"📎 Найдено ссылок на статьи: {len(article_links)}")
             
-            # Сохраняем скриншот для отладки
-            self.driver.save_screenshot("search_page.png")
-            print("💾 Скриншот страницы поиска сохранен")
+            if not article_links:
+                self._log("❌ Не найдено ссылок на статьи")
+                return []
             
-            # Поиск ссылок на статьи
-            article_links = self._find_article_links(max_results)
-            print(f"📎 Найдено ссылок на статьи: {len(article_links)}")
+            checkpoint.start(query, max_results, article_links)
+            self._emit('start', query=query, total=len(article_links))
             
-            if not article_links:
-                print("❌ Не найдено ссылок на статьи")
-                return 0
+            # Уже скачанные в прошлых запусках статьи пропускаем
+            results = []
+            pending = []
+            for number, article_url in enumerate(article_links, 1):
+                known_path = self.index.find_by_url(article_url)
+                if known_path:
+                    result = make_result(number, article_url)
+                    result.update({
+                        'filepath': known_path,
+                        'size': os.path.getsize(known_path),
+                        'success': True,
+                        'skipped': True
+                    })
+                    self._log(f"⏭️ Статья {number} уже скачана: {os.path.basename(known_path)}")
+                    self._emit_article(result)
+                    if on_result:
+                        on_result(result)
+                    results.append(result)
+                else:
+                    pending.append((number, article_url))
             
-            # Скачивание PDF статей
-            downloaded_count = 0
-            for i, article_url in enumerate(article_links):
-                print(f"📥 Обрабатываем статью {i+1}/{len(article_links)}...")
-                
-                try:
-                    success = self._download_article_pdf(article_url, i+1)
-                    if success:
-                        downloaded_count += 1
-                        print(f"✅ PDF статьи {i+1} успешно скачан")
-                    else:
-                        print(f"❌ Не удалось скачать PDF статьи {i+1}")
-                        
-                except Exception as e:
-                    print(f"⚠️ Ошибка при обработке статьи {i+1}: {e}")
-                    continue
-                
-                # Пауза между запросами
-                time.sleep(2)
+            # Параллельное скачивание PDF без браузера
+            self._log(f"⚡ Параллельное скачивание (до {self.max_concurrent_per_host} соединений на хост)...")
+            downloader = AsyncPDFDownloader(
+                self.download_dir,
+                base_url=self.base_url,
+                max_concurrent_per_host=self.max_concurrent_per_host,
+                safe_filename=self._create_safe_filename,
+                cache=self.cache,
+                rate_limiter=self.rate_limiter,
+                on_result=done,
+                log=self._log
+            )
+            downloaded = downloader.run(
+                [url for _, url in pending],
+                numbers=[number for number, _ in pending]
+            ) if pending else []
             
-            print(f"🎉 Скачивание завершено! Успешно: {downloaded_count}/{len(article_links)}")
-            return downloaded_count
+            # Для неудачных статей пробуем прежний путь через браузер
+            failed = [result for result in downloaded if not result['success']]
+            # Поток с драйвером из пула (pooled_driver) не берет второй - пул мог бы исчерпаться
+            if failed and self.workers > 1 and getattr(self._local, 'driver', None) is None:
+                self._log(f"📥 Повторная попытка через браузер: {len(failed)} статей в {self.workers} потоков...")
+                retries = self._run_in_pool(
+                    self._download_article_pdf,
+                    [(result['url'], result['number']) for result in failed]
+                )
+                for result, fallback in zip(failed, retries):
+                    if fallback['success']:
+                        result.update(fallback)
+                        done(result)
+            else:
+                for result in failed:
+                    self._log(f"📥 Повторная попытка через браузер: статья {result['number']}/{len(article_links)}...")
+                    try:
+                        fallback = self._download_article_pdf(result['url'], result['number'])
+                        if fallback['success']:
+                            result.update(fallback)
+                            done(result)
+                            self._log(f"✅ PDF статьи {result['number']} успешно скачан")
+                        else:
+                            self._log(f"❌ Не удалось скачать PDF статьи {result['number']}")
+                            
+                    except Exception as e:
+                        result['error'] = str(e)
+                        self._log(f"⚠️ Ошибка при обработке статьи {result['number']}: {e}")
+            
+            checkpoint.finish()
+            results = sorted(results + downloaded, key=lambda result: result['number'])
+            downloaded_count = sum(1 for result in results if result['success'])
+            self._emit('finish', processed=downloaded_count, total=len(article_links))
+            self._log(f"🎉 Скачивание завершено! Успешно: {downloaded_count}/{len(article_links)}")
+            self._log(self.waiter.report())
+            self._log(self.rate_limiter.report())
+            return results
             
         except Exception as e:
-            print(f"❌ Ошибка при поиске и скачивании: {e}")
-            return 0
+            self._log(f"❌ Ошибка при поиске и скачивании: {e}")
+            return []
     
-    def _find_article_links(self, max_results):
-        """Поиск ссылок на статьи"""
-        article_links = []
-        
-        # Ищем ссылки на статьи
+    def _on_article_done(self, result, checkpoint=None):
+        """Статья обработана: запоминаем в индексе и контрольной точке пакета.
+
+        Побайтовые копии уже известных файлов удаляются. Без checkpoint
+        (массовое скачивание) статья попадает только в индекс - чужую
+        контрольную точку прерванного пакета не трогаем.
+        """
+        if result['success']:
+            kept_path = self.index.record(result['url'], result['filepath'], result['title'])
+            if kept_path != result['filepath']:
+                self._log(f"🗑️ Статья {result['number']} совпадает с {os.path.basename(kept_path)}, копия удалена")
+                result['filepath'] = kept_path
+                result['skipped'] = True
+        if checkpoint is not None:
+            checkpoint.mark(result)
+        self._emit_article(result)
+    
+    def _emit_article(self, result):
+        # После повтора через браузер статья приходит второй раз - интерфейс
+        # считает статьи по номеру
+        self._emit('article', number=result['number'], success=result['success'],
+                   size=result['size'], skipped=result['skipped'])
+    
+    def _get_article_links(self, query, max_results):
+        """Первые max_results ссылок на статьи (при необходимости с нескольких страниц)"""
+        return list(itertools.islice(self._iter_search_links(query), max_results))
+
+    def _iter_search_links(self, query):
+        """Ссылки на статьи со всех страниц выдачи по порядку.
+
+        Следующая страница открывается только когда нужны новые ссылки;
+        обход заканчивается на странице без новых статей.
+        """
+        seen = set()
+        for page in itertools.count(1):
+            new_links = [link for link in self._get_page_links(query, page) if link not in seen]
+            if not new_links:
+                return
+            seen.update(new_links)
+            yield from new_links
+
+    def _search_page_url(self, query, page):
+        search_url = f"{self.base_url}/search?q={quote(query)}"
+        return search_url if page == 1 else f"{search_url}&page={page}"
+
+    def _get_page_links(self, query, page):
+        """Ссылки на статьи одной страницы поиска из кэша или через браузер"""
+        page_url = self._search_page_url(query, page)
+        cached_links = self.cache.get_json(page_url, 'links')
+        if cached_links:
+            self._log(f"📦 Ссылки страницы поиска {page} взяты из кэша")
+            return cached_links
+
+        with self.rate_limiter.request(page_url), metrics.timer("navigation", page="search"):
+            self.driver.get(page_url)
+        if not self.waiter.wait_for(self.driver, 'search'):
+            self._log(f"⚠️ Результаты поиска (страница {page}) не появились за отведенное время")
+
+        if self.debug:
+            with metrics.timer("screenshot"):
+                self.driver.save_screenshot(f"search_page_{page}.png")
+            self._log(f"💾 Скриншот страницы поиска {page} сохранен")
+
+        # Поиск ссылок на статьи
+        article_links = self._find_article_links(self.PAGE_LINK_LIMIT)
+        if article_links:
+            self.cache.put_json(page_url, article_links, 'links')
+        return article_links
+
+    def harvest(self, query, max_articles=1000, workers=8, queue_size=100):
+        """Массовое скачивание статей по запросу со всех страниц выдачи.
+
+        Обход страниц поиска идет в фоне и складывает ссылки в ограниченную
+        очередь, а скачивание забирает их оттуда не больше чем в workers
+        потоков. Список результатов не накапливается (память не растет
+        с числом статей); возвращается сводка со скоростью в статьях в минуту.
+        """
+        self._log(f"🌾 Массовое скачивание по запросу '{query}' (до {max_articles} статей)")
+        meter = ThroughputMeter("PDF", log=self._log)
+        self._emit('start', query=query, total=max_articles)
+        producer = LinkProducer(
+            self._iter_search_links(query), max_articles,
+            queue_size=queue_size, skip=self.index.find_by_url, log=self._log
+        )
+
+        def on_result(result):
+            # Без контрольной точки: повторный запуск пропускает скачанное по индексу
+            self._on_article_done(result)
+            meter.add(result['success'], result['size'])
+
+        downloader = AsyncPDFDownloader(
+            self.download_dir,
+            base_url=self.base_url,
+            max_concurrent_per_host=self.max_concurrent_per_host,
+            safe_filename=self._create_safe_filename,
+            cache=self.cache,
+            rate_limiter=self.rate_limiter,
+            on_result=on_result,
+            log=self._log
+        )
         try:
-            # Метод 1: Поиск по селекторам
-            selectors = [
-                'a[href*="/article/"]',
-                '.search-result a',
-                '.article a',
-                '.item a',
-                '.card a',
-                'h2 a',
-                'h3 a'
-            ]
-            
-            for selector in selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        href = element.get_attribute("href")
-                        if (href and "/article/" in href and 
-                            "search" not in href and 
-                            href not in article_links):
-                            article_links.append(href)
-                            if len(article_links) >= max_results:
-                                return article_links
-                except:
-                    continue
-        except Exception as e:
-            print(f"⚠️ Ошибка при поиске ссылок: {e}")
-        
-        # Если не нашли достаточно ссылок, используем альтернативный метод
-        if len(article_links) < max_results:
-            article_links.extend(self._alternative_find_links(max_results - len(article_links)))
-        
-        return article_links[:max_results]
+            downloader.run_stream(producer.start(), workers=workers)
+        finally:
+            producer.stop()
+
+        summary = meter.summary()
+        summary['skipped'] = producer.skipped
+        self._emit('finish', **summary)
+        self._log(meter.report())
+        self._log(self.rate_limiter.report())
+        self._log(f"⏭️ Пропущено уже скачанных: {producer.skipped}")
+        return summary
     
-    def _alternative_find_links(self, max_links):
-        """Альтернативный метод поиска ссылок"""
-        links = []
+    def _find_article_links(self, max_results):
+        """Поиск ссылок на статьи.
+
+        Сначала - только блоки результатов поиска; все ссылки страницы
+        (боковые панели, похожие статьи) берутся, лишь если в блоках
+        результатов ничего не нашлось.
+        """
+        result_selectors = [
+            '.search-result a',
+            '.article a',
+            '.item a',
+            '.card a',
+            'h2 a',
+            'h3 a'
+        ]
         try:
-            all_anchors = self.driver.find_elements(By.TAG_NAME, "a")
-            for anchor in all_anchors:
-                href = anchor.get_attribute("href")
-                if (href and "/article/" in href and 
-                    "search" not in href and 
-                    href not in links):
-                    links.append(href)
-                    if len(links) >= max_links:
-                        break
-        except:
-            pass
-        return links
+            with metrics.timer("dom", page="search"):
+                links = find_article_links(self.driver, result_selectors, max_results)
+                if not links:
+                    links = find_article_links(self.driver, ['a'], max_results)
+            return links
+        except Exception as e:
+            self._log(f"⚠️ Ошибка при поиске ссылок: {e}")
+            return []
     
     def _download_article_pdf(self, article_url, article_number):
-        """Скачивание PDF статьи"""
+        """Скачивание PDF статьи через браузер, возвращает результат по статье"""
+        result = make_result(article_number, article_url)
         try:
-            print(f"   📄 Переходим на страницу статьи: {article_url}")
-            self.driver.get(article_url)
-            time.sleep(5)
+            self._log(f"   📄 Переходим на страницу статьи: {article_url}")
+            with self.rate_limiter.request(article_url), metrics.timer("navigation", page="article"):
+                self.driver.get(article_url)
+            self.waiter.wait_for(self.driver, 'article')
             
-            # Сохраняем скриншот страницы статьи
-            self.driver.save_screenshot(f"article_page_{article_number}.png")
+            if self.debug:
+                with metrics.timer("screenshot"):
+                    self.driver.save_screenshot(f"article_page_{article_number}.png")
             
             # Получаем заголовок статьи для имени файла
-            title = self._get_article_title()
-            print(f"   📝 Заголовок статьи: {title}")
+            with metrics.timer("dom", page="article"):
+                title = self._get_article_title()
+            result['title'] = title
+            self._log(f"   📝 Заголовок статьи: {title}")
             
             # Ищем кнопку/ссылку скачивания PDF
             pdf_url = self._find_pdf_link()
             
             if pdf_url:
-                print(f"   📎 Найден PDF: {pdf_url}")
-                return self._download_pdf_file(pdf_url, title, article_number)
+                self._log(f"   📎 Найден PDF: {pdf_url}")
+                result['pdf_url'] = pdf_url
+                filepath = self._download_pdf_file(pdf_url, title, article_number, article_url)
             else:
-                print(f"   ❌ PDF ссылка не найдена, пробуем альтернативные методы...")
-                return self._try_alternative_pdf_download(title, article_number)
+                self._log(f"   ❌ PDF ссылка не найдена, пробуем альтернативные методы...")
+                filepath = self._try_alternative_pdf_download(title, article_number, article_url)
+            
+            if filepath:
+                result['filepath'] = filepath
+                result['size'] = os.path.getsize(filepath)
+                result['success'] = True
+            else:
+                result['error'] = "Не удалось скачать PDF"
                 
         except Exception as e:
-            print(f"   ❌ Ошибка при скачивании PDF: {e}")
-            return False
+            self._log(f"   ❌ Ошибка при скачивании PDF: {e}")
+            result['error'] = str(e)
+        
+        return result
     
     def _find_pdf_link(self):
         """Поиск ссылки на PDF"""
@@ -197,99 +470,87 @@ class CyberLeninkaPDFScraper:
             'button[onclick*="download"]'
         ]
         
-        for selector in pdf_selectors:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    # Пробуем получить ссылку разными способами
-                    pdf_url = self._get_pdf_url_from_element(element)
-                    if pdf_url:
-                        return pdf_url
-            except:
-                continue
+        try:
+            with metrics.timer("dom", page="article"):
+                elements = element_attributes(self.driver, pdf_selectors)
+        except Exception:
+            return None
+        
+        for attributes in elements:
+            # Пробуем получить ссылку разными способами
+            pdf_url = self._get_pdf_url_from_element(attributes)
+            if pdf_url:
+                return pdf_url
         
         return None
     
-    def _get_pdf_url_from_element(self, element):
-        """Получение PDF URL из элемента"""
-        try:
-            # Способ 1: Прямая ссылка из href
-            href = element.get_attribute("href")
-            if href and (".pdf" in href or "/pdf/" in href):
-                return href if href.startswith("http") else urljoin(self.base_url, href)
-            
-            # Способ 2: Ссылка из onclick
-            onclick = element.get_attribute("onclick")
-            if onclick:
-                # Ищем URL в onclick
-                url_match = re.search(r"['\"](https?://[^'\"]+\.pdf)['\"]", onclick)
-                if url_match:
-                    return url_match.group(1)
-                
-                # Ищем относительные пути
-                rel_match = re.search(r"['\"](/[^'\"]+\.pdf)['\"]", onclick)
-                if rel_match:
-                    return urljoin(self.base_url, rel_match.group(1))
+    def _get_pdf_url_from_element(self, attributes):
+        """Получение PDF URL из атрибутов элемента (см. element_attributes)"""
+        # Способ 1: Прямая ссылка из href
+        href = attributes.get("href")
+        if href and (".pdf" in href or "/pdf/" in href):
+            return href if href.startswith("http") else urljoin(self.base_url, href)
+        
+        # Способ 2: Ссылка из onclick
+        onclick = attributes.get("onclick")
+        if onclick:
+            # Ищем URL в onclick
+            url_match = re.search(r"['\"](https?://[^'\"]+\.pdf)['\"]", onclick)
+            if url_match:
+                return url_match.group(1)
             
-            # Способ 3: data-атрибуты
-            data_url = element.get_attribute("data-url") or element.get_attribute("data-href")
-            if data_url and (".pdf" in data_url or "/pdf/" in data_url):
-                return data_url if data_url.startswith("http") else urljoin(self.base_url, data_url)
-                
-        except:
-            pass
+            # Ищем относительные пути
+            rel_match = re.search(r"['\"](/[^'\"]+\.pdf)['\"]", onclick)
+            if rel_match:
+                return urljoin(self.base_url, rel_match.group(1))
+        
+        # Способ 3: data-атрибуты
+        data_url = attributes.get("data_url") or attributes.get("data_href")
+        if data_url and (".pdf" in data_url or "/pdf/" in data_url):
+            return data_url if data_url.startswith("http") else urljoin(self.base_url, data_url)
         
         return None
     
-    def _try_alternative_pdf_download(self, title, article_number):
-        """Альтернативные методы скачивания PDF"""
+    def _try_alternative_pdf_download(self, title, article_number, article_url=None):
+        """Альтернативные методы скачивания PDF, возвращает путь к файлу или None.
+
+        Кандидаты (стандартные пути CyberLeninka и ссылки на .pdf из исходного
+        кода страницы) проверяет PDFResolver: сначала шаблон, который уже
+        срабатывал, затем остальные параллельно. Скачивается только найденный.
+        """
         try:
-            # Метод 1: Пробуем стандартный путь PDF на CyberLeninka
             current_url = self.driver.current_url
-            if "/article/" in current_url:
-                # Пробуем стандартный путь к PDF
-                article_id = current_url.split("/article/")[-1]
-                pdf_url = f"{self.base_url}/article/{article_id}.pdf"
-                
-                print(f"   🔄 Пробуем стандартный PDF путь: {pdf_url}")
-                if self._download_pdf_file(pdf_url, title, article_number):
-                    return True
-            
-            # Метод 2: Ищем в исходном коде страницы
-            page_source = self.driver.page_source
-            pdf_matches = re.findall(r'https?://[^"\']+\.pdf', page_source)
-            for pdf_url in pdf_matches:
-                if "cyberleninka" in pdf_url:
-                    print(f"   🔄 Найден PDF в исходном коде: {pdf_url}")
-                    if self._download_pdf_file(pdf_url, title, article_number):
-                        return True
-            
-            # Метод 3: Пробуем через API или другие пути
-            pdf_urls_to_try = [
-                current_url.replace("/article/", "/pdf/"),
-                current_url + ".pdf",
-                current_url + "/download"
+            page_links = [
+                pdf_url for pdf_url in re.findall(r'https?://[^"\']+\.pdf', self.driver.page_source)
+                if "cyberleninka" in pdf_url
             ]
-            
-            for pdf_url in pdf_urls_to_try:
-                print(f"   🔄 Пробуем альтернативный URL: {pdf_url}")
-                if self._download_pdf_file(pdf_url, title, article_number):
-                    return True
-                    
+
+            self._log("   🔄 Ищем PDF по альтернативным адресам...")
+            with metrics.timer("pdf_resolve"):
+                pdf_url = self.pdf_resolver.resolve(current_url, page_links)
+            if pdf_url:
+                self._log(f"   🔗 PDF найден: {pdf_url}")
+                return self._download_pdf_file(pdf_url, title, article_number, article_url or current_url)
+            self._log("   ❌ Ни один альтернативный адрес не отдал PDF")
+
         except Exception as e:
-            print(f"   ❌ Альтернативные методы не сработали: {e}")
+            self._log(f"   ❌ Альтернативные методы не сработали: {e}")
         
-        return False
+        return None
     
-    def _download_pdf_file(self, pdf_url, title, article_number):
-        """Скачивание PDF файла"""
+    def _download_pdf_file(self, pdf_url, title, article_number, article_url=None):
+        """Скачивание PDF файла, возвращает путь к файлу или None.
+
+        article_url задает имя .part-файла: докачка находит файл, начатый
+        aiohttp-загрузчиком, даже если заголовок статьи получился другим.
+        """
         try:
             # Создаем безопасное имя файла
             safe_title = self._create_safe_filename(title)
             filename = f"{article_number:02d}_{safe_title}.pdf"
             filepath = os.path.join(self.download_dir, filename)
             
-            print(f"   💾 Скачиваем PDF в: {filename}")
+            self._log(f"   💾 Скачиваем PDF в: {filename}")
             
             # Используем requests для скачивания
             headers = {
@@ -297,27 +558,41 @@ class CyberLeninkaPDFScraper:
                 'Referer': self.driver.current_url
             }
             
-            response = requests.get(pdf_url, headers=headers, stream=True, timeout=30)
-            response.raise_for_status()
+            entry = self.cache.lookup(pdf_url, 'pdf')
+            if entry and entry['fresh']:
+                if self.cache.copy_to(entry, filepath):
+                    self._log(f"   📦 PDF взят из кэша")
+                    return filepath
+                entry = None
             
-            # Сохраняем файл
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            if entry:
+                headers.update(self.cache.conditional_headers(entry))
             
-            # Проверяем, что файл скачан и не пустой
-            if os.path.exists(filepath) and os.path.getsize(filepath) > 1000:
-                print(f"   ✅ PDF успешно сохранен: {filename} ({os.path.getsize(filepath)} байт)")
-                return True
-            else:
-                print(f"   ❌ Файл слишком маленький или поврежден")
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-                return False
+            # Скачивание во временный .part с докачкой, проверкой %PDF/%%EOF и атомарным переименованием
+            with self.rate_limiter.request(pdf_url) as slot:
+                start = time.perf_counter()
+                response = self.download_manager.download(pdf_url, filepath, headers, key=article_url)
+                elapsed = time.perf_counter() - start
+                slot.set_response(response)
+            metrics.observe("stage_seconds", elapsed, stage="download", client="browser")
+            if response is not None and response.status_code == 304:
+                self.cache.mark_revalidated(entry, response.headers)
+                if self.cache.copy_to(entry, filepath):
+                    return filepath
+                # Блоб вытеснен во время запроса - запись удалена, скачиваем заново
+                return self._download_pdf_file(pdf_url, title, article_number, article_url)
+            if response is not None:
+                metrics.observe_download(os.path.getsize(filepath), elapsed, client="browser")
+                self.cache.put_file(pdf_url, filepath, 'pdf', response.headers)
+                self._log(f"   ✅ PDF успешно сохранен: {filename} ({os.path.getsize(filepath)} байт)")
+                return filepath
+            
+            self._log(f"   ❌ Файл не является корректным PDF")
+            return None
                 
         except Exception as e:
-            print(f"   ❌ Ошибка скачивания PDF: {e}")
-            return False
+            self._log(f"   ❌ Ошибка скачивания PDF: {e}")
+            return None
     
     def _get_article_title(self):
         """Получение заголовка статьи"""
@@ -357,21 +632,39 @@ class CyberLeninkaPDFScraper:
         return safe_title
     
     def close(self):
-        """Закрытие драйвера"""
+        """Закрытие драйвера, пула, кэша и индекса"""
+        if self.pool:
+            self.pool.close()
+        self.index.close()
+        self.pdf_resolver.close()
+        if self._owns_cache:
+            self.cache.close()
         if self.driver:
             self.driver.quit()
 
 # Тестовый скрипт
-def test_pdf_download():
+def test_pdf_download(argv=None):
     """Тестирование скачивания PDF"""
+    arg_parser = argparse.ArgumentParser(description="Тестовое скачивание PDF статей CyberLeninka")
+    arg_parser.add_argument("query", nargs="?", default="машинное обучение")
+    arg_parser.add_argument("-n", "--count", type=int, default=3, help="число статей (по умолчанию 3)")
+    arg_parser.add_argument("--debug", action="store_true", help="сохранять скриншоты страниц")
+    arg_parser.add_argument("--full-browser", action="store_true",
+                            help="обычный профиль Chrome (с картинками, стилями и шрифтами)")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+    
     print("🚀 Тестируем скачивание PDF статей...")
     
-    scraper = CyberLeninkaPDFScraper()
+    scraper = CyberLeninkaPDFScraper(lean=not args.full_browser, debug=args.debug)
     
     try:
-        query = "машинное обучение"
-        result = scraper.search_and_download_articles(query, 3)
-        print(f"📊 Результат: скачано {result} PDF файлов")
+        results = scraper.search_and_download_articles(args.query, args.count)
+        downloaded = [r for r in results if r['success']]
+        print(f"📊 Результат: скачано {len(downloaded)}/{len(results)} PDF файлов")
+        for r in results:
+            status = "✅" if r['success'] else f"❌ {r['error']}"
+            print(f"   {r['number']:02d}. {r['title'] or r['url']} — {status}")
         
         # Показываем скачанные файлы
         download_dir = os.path.abspath(scraper.download_dir)
@@ -385,6 +678,7 @@ def test_pdf_download():
                 
     finally:
         scraper.close()
+        metrics.dump_metrics(args.metrics)
 
 if __name__ == "__main__":
     test_pdf_download()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def canonical_article_url(url):
+    """Канонический URL статьи: https, без www, query, якоря и суффиксов PDF"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    path = parts.path.rstrip("/")
+    for suffix in ("/pdf", ".pdf", "/download"):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    return f"https://{host}{path}"
+
+
+def file_sha256(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DedupIndex:
+    """Индекс скачанных статей между запусками (SQLite).
+
+    Статья ищется по каноническому URL до перехода на страницу,
+    файл - по sha256 содержимого, чтобы на диске не было копий.
+    """
+
+    def __init__(self, download_dir, db_name=".dedup_index.sqlite"):
+        self.download_dir = download_dir
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(download_dir, db_name), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                content_hash TEXT PRIMARY KEY,
+                filepath TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                canonical_url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                title TEXT,
+                downloaded_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS extracted (
+                content_hash TEXT PRIMARY KEY,
+                text_path TEXT,
+                pages INTEGER NOT NULL,
+                error TEXT,
+                extracted_at REAL NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def find_by_url(self, url):
+        """Путь к уже скачанному файлу статьи или None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT files.filepath FROM articles JOIN files USING (content_hash) "
+                "WHERE articles.canonical_url = ?", (canonical_article_url(url),)
+            ).fetchone()
+        if row and os.path.exists(row[0]):
+            return row[0]
+        return None
+
+    def record(self, url, filepath, title=None):
+        """Запись скачанного файла. Если такой файл уже есть, новая копия удаляется.
+
+        Возвращает путь к файлу, который остался на диске.
+        """
+        content_hash = file_sha256(filepath)
+        with self._lock:
+            kept_path = self._add_file(content_hash, filepath)
+            self._db.execute(
+                "INSERT OR REPLACE INTO articles (canonical_url, content_hash, title, downloaded_at) "
+                "VALUES (?, ?, ?, ?)",
+                (canonical_article_url(url), content_hash, title, time.time())
+            )
+            self._db.commit()
+        return kept_path
+
+    def scan_directory(self, remove_duplicates=True):
+        """Индексация PDF, уже лежащих в папке, и удаление побайтовых копий.
+
+        Файлы с неизменными размером и mtime повторно не хэшируются.
+        Возвращает список удаленных копий.
+        """
+        removed = []
+        with self._lock:
+            known = {
+                row[0]: row[1:]
+                for row in self._db.execute("SELECT filepath, size, mtime, content_hash FROM files")
+            }
+            for name in sorted(os.listdir(self.download_dir)):
+                filepath = os.path.join(self.download_dir, name)
+                if not name.lower().endswith(".pdf") or not os.path.isfile(filepath):
+                    continue
+
+                stat = os.stat(filepath)
+                cached = known.get(filepath)
+                if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+                    continue
+
+                kept_path = self._add_file(file_sha256(filepath), filepath, remove_duplicates)
+                if kept_path != filepath:
+                    removed.append(filepath)
+
+            # Забываем файлы, удаленные с диска вручную
+            for filepath in known:
+                if not os.path.exists(filepath):
+                    self._db.execute("DELETE FROM files WHERE filepath = ?", (filepath,))
+            self._db.commit()
+        return removed
+
+    def pending_extraction(self):
+        """PDF, текст которых еще не извлекался: (hash, путь, заголовок, url)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT files.content_hash, files.filepath, articles.title, articles.canonical_url "
+                "FROM files LEFT JOIN articles USING (content_hash) "
+                "WHERE files.content_hash NOT IN (SELECT content_hash FROM extracted) "
+                "GROUP BY files.content_hash ORDER BY files.filepath"
+            ).fetchall()
+        return [row for row in rows if os.path.exists(row[1])]
+
+    def mark_extracted(self, content_hash, text_path, pages, error=None):
+        """Запись результата извлечения текста (с ошибкой файл повторно не берется)"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extracted (content_hash, text_path, pages, error, extracted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_hash, text_path, pages, error, time.time())
+            )
+            self._db.commit()
+
+    def _add_file(self, content_hash, filepath, remove_duplicate=True):
+        row = self._db.execute(
+            "SELECT filepath FROM files WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        if row and row[0] != filepath and os.path.exists(row[0]):
+            if remove_duplicate:
+                os.remove(filepath)
+            return row[0]
+
+        stat = os.stat(filepath)
+        # Файл по этому пути мог быть перезаписан другой статьей
+        self._db.execute(
+            "DELETE FROM files WHERE filepath = ? AND content_hash != ?", (filepath, content_hash)
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO files (content_hash, filepath, size, mtime) VALUES (?, ?, ?, ?)",
+            (content_hash, filepath, stat.st_size, stat.st_mtime)
+        )
+        return filepath
+
+    def close(self):
+        with self._lock:
+            self._db.close()
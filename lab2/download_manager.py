@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+
+PART_SUFFIX = ".part"
+# Рядом с .part хранится валидатор ответа (ETag/Last-Modified) для If-Range
+VALIDATOR_SUFFIX = ".json"
+
+
+def part_path(filepath, key=None):
+    """Временный файл, в который идет скачивание до проверки.
+
+    key - адрес статьи: имя .part от него не зависит от заголовка, который
+    у aiohttp и у браузера может получиться разным, и докачка находит файл.
+    """
+    if key is None:
+        return filepath + PART_SUFFIX
+    digest = hashlib.sha1(key.split("#")[0].rstrip("/").encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.dirname(filepath), f".download_{digest}{PART_SUFFIX}")
+
+
+def resume_offset(part):
+    """Сколько байт уже скачано в .part-файл"""
+    try:
+        return os.path.getsize(part)
+    except OSError:
+        return 0
+
+
+def range_headers(offset):
+    return {'Range': f"bytes={offset}-"} if offset else {}
+
+
+def discard_part(part):
+    for path in (part, part + VALIDATOR_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def save_validator(part, headers):
+    """Запоминание валидатора ответа, с которого начат .part.
+
+    Для If-Range годится только сильный ETag; иначе - Last-Modified.
+    Без валидатора докачка небезопасна, и .part потом начнется заново.
+    """
+    etag = headers.get('ETag')
+    validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+    if validator:
+        with open(part + VALIDATOR_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump({'validator': validator}, f)
+    elif os.path.exists(part + VALIDATOR_SUFFIX):
+        os.remove(part + VALIDATOR_SUFFIX)
+
+
+def resume_request(part):
+    """(offset, заголовки) для продолжения .part.
+
+    Range отправляется вместе с If-Range: если PDF на сервере изменился,
+    сервер отдаст его целиком (200), и новые байты не допишутся к старым.
+    .part без сохраненного валидатора удаляется - скачивание с нуля.
+    """
+    offset = resume_offset(part)
+    if not offset:
+        return 0, {}
+    try:
+        with open(part + VALIDATOR_SUFFIX, "r", encoding="utf-8") as f:
+            validator = json.load(f)['validator']
+    except (OSError, ValueError, KeyError):
+        discard_part(part)
+        return 0, {}
+    return offset, dict(range_headers(offset), **{'If-Range': validator})
+
+
+def is_valid_pdf(path):
+    """PDF начинается с %PDF и заканчивается трейлером %%EOF"""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(1024)
+            f.seek(max(0, size - 2048))
+            tail = f.read()
+    except OSError:
+        return False
+    return b"%PDF" in head and b"%%EOF" in tail
+
+
+def commit_pdf(filepath, part=None):
+    """Проверка .part-файла и атомарное переименование в итоговый файл.
+
+    Возвращает True, если файл прошел проверку. Испорченный .part удаляется.
+    """
+    temp_path = part or part_path(filepath)
+    if not is_valid_pdf(temp_path):
+        discard_part(temp_path)
+        return False
+
+    with open(temp_path, "ab") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, filepath)
+    discard_part(temp_path)
+    return True
+
+
+class DownloadManager:
+    """Докачиваемое скачивание PDF через requests.
+
+    Данные пишутся в .part-файл; после обрыва скачивание продолжается
+    запросом Range (с If-Range) с места остановки, а готовый файл
+    проверяется (%PDF / %%EOF) и атомарно переименовывается.
+    """
+
+    def __init__(self, session=None, chunk_size=64 * 1024, timeout=30, log=print):
+        self.session = session or requests.Session()
+        # log - вывод сообщений (лог скрапера, чтобы они попадали и в интерфейс)
+        self.log = log
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    def download(self, url, filepath, headers=None, key=None):
+        """Скачивание url в filepath.
+
+        key - адрес статьи для имени .part (см. part_path). Возвращает
+        response (для заголовков кэша; 304 - файл не изменился) или None,
+        если скачанное не является корректным PDF.
+        """
+        part = part_path(filepath, key)
+        offset, resume_headers = resume_request(part)
+        request_headers = dict(headers or {})
+        if offset:
+            # При докачке условные заголовки кэша не нужны - продолжаем .part
+            request_headers = {name: value for name, value in request_headers.items() if not name.startswith("If-")}
+            request_headers.update(resume_headers)
+
+        response = self.session.get(url, headers=request_headers, stream=True, timeout=self.timeout)
+        with response:
+            if response.status_code == 304:
+                return response
+            if response.status_code == 416 and offset:
+                # Все уже скачано до обрыва - осталось проверить файл
+                return response if commit_pdf(filepath, part) else None
+            response.raise_for_status()
+            if 'html' in response.headers.get('Content-Type', ''):
+                return None
+
+            # 206 - сервер продолжил с offset, 200 - отдает файл заново
+            mode = "ab" if response.status_code == 206 else "wb"
+            if offset and mode == "ab":
+                self.log(f"   ⏯️ Докачка с {offset} байт")
+            else:
+                save_validator(part, response.headers)
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+
+        return response if commit_pdf(filepath, part) else None
+
+
+class BatchCheckpoint:
+    """Контрольная точка пакета статей: после падения пакет продолжается с места остановки"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def resume(self, query, max_results):
+        """Ссылки незавершенного пакета для того же запроса или None"""
+        state = self.state
+        if state and state.get('query') == query and state.get('max_results') == max_results:
+            return [article['url'] for article in state['articles']]
+        return None
+
+    def start(self, query, max_results, article_links):
+        with self._lock:
+            if self.resume(query, max_results) != article_links:
+                self.state = {
+                    'query': query,
+                    'max_results': max_results,
+                    'started_at': time.time(),
+                    'articles': [
+                        {'number': i, 'url': url, 'status': 'pending', 'filepath': None}
+                        for i, url in enumerate(article_links, 1)
+                    ]
+                }
+            self._save()
+
+    def mark(self, result):
+        """Запись результата статьи (вызывается сразу после ее обработки)"""
+        with self._lock:
+            if not self.state:
+                return
+            for article in self.state['articles']:
+                if article['number'] == result['number']:
+                    article['status'] = 'done' if result['success'] else 'failed'
+                    article['filepath'] = result['filepath']
+            self._save()
+
+    def finish(self):
+        """Пакет завершен - контрольная точка больше не нужна"""
+        with self._lock:
+            self.state = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -1,18 +1,66 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
 from cyberleninka_pdf import CyberLeninkaPDFScraper
+from common.driver_bootstrap import startup_report
+from common.events import EventChannel
+from common import metrics
 import os
+import time
 import webbrowser
 
 class CyberLeninkaPDFGUI:
-    def __init__(self, root):
+    MAX_ARTICLES = 5000
+    # Above this count articles are collected from all search pages
+    HARVEST_THRESHOLD = 50
+    # Events from the scraper are drained in batches on this timer
+    EVENT_POLL_MS = 100
+    EVENT_BATCH = 500
+    MAX_LOG_LINES = 5000
+    
+    def __init__(self, root, debug=False):
         self.root = root
+        # Debug mode: the scraper saves page screenshots
+        self.debug = debug
         self.root.title("CyberLeninka PDF Downloader")
         self.root.geometry("900x600")
         
-        self.scraper = CyberLeninkaPDFScraper()
+        # Chrome запускается в фоне, чтобы окно появилось сразу
+        self.scraper = None
+        self.events = EventChannel()
+        self._reset_run_progress(0)
         self.setup_ui()
+        self._start_scraper()
+        self.root.after(self.EVENT_POLL_MS, self._poll_events)
+        
+    def _start_scraper(self):
+        """Фоновый запуск браузера"""
+        self.download_button.config(state='disabled')
+        self.status_var.set("⏳ Запуск браузера...")
+        
+        thread = threading.Thread(target=self._create_scraper)
+        thread.daemon = True
+        thread.start()
+        
+    def _create_scraper(self):
+        try:
+            scraper = CyberLeninkaPDFScraper(workers=2, events=self.events, debug=self.debug)
+        except Exception as e:
+            self.root.after(0, self._scraper_failed, str(e))
+            return
+        self.root.after(0, self._scraper_ready, scraper)
+        
+    def _scraper_ready(self, scraper):
+        self.scraper = scraper
+        self.download_button.config(state='normal')
+        self.status_var.set("Готов к работе")
+        self.log_message(startup_report())
+        
+    def _scraper_failed(self, error_msg):
+        self.status_var.set("❌ Не удалось запустить браузер")
+        self.log_message(f"❌ Ошибка запуска браузера: {error_msg}")
+        messagebox.showerror("Ошибка", f"Не удалось запустить браузер:\n{error_msg}")
         
     def setup_ui(self):
         # Main frame
@@ -50,17 +98,27 @@ class CyberLeninkaPDFGUI:
         self.search_entry.bind('<Return>', lambda e: self.start_download())
         self.search_entry.focus()
         
+        ttk.Label(search_frame, text="Статей:").grid(row=0, column=1, padx=(0, 4))
+        self.count_var = tk.IntVar(value=12)
+        self.count_spinbox = ttk.Spinbox(search_frame,
+                                         from_=1,
+                                         to=self.MAX_ARTICLES,
+                                         textvariable=self.count_var,
+                                         width=6)
+        self.count_spinbox.grid(row=0, column=2, padx=(0, 12))
+        
         self.download_button = ttk.Button(search_frame, 
-                                         text="📥 Найти и скачать 12 PDF", 
+                                         text="📥 Найти и скачать PDF", 
                                          command=self.start_download, 
                                          width=20,
                                          style='Accent.TButton')
-        self.download_button.grid(row=0, column=1)
+        self.download_button.grid(row=0, column=3)
         
         # Info section
-        info_text = ("Программа найдет первые 12 статей по вашему запросу "
+        info_text = ("Программа найдет указанное число статей по вашему запросу "
                     "и попытается скачать их в формате PDF.\n"
-                    "Это может занять 2-3 минуты.")
+                    f"Больше {self.HARVEST_THRESHOLD} статей скачиваются в режиме массового сбора "
+                    "со всех страниц поиска.")
         info_label = ttk.Label(main_frame, 
                               text=info_text,
                               font=('Arial', 9), 
@@ -133,10 +191,68 @@ class CyberLeninkaPDFGUI:
         style.configure('Accent.TButton', foreground='white', background='#28a745')
         
     def log_message(self, message):
-        """Add message to log"""
-        self.log_text.insert(tk.END, f"{message}\n")
+        """Add message to log (main thread only; workers go through self.events)"""
+        self._append_log([message])
+        
+    def _append_log(self, messages):
+        """Insert a batch of log lines with a single widget update"""
+        self.log_text.insert(tk.END, "".join(f"{message}\n" for message in messages))
+        lines = int(self.log_text.index('end-1c').split('.')[0])
+        if lines > self.MAX_LOG_LINES:
+            self.log_text.delete(1.0, f"{lines - self.MAX_LOG_LINES}.0")
         self.log_text.see(tk.END)
-        self.root.update()
+        
+    def _reset_run_progress(self, total):
+        self.run_total = total
+        self.run_done = set()
+        self.run_succeeded = set()
+        self.run_started = time.time()
+        
+    def _poll_events(self):
+        """Timer: drain scraper events and reschedule"""
+        self._drain_events()
+        self.root.after(self.EVENT_POLL_MS, self._poll_events)
+        
+    def _flush_events(self):
+        """Apply everything the finished worker has emitted before its result"""
+        while self._drain_events():
+            pass
+        
+    def _drain_events(self):
+        """Apply one batch of scraper events: log lines in one insert, then progress"""
+        events = self.events.drain(self.EVENT_BATCH)
+        messages = []
+        progressed = False
+        for event in events:
+            if event['kind'] == 'log':
+                messages.append(event['message'])
+            elif event['kind'] == 'start':
+                self._reset_run_progress(event['total'])
+                progressed = True
+            elif event['kind'] == 'article':
+                # An article retried through the browser is reported twice
+                self.run_done.add(event['number'])
+                if event['success']:
+                    self.run_succeeded.add(event['number'])
+                progressed = True
+        if messages:
+            self._append_log(messages)
+        if progressed:
+            self._show_run_progress()
+        return len(events)
+            
+    def _show_run_progress(self):
+        """Per-article progress and throughput of the current run"""
+        if not self.run_total:
+            return
+        done = len(self.run_done)
+        percent = min(100, done * 100 / self.run_total)
+        elapsed = max(time.time() - self.run_started, 1e-6)
+        self.progress['value'] = percent
+        self.progress_label.config(text=f"{int(percent)}%")
+        self.status_var.set(f"📥 Обработано статей: {done}/{self.run_total}")
+        self.stats_var.set(f"Скачано PDF: {len(self.run_succeeded)}, "
+                           f"скорость: {done * 60 / elapsed:.1f} статей в минуту")
         
     def start_download(self):
         """Start PDF download process"""
@@ -144,6 +260,16 @@ class CyberLeninkaPDFGUI:
         if not query:
             messagebox.showwarning("Предупреждение", "Введите поисковый запрос")
             return
+        if self.scraper is None:
+            messagebox.showinfo("Информация", "Браузер еще запускается, подождите несколько секунд")
+            return
+        try:
+            count = int(self.count_var.get())
+        except (tk.TclError, ValueError):
+            count = 0
+        if not 1 <= count <= self.MAX_ARTICLES:
+            messagebox.showwarning("Предупреждение", f"Число статей должно быть от 1 до {self.MAX_ARTICLES}")
+            return
             
         # Disable button during operation
         self.download_button.config(state='disabled')
@@ -157,26 +283,32 @@ class CyberLeninkaPDFGUI:
         
         self.log_message("=" * 60)
         self.log_message(f"🎯 ЗАПУСК: поиск и скачивание PDF статей")
-        self.log_message(f"🔍 Запрос: '{query}'")
+        self.log_message(f"🔍 Запрос: '{query}', статей: {count}")
         self.log_message("⏳ Ожидайте, это может занять 2-3 минуты...")
         self.log_message("")
         
         # Run download in separate thread
-        thread = threading.Thread(target=self._perform_pdf_download, args=(query,))
+        thread = threading.Thread(target=self._perform_pdf_download, args=(query, count))
         thread.daemon = True
         thread.start()
         
-    def _perform_pdf_download(self, query):
+    def _perform_pdf_download(self, query, count):
         """Perform PDF download operation"""
         try:
             # Update progress
-            self.root.after(0, self._update_progress, 10, "Поиск статей...")
+            self.root.after(0, self._update_progress, 0, "Поиск статей...")
+            
+            if count > self.HARVEST_THRESHOLD:
+                # Large batches: stream links from all search pages
+                summary = self.scraper.harvest(query, count)
+                self.root.after(0, self._harvest_complete, summary, count)
+                return
             
             # Perform search and download
-            downloaded_count = self.scraper.search_and_download_articles(query, 12)
+            results = self.scraper.search_and_download_articles(query, count)
             
             # Operation complete
-            self.root.after(0, self._download_complete, downloaded_count)
+            self.root.after(0, self._download_complete, results, count)
             
         except Exception as e:
             self.root.after(0, self._download_error, str(e))
@@ -187,18 +319,27 @@ class CyberLeninkaPDFGUI:
         self.progress_label.config(text=f"{int(value)}%")
         self.status_var.set(status)
         
-    def _download_complete(self, downloaded_count):
+    def _download_complete(self, results, count):
         """Handle download completion"""
+        self._flush_events()
         self.progress['value'] = 100
         self.progress_label.config(text="100%")
         
+        downloaded_count = sum(1 for result in results if result['success'])
+        
+        self.log_message("")
+        for result in results:
+            if result['success']:
+                self.log_message(f"✅ {result['number']:02d}. {os.path.basename(result['filepath'])} ({result['size']} байт)")
+            else:
+                self.log_message(f"❌ {result['number']:02d}. {result['url']} — {result['error']}")
         self.log_message("")
         self.log_message("=" * 60)
         self.log_message(f"🎉 СКАЧИВАНИЕ ЗАВЕРШЕНО!")
-        self.log_message(f"📊 Скачано PDF файлов: {downloaded_count}/12")
+        self.log_message(f"📊 Скачано PDF файлов: {downloaded_count}/{count}")
         self.log_message(f"💾 Папка с файлами: {os.path.abspath(self.scraper.download_dir)}")
         
-        self.status_var.set(f"✅ Готово! Скачано: {downloaded_count}/12 PDF")
+        self.status_var.set(f"✅ Готово! Скачано: {downloaded_count}/{count} PDF")
         self.stats_var.set(f"Результат: {downloaded_count} PDF файлов")
         
         # Re-enable button
@@ -215,9 +356,29 @@ class CyberLeninkaPDFGUI:
             messagebox.showwarning("Внимание", 
                                  "Не удалось скачать PDF файлы.\n"
                                  "Возможно, статьи не имеют PDF версий или требуется обход защиты.")
+    
+    def _harvest_complete(self, summary, count):
+        """Handle harvest mode completion"""
+        self._flush_events()
+        self.progress['value'] = 100
+        self.progress_label.config(text="100%")
+        
+        downloaded_count = summary['processed'] + summary['skipped']
+        self.log_message("")
+        self.log_message("=" * 60)
+        self.log_message(f"🎉 МАССОВОЕ СКАЧИВАНИЕ ЗАВЕРШЕНО!")
+        self.log_message(f"📊 Скачано PDF файлов: {summary['processed']}, ошибок: {summary['failed']}, "
+                         f"уже были скачаны: {summary['skipped']}")
+        self.log_message(f"⚡ Скорость: {summary['per_minute']:.1f} статей в минуту")
+        self.log_message(f"💾 Папка с файлами: {os.path.abspath(self.scraper.download_dir)}")
+        
+        self.status_var.set(f"✅ Готово! Скачано: {downloaded_count}/{count} PDF")
+        self.stats_var.set(f"Результат: {downloaded_count} PDF файлов")
+        self.download_button.config(state='normal')
         
     def _download_error(self, error_msg):
         """Handle download errors"""
+        self._flush_events()
         self.status_var.set("❌ Ошибка")
         self.log_message(f"❌ КРИТИЧЕСКАЯ ОШИБКА: {error_msg}")
         
@@ -231,7 +392,7 @@ class CyberLeninkaPDFGUI:
     def open_download_folder(self):
         """Open download folder in file explorer"""
         try:
-            download_path = os.path.abspath(self.scraper.download_dir)
+            download_path = os.path.abspath(CyberLeninkaPDFScraper.DOWNLOAD_DIR)
             if os.path.exists(download_path):
                 os.startfile(download_path)
                 self.log_message(f"📁 Открыта папка: {download_path}")
@@ -252,12 +413,17 @@ class CyberLeninkaPDFGUI:
     
     def __del__(self):
         """Cleanup on exit"""
-        if hasattr(self, 'scraper'):
+        if getattr(self, 'scraper', None):
             self.scraper.close()
 
-def main():
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="CyberLeninka PDF Downloader")
+    arg_parser.add_argument("--debug", action="store_true", help="сохранять скриншоты страниц")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+    
     root = tk.Tk()
-    app = CyberLeninkaPDFGUI(root)
+    app = CyberLeninkaPDFGUI(root, debug=args.debug)
     
     # Center window
     root.update_idletasks()
@@ -268,7 +434,9 @@ def main():
     try:
         root.mainloop()
     finally:
-        app.scraper.close()
+        if app.scraper:
+            app.scraper.close()
+        metrics.dump_metrics(args.metrics)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
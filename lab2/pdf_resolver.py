@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+import threading
+import functools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+PATTERNS_FILE = os.path.join(os.path.expanduser("~"), ".cache", "cyberleninka", "pdf_patterns.json")
+
+# Шаблоны адреса PDF по адресу статьи в порядке по умолчанию
+URL_PATTERNS = {
+    'pdf_suffix': lambda article_url: article_url + ".pdf",
+    'page_link': None,   # ссылки на .pdf из исходного кода страницы
+    'pdf_path': lambda article_url: article_url.replace("/article/", "/pdf/"),
+    'pdf_subpath': lambda article_url: article_url + "/pdf",
+    'download': lambda article_url: article_url + "/download"
+}
+
+
+class PatternCache:
+    """Какие шаблоны адреса PDF срабатывали на каждом хосте (JSON-файл).
+
+    record() меняет только статистику в памяти; файл переписывается
+    в save() - один раз на поиск PDF, а не на каждую проверку.
+    """
+
+    def __init__(self, path=PATTERNS_FILE, log=print):
+        self.path = path
+        self.log = log
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def ranked(self, host):
+        """Шаблоны хоста: сначала по числу успехов, при равенстве - в порядке по умолчанию"""
+        with self._lock:
+            host_stats = self.stats.get(host, {})
+            defaults = list(URL_PATTERNS)
+            return sorted(defaults, key=lambda pattern: (
+                -host_stats.get(pattern, {}).get('hits', 0)
+                + host_stats.get(pattern, {}).get('misses', 0) * 0.1,
+                defaults.index(pattern)
+            ))
+
+    def best(self, host):
+        """Лучший известный шаблон хоста или None, если успехов еще не было"""
+        pattern = self.ranked(host)[0]
+        with self._lock:
+            return pattern if self.stats.get(host, {}).get(pattern, {}).get('hits') else None
+
+    def record(self, host, pattern, success):
+        with self._lock:
+            pattern_stats = self.stats.setdefault(host, {}).setdefault(pattern, {'hits': 0, 'misses': 0})
+            pattern_stats['hits' if success else 'misses'] += 1
+            self._dirty = True
+
+    def save(self):
+        """Запись статистики в файл, если она менялась с прошлого сохранения"""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.stats, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                self.log(f"⚠️ Не удалось сохранить шаблоны PDF: {e}")
+
+
+class PDFResolver:
+    """Поиск рабочего адреса PDF среди кандидатов.
+
+    Сначала одним запросом проверяется шаблон, который уже срабатывал
+    на этом хосте; если его нет или он не подошел, остальные кандидаты
+    проверяются параллельно запросами HEAD (или GET первых байт, если
+    HEAD не дал ответа). Ответ возвращается по первой удачной проверке,
+    не дожидаясь остальных: их итог записывается в PatternCache
+    по завершении (done-callback).
+    """
+
+    def __init__(self, session, patterns=None, rate_limiter=None, cache=None, timeout=10, max_workers=5):
+        self.session = session
+        self.patterns = PatternCache() if patterns is None else patterns
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-probe")
+
+    def candidates(self, article_url, page_links=()):
+        """Пары (шаблон, URL) в порядке приоритета для хоста; URL не повторяются"""
+        article_url = article_url.split("#")[0].split("?")[0].rstrip("/")
+        host = urlsplit(article_url).netloc
+        result = []
+        seen = set()
+        for pattern in self.patterns.ranked(host):
+            if pattern == 'page_link':
+                urls = list(page_links)
+            else:
+                urls = [URL_PATTERNS[pattern](article_url)]
+            for url in urls:
+                if url not in seen:
+                    seen.add(url)
+                    result.append((pattern, url))
+        return result
+
+    def resolve(self, article_url, page_links=(), referer=None):
+        """URL, по которому отдается PDF, или None"""
+        try:
+            return self._resolve(article_url, page_links, referer)
+        finally:
+            self.patterns.save()
+
+    def _resolve(self, article_url, page_links, referer):
+        candidates = self.candidates(article_url, page_links)
+        if not candidates:
+            return None
+        host = urlsplit(article_url).netloc
+        headers = {'User-Agent': USER_AGENT, 'Referer': referer or article_url}
+
+        # Уже скачанный раньше PDF не требует запросов: запись кэша говорит, что
+        # URL отдает PDF; если блоб успеют вытеснить, скачивание пойдет в сеть
+        if self.cache:
+            for pattern, url in candidates:
+                entry = self.cache.lookup(url, 'pdf')
+                if entry and entry['fresh']:
+                    return url
+
+        # Выученный шаблон - один запрос вместо перебора
+        best = self.patterns.best(host)
+        if best and candidates[0][0] == best:
+            pattern, url = candidates[0]
+            success = self.probe(url, headers)
+            self.patterns.record(host, pattern, success)
+            if success:
+                return url
+            candidates = candidates[1:]
+
+        futures = {}
+        for pattern, url in candidates:
+            future = self._executor.submit(self.probe, url, headers)
+            futures[future] = url
+            future.add_done_callback(functools.partial(self._record, host, pattern))
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.result():
+                    # Еще не начатые проверки не нужны, начатые дорабатывают в фоне
+                    for other in pending:
+                        other.cancel()
+                    return futures[future]
+        return None
+
+    def _record(self, host, pattern, future):
+        if not future.cancelled():
+            self.patterns.record(host, pattern, future.result())
+
+    def probe(self, url, headers):
+        """Отдает ли url PDF: HEAD по типу содержимого, при сомнении - первые байты"""
+        try:
+            response = self._request("head", url, headers, allow_redirects=True)
+            content_type = response.headers.get('Content-Type', '').lower()
+            if response.status_code in (200, 206):
+                if 'pdf' in content_type:
+                    return True
+                if 'html' in content_type:
+                    return False
+            elif response.status_code not in (403, 405, 501):
+                # Сервер мог не поддерживать HEAD - тогда пробуем GET
+                return False
+
+            range_headers = dict(headers, Range="bytes=0-1023")
+            response = self._request("get", url, range_headers, stream=True)
+            with response:
+                if response.status_code not in (200, 206):
+                    return False
+                head = next(response.iter_content(chunk_size=1024), b"")
+            return head.lstrip().startswith(b"%PDF")
+        except Exception:
+            return False
+
+    def _request(self, method, url, headers, **kwargs):
+        if self.rate_limiter is None:
+            return self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+        with self.rate_limiter.request(url) as slot:
+            response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            slot.set_response(response)
+            return response
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.patterns.save()
+
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PyPDF2 import PdfReader
+
+from dedup_index import DedupIndex
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "lab3")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from article_store import ArticleStore
+from common import metrics
+
+
+# Тексты кладутся в формате папок lab3 (articles/<имя>/<имя>.txt + metadata.json)
+# и сразу загружаются в хранилище статей lab3, чтобы их подхватили
+# пересказ (lab3/summarizer.py) и локальный поиск
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, "lab3", "articles")
+SUMMARIZER_PATH = os.path.join(ROOT_DIR, "lab3", "summarizer.py")
+PAGE_SEPARATOR = "\n\n"
+
+
+def extract_pdf(content_hash, pdf_path, output_dir, title=None, url=None):
+    """Извлечение текста PDF постранично в <output_dir>/<имя>/<имя>.txt.
+
+    Выполняется в процессе пула. Страницы разбираются по одной и сразу
+    пишутся в файл, поэтому весь текст документа в памяти не держится.
+    """
+    name = "pdf_" + os.path.splitext(os.path.basename(pdf_path))[0]
+    article_dir = os.path.join(output_dir, name)
+    os.makedirs(article_dir, exist_ok=True)
+    text_path = os.path.join(article_dir, f"{name}.txt")
+
+    result = {'content_hash': content_hash, 'pdf_path': pdf_path, 'text_path': None,
+              'pages': 0, 'chars': 0, 'error': None, 'elapsed': 0.0}
+    start = time.perf_counter()
+    try:
+        reader = PdfReader(pdf_path)
+        with open(text_path + ".part", "w", encoding="utf-8") as f:
+            for page in reader.pages:
+                text = _clean_page_text(page.extract_text() or "")
+                if result['pages']:
+                    f.write(PAGE_SEPARATOR)
+                f.write(text)
+                result['pages'] += 1
+                result['chars'] += len(text)
+        os.replace(text_path + ".part", text_path)
+
+        # Метаданные PDF часто содержат имя макета или журнала, а не статьи
+        document_title = title or _filename_title(pdf_path)
+        metadata = {
+            'title': document_title,
+            'url': url,
+            'filename': name,
+            'source_pdf': os.path.abspath(pdf_path),
+            'content_hash': content_hash,
+            'pages': result['pages'],
+            'files': {
+                'text': f"{name}.txt"
+            }
+        }
+        with open(os.path.join(article_dir, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        result['text_path'] = text_path
+    except Exception as e:
+        result['error'] = str(e)
+        if os.path.exists(text_path + ".part"):
+            os.remove(text_path + ".part")
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def _clean_page_text(text):
+    # Переносы слов по слогам и лишние пробелы в конце строк
+    text = re.sub(r'(\w)-\n(\w)', r'\1\2', text)
+    return re.sub(r'[ \t]+\n', '\n', text).strip()
+
+
+def _filename_title(pdf_path):
+    # "07_Название статьи.pdf" -> "Название статьи"
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    return re.sub(r'^\d+_', '', stem)
+
+
+class PDFTextExtractor:
+    """Параллельное извлечение текста скачанных PDF.
+
+    Какие файлы уже обработаны, хранится в индексе дубликатов (по sha256),
+    поэтому повторный запуск берет только новые PDF. Извлеченный текст
+    записывается в хранилище статей lab3 в output_dir.
+    """
+
+    def __init__(self, download_dir, output_dir=DEFAULT_OUTPUT_DIR, processes=None, index=None, store=None):
+        self.download_dir = download_dir
+        self.output_dir = output_dir
+        self.processes = processes
+        self._owns_index = index is None
+        self.index = DedupIndex(download_dir) if index is None else index
+        self._owns_store = store is None
+        self.store = ArticleStore(output_dir) if store is None else store
+
+    def run(self):
+        """Извлечение текста всех новых PDF, возвращает статистику"""
+        self.index.scan_directory()
+        jobs = self.index.pending_extraction()
+        stats = {'files': len(jobs), 'extracted': 0, 'failed': 0, 'pages': 0, 'elapsed': 0.0}
+        if not jobs:
+            return stats
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = [
+                executor.submit(extract_pdf, content_hash, pdf_path, self.output_dir, title, url)
+                for content_hash, pdf_path, title, url in jobs
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                metrics.observe("stage_seconds", result['elapsed'], stage="pdf_text", mode="process")
+                metrics.count("pdf_pages_total", result['pages'])
+                self.index.mark_extracted(result['content_hash'], result['text_path'],
+                                          result['pages'], result['error'])
+                name = os.path.basename(result['pdf_path'])
+                if result['error']:
+                    stats['failed'] += 1
+                    print(f"   ❌ {name}: {result['error']}")
+                else:
+                    # Процессы пула пишут только файлы, в SQLite пишет один родитель
+                    self.store.import_folders(self.output_dir, [_article_name(result['text_path'])], replace=True)
+                    stats['extracted'] += 1
+                    stats['pages'] += result['pages']
+                    print(f"   📄 {name}: {result['pages']} стр., {result['chars']} символов")
+        stats['elapsed'] = time.perf_counter() - started
+        return stats
+
+    def close(self):
+        if self._owns_index:
+            self.index.close()
+        if self._owns_store:
+            self.store.close()
+
+
+def _article_name(text_path):
+    # <output_dir>/<имя>/<имя>.txt -> <имя>
+    return os.path.basename(os.path.dirname(text_path))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Извлечение текста из скачанных PDF")
+    arg_parser.add_argument("--pdf-dir", default="downloaded_articles_pdf",
+                            help="папка со скачанными PDF")
+    arg_parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR,
+                            help="папка для текстов (по умолчанию lab3/articles)")
+    arg_parser.add_argument("-j", "--processes", type=int, default=None,
+                            help="число процессов (по умолчанию - число ядер)")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    if not os.path.isdir(args.pdf_dir):
+        print(f"❌ Папка не найдена: {args.pdf_dir}")
+        return 1
+
+    extractor = PDFTextExtractor(args.pdf_dir, args.output, args.processes)
+    try:
+        print(f"📑 Извлечение текста из PDF в {args.pdf_dir}...")
+        stats = extractor.run()
+    finally:
+        extractor.close()
+
+    if not stats['files']:
+        print("✅ Новых PDF нет - все тексты уже извлечены")
+        return 0
+    print(f"✅ Извлечено: {stats['extracted']}/{stats['files']} файлов, {stats['pages']} страниц "
+          f"за {stats['elapsed']:.1f} с")
+    print(f"🧠 Пересказ: python \"{SUMMARIZER_PATH}\" \"{os.path.abspath(args.output)}\"")
+    metrics.dump_metrics(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
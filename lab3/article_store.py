@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+
+STORE_FILENAME = ".articles.sqlite"
+TEXT_FIELDS = ('content', 'annotation', 'summary')
+# Поля metadata.json папки, которые хранятся в отдельных столбцах или не нужны
+FOLDER_FIELDS = ('title', 'url', 'filename', 'files')
+
+
+def format_original(title, url, content):
+    """Текст вкладки "Оригинал" (раньше хранился отдельным файлом .pdf)"""
+    header = f"=== Оригинал статьи ===\nНазвание: {title}\nURL: {url}\n" + "=" * 50 + "\n\n"
+    return header + (content[:2000] + "..." if len(content) > 2000 else content)
+
+
+def _pack(text):
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def _unpack(blob):
+    return zlib.decompress(blob).decode("utf-8") if blob is not None else None
+
+
+class ArticleStore:
+    """Все статьи в одном файле SQLite: тексты сжаты zlib, доступ по имени статьи.
+
+    Заменяет пять файлов на статью (.pdf, .txt, _sh.txt, _an.txt,
+    metadata.json); прежняя раскладка по папкам получается через export().
+    """
+
+    def __init__(self, articles_dir, db_name=STORE_FILENAME):
+        self.articles_dir = articles_dir
+        os.makedirs(articles_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(articles_dir, db_name), check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS articles (
+                filename TEXT PRIMARY KEY,
+                title TEXT,
+                url TEXT,
+                content BLOB,
+                annotation BLOB,
+                summary BLOB,
+                metadata TEXT,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def put(self, filename, title, url, content, annotation, summary, metadata=None):
+        """Запись статьи целиком одной транзакцией"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO articles "
+                "(filename, title, url, content, annotation, summary, metadata, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (filename, title, url, _pack(content), _pack(annotation), _pack(summary),
+                 json.dumps(metadata or {}, ensure_ascii=False), time.time())
+            )
+            self._db.commit()
+
+    def set_summary(self, filename, summary):
+        with self._lock:
+            self._db.execute(
+                "UPDATE articles SET summary = ?, updated_at = ? WHERE filename = ?",
+                (_pack(summary), time.time(), filename)
+            )
+            self._db.commit()
+
+    def __contains__(self, filename):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM articles WHERE filename = ?", (filename,)
+            ).fetchone() is not None
+
+    def get(self, filename, fields=TEXT_FIELDS):
+        """Статья по имени или None; распаковываются только запрошенные поля"""
+        columns = ", ".join(('title', 'url', 'metadata') + tuple(fields))
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {columns} FROM articles WHERE filename = ?", (filename,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        article = {
+            'filename': filename,
+            'title': row[0],
+            'url': row[1],
+            'metadata': json.loads(row[2] or "{}")
+        }
+        for field, blob in zip(fields, row[3:]):
+            article[field] = _unpack(blob)
+        return article
+
+    def filenames(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT filename FROM articles ORDER BY filename")]
+
+    def folder_names(self, source_dir=None):
+        """Статьи в раскладке по папкам: <имя>/<имя>.txt в source_dir"""
+        source_dir = source_dir or self.articles_dir
+        return [
+            name for name in sorted(os.listdir(source_dir))
+            if os.path.isfile(os.path.join(source_dir, name, f"{name}.txt"))
+        ]
+
+    def import_folders(self, source_dir=None, names=None, replace=False):
+        """Загрузка статей из раскладки по папкам (обратное export()).
+
+        Статьи, которые уже есть в хранилище, пропускаются, если не задан
+        replace. Возвращает число загруженных статей.
+        """
+        source_dir = source_dir or self.articles_dir
+        imported = 0
+        for name in names or self.folder_names(source_dir):
+            if not replace and name in self:
+                continue
+            article_dir = os.path.join(source_dir, name)
+
+            def read(file_name):
+                path = os.path.join(article_dir, file_name)
+                if not os.path.isfile(path):
+                    return ""
+                with open(path, "r", encoding="utf-8") as f:
+                    return f.read()
+
+            try:
+                metadata = json.loads(read("metadata.json") or "{}")
+            except ValueError:
+                metadata = {}
+            self.put(
+                name, metadata.get('title') or name, metadata.get('url'),
+                read(f"{name}.txt"), read(f"{name}_an.txt"), read(f"{name}_sh.txt"),
+                {key: value for key, value in metadata.items() if key not in FOLDER_FIELDS}
+            )
+            imported += 1
+        return imported
+
+    def export(self, output_dir, filenames=None):
+        """Выгрузка статей в раскладку по папкам: <имя>/<имя>.pdf, .txt, _sh.txt, _an.txt, metadata.json"""
+        exported = 0
+        for filename in filenames or self.filenames():
+            article = self.get(filename)
+            if article is None:
+                continue
+            article_dir = os.path.join(output_dir, filename)
+            os.makedirs(article_dir, exist_ok=True)
+
+            files = {
+                f"{filename}.pdf": format_original(article['title'], article['url'], article['content']),
+                f"{filename}.txt": article['content'],
+                f"{filename}_sh.txt": article['summary'],
+                f"{filename}_an.txt": article['annotation']
+            }
+            for name, text in files.items():
+                with open(os.path.join(article_dir, name), "w", encoding="utf-8") as f:
+                    f.write(text or "")
+
+            metadata = {
+                'title': article['title'],
+                'url': article['url'],
+                'filename': filename,
+                'files': {
+                    'original': f"{filename}.pdf",
+                    'text': f"{filename}.txt",
+                    'summary': f"{filename}_sh.txt",
+                    'annotation': f"{filename}_an.txt"
+                }
+            }
+            metadata.update(article['metadata'])
+            with open(os.path.join(article_dir, "metadata.json"), "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            exported += 1
+        return exported
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Хранилище статей lab3")
+    arg_parser.add_argument("command", choices=["list", "export", "import"])
+    arg_parser.add_argument("--store", default="articles", help="папка с хранилищем (по умолчанию articles)")
+    arg_parser.add_argument("--output", default=None,
+                            help="куда выгружать папки статей (по умолчанию - папка хранилища)")
+    arg_parser.add_argument("--source", default=None,
+                            help="откуда загружать папки статей для import (по умолчанию - папка хранилища)")
+    arg_parser.add_argument("--replace", action="store_true",
+                            help="import: перезаписать статьи, которые уже есть в хранилище")
+    arg_parser.add_argument("names", nargs="*", help="имена статей (по умолчанию - все)")
+    args = arg_parser.parse_args(argv)
+
+    store = ArticleStore(args.store)
+    try:
+        if args.command == "list":
+            for filename in store.filenames():
+                print(filename)
+        elif args.command == "import":
+            source_dir = args.source or args.store
+            imported = store.import_folders(source_dir, args.names or None, args.replace)
+            print(f"✅ Загружено статей: {imported} из {os.path.abspath(source_dir)}")
+        else:
+            output_dir = args.output or args.store
+            exported = store.export(output_dir, args.names or None)
+            print(f"✅ Выгружено статей: {exported} в {os.path.abspath(output_dir)}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+from html.parser import HTMLParser
+import re
+
+
+# Те же селекторы, что и в Selenium-пути парсера
+ARTICLE_SELECTORS = {
+    'title': ['h1', '.article-title', '.title'],
+    'content': ['.fulltext', '.article-text', '.content', 'article'],
+    'annotation': ['.abstract', '.annotation'],
+    'fulltext': ['.fulltext']
+}
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table',
+    'td', 'th', 'tr', 'ul'
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+WHITESPACE_RE = re.compile(r'[ \t\r\n\f\v]+')
+
+
+def _matches(selector, tag, classes):
+    """Проверка простого селектора: 'tag' или '.class'"""
+    if selector.startswith('.'):
+        return selector[1:] in classes
+    return selector == tag
+
+
+class _ArticleHTMLParser(HTMLParser):
+    """Однопроходный сбор текста первых совпадений для групп селекторов.
+
+    Как и find_element с группой селекторов, берется первый элемент
+    в порядке документа, совпавший с любым селектором группы.
+    """
+
+    def __init__(self, selectors):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.stack = []
+        self.active = {}   # поле -> (глубина стека, список кусков текста)
+        self.results = {}
+        self.skip_depth = 0
+        self.page_title = []
+        self.in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self.handle_startendtag(tag, attrs)
+            return
+
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        if tag == 'title':
+            self.in_title = True
+
+        classes = set()
+        for name, value in attrs:
+            if name == 'class' and value:
+                classes.update(value.split())
+
+        self._write_break(tag)
+        self.stack.append(tag)
+
+        for field, group in self.selectors.items():
+            if field in self.results or field in self.active:
+                continue
+            if any(_matches(selector, tag, classes) for selector in group):
+                self.active[field] = (len(self.stack), [])
+
+    def handle_startendtag(self, tag, attrs):
+        self._write_break(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or tag not in self.stack:
+            return
+
+        # Закрываем незакрытые вложенные теги до совпадающего
+        while self.stack:
+            closed = self.stack.pop()
+            if closed in SKIP_TAGS:
+                self.skip_depth -= 1
+            if closed == 'title':
+                self.in_title = False
+            self._write_break(closed)
+            self._finish_captures()
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.page_title.append(data)
+        if self.skip_depth:
+            return
+        for _, chunks in self.active.values():
+            chunks.append(data)
+
+    def close(self):
+        super().close()
+        # Документ оборван - забираем то, что успели собрать
+        for field in list(self.active):
+            self.results[field] = _normalize_text(self.active.pop(field)[1])
+
+    def _write_break(self, tag):
+        if tag in BLOCK_TAGS:
+            for _, chunks in self.active.values():
+                chunks.append('\n')
+
+    def _finish_captures(self):
+        depth = len(self.stack)
+        for field in list(self.active):
+            start_depth, chunks = self.active[field]
+            if depth < start_depth:
+                self.results[field] = _normalize_text(chunks)
+                del self.active[field]
+
+
+def _normalize_text(chunks):
+    """Текст как у WebDriver .text: строки по блокам без пустых строк"""
+    lines = []
+    for line in ''.join(chunks).split('\n'):
+        line = WHITESPACE_RE.sub(' ', line).strip()
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def extract_article_fields(page_html, selectors=ARTICLE_SELECTORS):
+    """Извлечение заголовка, текста и аннотации из статического HTML статьи.
+
+    Возвращает словарь только с найденными полями, плюс 'page_title'.
+    """
+    parser = _ArticleHTMLParser(selectors)
+    parser.feed(page_html)
+    parser.close()
+
+    fields = dict(parser.results)
+    fields['page_title'] = WHITESPACE_RE.sub(' ', ''.join(parser.page_title)).strip()
+    return fields
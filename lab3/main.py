@@ -1,21 +1,58 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+import time
 import os
 from parser import CyberLeninkaParser
+from search_index import SearchIndex
+from article_store import ArticleStore, format_original
+from summarizer import PENDING_SUMMARY
+from text_view import MappedFileSource, PagedTextView, RecentArticles, TextSource
+from common.driver_bootstrap import startup_report
+from common import metrics
 
 class CyberLeninkaGUI:
+    MAX_ARTICLES = 5000
+    HARVEST_THRESHOLD = 20
+    
     def __init__(self, root):
         self.root = root
         self.root.title("CyberLeninka Parser")
         self.root.geometry("1000x700")
         
         self.parser = None
+        self.parser_ready = threading.Event()
         self.articles_data = []
         self.current_article_index = None
+        self.recent_articles = RecentArticles(capacity=8)
+        # Хранилище и локальный индекс скачанных статей работают без браузера
+        self.store = ArticleStore("articles")
+        self.search_index = SearchIndex("articles")
         
         self.setup_ui()
         
+        # Браузер прогревается в фоне, пока пользователь вводит запрос
+        thread = threading.Thread(target=self.prewarm_parser)
+        thread.daemon = True
+        thread.start()
+        
+    def prewarm_parser(self):
+        try:
+            indexed = self.search_index.sync(stored=self.store.filenames())
+            if indexed:
+                print(f"🗂️ Проиндексировано статей: {indexed}")
+        except Exception as e:
+            print(f"⚠️ Не удалось обновить поисковый индекс: {e}")
+        try:
+            self.parser = CyberLeninkaParser("articles", workers=3, summary_processes=2,
+                                             search_index=self.search_index, store=self.store)
+            print(startup_report())
+        except Exception as e:
+            print(f"⚠️ Не удалось заранее запустить браузер: {e}")
+        finally:
+            self.parser_ready.set()
+        
     def setup_ui(self):
         # Панель поиска
         search_frame = ttk.Frame(self.root)
@@ -27,9 +64,30 @@ class CyberLeninkaGUI:
         self.search_entry.pack(side=tk.LEFT, padx=5)
         self.search_entry.bind('<Return>', lambda e: self.start_search())
         
+        ttk.Label(search_frame, text="Статей:").pack(side=tk.LEFT, padx=(5, 0))
+        self.count_var = tk.IntVar(value=3)
+        self.count_spinbox = ttk.Spinbox(search_frame, from_=1, to=self.MAX_ARTICLES,
+                                         textvariable=self.count_var, width=6)
+        self.count_spinbox.pack(side=tk.LEFT, padx=5)
+        
         self.search_button = ttk.Button(search_frame, text="Поиск", command=self.start_search)
         self.search_button.pack(side=tk.LEFT, padx=5)
         
+        # Панель поиска по уже скачанным статьям
+        local_frame = ttk.Frame(self.root)
+        local_frame.pack(fill=tk.X, padx=10)
+        
+        ttk.Label(local_frame, text="В скачанных:").pack(side=tk.LEFT)
+        
+        self.local_entry = ttk.Entry(local_frame, width=50)
+        self.local_entry.pack(side=tk.LEFT, padx=5)
+        self.local_entry.bind('<Return>', lambda e: self.search_local())
+        
+        ttk.Button(local_frame, text="Найти", command=self.search_local).pack(side=tk.LEFT, padx=5)
+        
+        self.local_status = ttk.Label(local_frame, text="")
+        self.local_status.pack(side=tk.LEFT, padx=5)
+        
         # Прогресс бар
         self.progress = ttk.Progressbar(self.root, mode='indeterminate')
         self.progress.pack(fill=tk.X, padx=10, pady=5)
@@ -61,7 +119,7 @@ class CyberLeninkaGUI:
         self.notebook.add(self.original_frame, text="Оригинал")
         self.original_text = tk.Text(self.original_frame, wrap=tk.WORD)
         scrollbar1 = ttk.Scrollbar(self.original_frame, orient=tk.VERTICAL, command=self.original_text.yview)
-        self.original_text.configure(yscrollcommand=scrollbar1.set)
+        self.original_view = PagedTextView(self.original_text, scrollbar1)
         self.original_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar1.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -70,7 +128,7 @@ class CyberLeninkaGUI:
         self.notebook.add(self.summary_frame, text="Краткий пересказ")
         self.summary_text = tk.Text(self.summary_frame, wrap=tk.WORD)
         scrollbar2 = ttk.Scrollbar(self.summary_frame, orient=tk.VERTICAL, command=self.summary_text.yview)
-        self.summary_text.configure(yscrollcommand=scrollbar2.set)
+        self.summary_view = PagedTextView(self.summary_text, scrollbar2)
         self.summary_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar2.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -79,7 +137,7 @@ class CyberLeninkaGUI:
         self.notebook.add(self.annotation_frame, text="Аннотация")
         self.annotation_text = tk.Text(self.annotation_frame, wrap=tk.WORD)
         scrollbar3 = ttk.Scrollbar(self.annotation_frame, orient=tk.VERTICAL, command=self.annotation_text.yview)
-        self.annotation_text.configure(yscrollcommand=scrollbar3.set)
+        self.annotation_view = PagedTextView(self.annotation_text, scrollbar3)
         self.annotation_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar3.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -88,45 +146,79 @@ class CyberLeninkaGUI:
         if not query:
             messagebox.showwarning("Предупреждение", "Введите запрос для поиска")
             return
+        try:
+            count = int(self.count_var.get())
+        except (tk.TclError, ValueError):
+            count = 0
+        if not 1 <= count <= self.MAX_ARTICLES:
+            messagebox.showwarning("Предупреждение", f"Число статей должно быть от 1 до {self.MAX_ARTICLES}")
+            return
             
         self.search_button.config(state='disabled')
         self.progress.start()
         
-        thread = threading.Thread(target=self.search_articles, args=(query,))
+        thread = threading.Thread(target=self.search_articles, args=(query, count))
         thread.daemon = True
         thread.start()
         
-    def search_articles(self, query):
+    def search_articles(self, query, count):
         try:
-            # Создаем парсер
-            self.parser = CyberLeninkaParser("articles")
+            # Парсер (и его Chrome) создается один раз и переиспользуется
+            self.parser_ready.wait()
+            if self.parser is None:
+                self.parser = CyberLeninkaParser("articles", workers=3, summary_processes=2,
+                                             search_index=self.search_index, store=self.store)
             
-            # Поиск статей
-            articles = self.parser.search_articles(query, 3)
+            # Очищаем список и добавляем статьи по мере обработки
+            self.root.after(0, self.clear_articles_list)
             
-            if not articles:
-                self.root.after(0, lambda: messagebox.showinfo("Информация", "Статьи не найдены"))
-                return
+            # Больше HARVEST_THRESHOLD статей собираем со всех страниц поиска
+            if count > self.HARVEST_THRESHOLD:
+                articles = self.parser.harvest(query, count)
+            else:
+                articles = self.parser.iter_articles(query, count, include_content=False)
             
-            # Сохраняем данные статей
-            self.articles_data = articles
+            found = 0
+            for article in articles:
+                found += 1
+                self.root.after(0, self.add_article, article)
             
-            # Обновляем список статей в GUI
-            self.root.after(0, self.update_articles_list)
+            if not found:
+                self.root.after(0, lambda: messagebox.showinfo("Информация", "Статьи не найдены"))
+                return
             
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Ошибка", f"Ошибка поиска: {e}"))
         finally:
             self.root.after(0, self.search_complete)
             
+    def search_local(self):
+        """Поиск по локальному индексу - без обращения к сайту"""
+        query = self.local_entry.get().strip()
+        if not query:
+            messagebox.showwarning("Предупреждение", "Введите запрос для поиска")
+            return
+        
+        started = time.perf_counter()
+        results = self.search_index.search(query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        self.clear_articles_list()
+        for article in results:
+            self.add_article(article)
+        self.local_status.config(text=f"Найдено: {len(results)} за {elapsed_ms:.0f} мс")
+            
     def search_complete(self):
         self.search_button.config(state='normal')
         self.progress.stop()
         
-    def update_articles_list(self):
+    def clear_articles_list(self):
+        self.articles_data = []
         self.articles_listbox.delete(0, tk.END)
-        for article in self.articles_data:
-            self.articles_listbox.insert(tk.END, article['title'])
+        
+    def add_article(self, article):
+        self.articles_data.append(article)
+        self.articles_listbox.insert(tk.END, article['title'])
         
     def on_article_select(self, event):
         selection = self.articles_listbox.curselection()
@@ -137,45 +229,75 @@ class CyberLeninkaGUI:
             self.load_article_content(article_data)
             
     def load_article_content(self, article_data):
-        # Очистка всех текстовых полей
-        self.original_text.delete(1.0, tk.END)
-        self.summary_text.delete(1.0, tk.END)
-        self.annotation_text.delete(1.0, tk.END)
-        
+        """Показ статьи: текст подгружается порциями при прокрутке,
+        недавно открытые статьи берутся из LRU без обращения к диску"""
         try:
-            # Загрузка содержимого файлов
-            article_dir = article_data['directory']
-            filename = article_data['filename']
-            
-            # Загрузка оригинала
-            original_path = os.path.join(article_dir, f"{filename}.pdf")
-            if os.path.exists(original_path):
-                with open(original_path, 'r', encoding='utf-8') as f:
-                    self.original_text.insert(1.0, f.read())
-            
-            # Загрузка пересказа
-            summary_path = os.path.join(article_dir, f"{filename}_sh.txt")
-            if os.path.exists(summary_path):
-                with open(summary_path, 'r', encoding='utf-8') as f:
-                    self.summary_text.insert(1.0, f.read())
+            key = article_data['filename']
+            sources = self.recent_articles.get(key)
+            if sources is None:
+                sources, cacheable = self._open_article_sources(article_data)
+                if cacheable:
+                    self.recent_articles.put(key, sources)
             
-            # Загрузка аннотации
-            annotation_path = os.path.join(article_dir, f"{filename}_an.txt")
-            if os.path.exists(annotation_path):
-                with open(annotation_path, 'r', encoding='utf-8') as f:
-                    self.annotation_text.insert(1.0, f.read())
+            self.original_view.show(sources['original'])
+            self.summary_view.show(sources['summary'])
+            self.annotation_view.show(sources['annotation'])
             
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка загрузки содержимого: {e}")
+    
+    def _open_article_sources(self, article_data):
+        """Источники текста для трех вкладок и признак, можно ли их запомнить"""
+        filename = article_data['filename']
+        
+        # Статья из хранилища - один запрос вместо трех файлов
+        stored = self.store.get(filename)
+        if stored:
+            sources = {
+                'original': TextSource(format_original(stored['title'], stored['url'], stored['content'])),
+                'summary': TextSource(stored['summary']),
+                'annotation': TextSource(stored['annotation'])
+            }
+            # Пока пересказ готовится, статью не запоминаем
+            return sources, stored['summary'] != PENDING_SUMMARY
+        
+        # Статьи в папках (например, тексты из PDF lab2): большой текст читается
+        # через mmap, короткие пересказ и аннотация - целиком (их файлы
+        # перезаписываются на месте, а отображенный в память файл обрезать нельзя)
+        article_dir = article_data['directory']
+        original_path = os.path.join(article_dir, f"{filename}.pdf")
+        if not os.path.exists(original_path):
+            original_path = os.path.join(article_dir, f"{filename}.txt")
+        
+        sources = {
+            'original': MappedFileSource(original_path) if os.path.exists(original_path) else None,
+            'summary': self._read_source(os.path.join(article_dir, f"{filename}_sh.txt")),
+            'annotation': self._read_source(os.path.join(article_dir, f"{filename}_an.txt"))
+        }
+        return sources, True
+    
+    def _read_source(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return TextSource(f.read())
 
-def main():
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="CyberLeninka Parser")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+    
     root = tk.Tk()
     app = CyberLeninkaGUI(root)
     
     def on_closing():
         if app.parser:
             app.parser.close()
+        app.search_index.close()
+        app.recent_articles.clear()
+        app.store.close()
         root.destroy()
+        metrics.dump_metrics(args.metrics)
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
     root.mainloop()
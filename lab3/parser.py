@@ -1,25 +1,103 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+import argparse
+import asyncio
 import time
 import os
+import sys
 import re
+import itertools
+import threading
+from contextlib import contextmanager
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, quote
-import json
+from html_extract import extract_article_fields
+from summarizer import PENDING_SUMMARY, SummaryPipeline, fast_quality_summary
+from textrank import IDF_FILENAME, load_summarizer
+from search_index import SearchIndex
+from article_store import ArticleStore
+
+# Общие модули обеих лабораторных лежат в корне репозитория (common/)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.waits import PageWaiter
+from common.driver_pool import DriverPool
+from common.driver_bootstrap import LEAN_BLOCKED_URLS, apply_lean_profile, launch_chrome
+from common.http_cache import HTTPCache
+from common.harvest import LinkProducer, ThroughputMeter
+from common.page_links import find_article_links
+from common import metrics
+from common.rate_limit import RATE_LIMITER
 
 class CyberLeninkaParser:
-    def __init__(self, output_dir="articles"):
+    # Больше статей, чем выдает одна страница поиска
+    PAGE_LINK_LIMIT = 100
+    
+    def __init__(self, output_dir="articles", http_mode=True, wait_timeouts=None, workers=1, cache=None,
+                 summary_processes=0, search_index=None, store=None, rate_limiter=None, lean=True,
+                 main_driver=True):
         self.base_url = "https://cyberleninka.ru"
+        # Один ограничитель на хост для браузера и HTTP вместо фиксированных пауз
+        self.rate_limiter = RATE_LIMITER if rate_limiter is None else rate_limiter
+        # Облегченный профиль Chrome: без картинок, стилей, шрифтов и счетчиков
+        self.lean = lean
         self.output_dir = output_dir
+        self.http_mode = http_mode
+        self.waiter = PageWaiter(wait_timeouts)
+        self.workers = workers
+        self.pool = None
         os.makedirs(self.output_dir, exist_ok=True)
+        self.session = self._create_session()
+        self._owns_cache = cache is None
+        self.cache = HTTPCache() if cache is None else cache
+        # Таблица IDF строится по корпусу командой: python summarizer.py <output_dir>
+        idf_path = os.path.join(self.output_dir, IDF_FILENAME)
+        load_summarizer(idf_path)
+        # Статьи хранятся в одном файле; папки - по команде: python article_store.py export
+        self._owns_store = store is None
+        self.store = ArticleStore(self.output_dir) if store is None else store
+        # summary_processes > 0 - пересказ в отдельных процессах (см. SummaryPipeline)
+        self.summaries = SummaryPipeline(
+            self.store.set_summary, summary_processes, idf_path=idf_path
+        ) if summary_processes else None
+        # Каждая записанная статья сразу попадает в локальный поисковый индекс
+        self._owns_index = search_index is None
+        self.search_index = SearchIndex(self.output_dir) if search_index is None else search_index
+        self._local = threading.local()
         self.driver = None
-        self.setup_driver()
+        # main_driver=False - только драйверы пула (pooled_driver), как в режиме заданий
+        if main_driver:
+            self.setup_driver()
+        
+    @property
+    def driver(self):
+        """Драйвер текущего потока: из пула в рабочих потоках, иначе основной"""
+        return getattr(self._local, 'driver', None) or self._driver
+    
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+        
+    def _create_session(self):
+        """HTTP-сессия с пулом соединений для загрузки страниц статей"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=2)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        return session
         
     def setup_driver(self):
         """Настройка Chrome драйвера"""
+        self.driver = self._build_driver()
+        
+    def _build_driver(self, worker_id=None):
+        """Создание нового Chrome драйвера (worker_id - слот пула)"""
         chrome_options = Options()
         chrome_options.add_argument("--headless=new")
         chrome_options.add_argument("--no-sandbox")
@@ -27,94 +105,285 @@ class CyberLeninkaParser:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        if self.lean:
+            apply_lean_profile(chrome_options)
+        
+        return launch_chrome(chrome_options, LEAN_BLOCKED_URLS if self.lean else None)
+    
+    def _get_pool(self):
+        """Пул драйверов для параллельной обработки (создается по требованию)"""
+        if self.pool is None:
+            self.pool = DriverPool(self._build_driver, size=self.workers)
+        return self.pool
+    
+    def warm_pool(self):
+        """Запуск всех драйверов пула заранее (режим сервиса)"""
+        self._get_pool().warm()
+    
+    @contextmanager
+    def pooled_driver(self):
+        """Драйвер из пула как основной для текущего потока на время блока with.
+
+        Так несколько запросов идут параллельно на одном пуле прогретых
+        драйверов (см. jobs/runner.py); статьи запроса обрабатываются
+        в этом же потоке.
+        """
+        with self._get_pool().acquire() as driver:
+            self._local.driver = driver
+            try:
+                yield driver
+            finally:
+                self._local.driver = None
+    
+    def _iter_in_pool(self, func, items):
+        """Параллельный вызов func(*item) с драйвером из пула, результаты - по мере готовности"""
+        def call(driver, item):
+            self._local.driver = driver
+            try:
+                return func(*item)
+            finally:
+                self._local.driver = None
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        return self._get_pool().imap_unordered(call, items)
         
     def search_articles(self, query, max_results=3):
         """Поиск статей на CyberLeninka"""
+        with metrics.timer("search"):
+            articles_data = list(self.iter_articles(query, max_results))
+        if self.summaries:
+            with metrics.timer("summary_wait"):
+                self.summaries.join()
+            for article_data in articles_data:
+                stored = self.store.get(article_data['filename'], ('summary',))
+                article_data['summary'] = stored['summary']
+        return sorted(articles_data, key=lambda article: article['number'])
+    
+    def iter_articles(self, query, max_results=3, include_content=True):
+        """Поиск статей с выдачей каждой статьи сразу после обработки.
+        
+        Потребитель может остановиться в любой момент (break), оставшиеся
+        статьи не обрабатываются. При include_content=False полный текст
+        не держится в памяти - он уже записан в папку статьи.
+        """
         print(f"🔍 Поиск статей по запросу: '{query}'")
         
         try:
-            search_url = f"{self.base_url}/search?q={quote(query)}"
-            self.driver.get(search_url)
-            time.sleep(2)
-            
-            article_links = self._find_article_links(max_results)
-            print(f"📎 Найдено ссылок на статьи: {len(article_links)}")
-            
-            if not article_links:
-                print("❌ Не найдено ссылок на статьи")
-                return []
-            
-            articles_data = []
-            for i, article_url in enumerate(article_links[:max_results]):
-                print(f"📥 Обрабатываем статью {i+1}/{len(article_links)}...")
-                
-                try:
-                    article_data = self._process_article_fast(article_url, i+1)
-                    if article_data:
-                        articles_data.append(article_data)
-                        print(f"✅ Статья {i+1} успешно обработана")
-                    else:
-                        print(f"❌ Не удалось обработать статью {i+1}")
-                        
-                except Exception as e:
-                    print(f"⚠️ Ошибка при обработке статьи {i+1}: {e}")
-                    continue
-                
-                time.sleep(0.5)
-            
-            print(f"🎉 Обработка завершена! Успешно: {len(articles_data)}/{min(max_results, len(article_links))}")
-            return articles_data
-            
+            article_links = self._get_article_links(query, max_results)
         except Exception as e:
             print(f"❌ Ошибка при поиске: {e}")
-            return []
+            return
+        print(f"📎 Найдено ссылок на статьи: {len(article_links)}")
+        
+        if not article_links:
+            print("❌ Не найдено ссылок на статьи")
+            return
+        
+        tasks = [(url, i+1) for i, url in enumerate(article_links[:max_results])]
+        processed = 0
+        try:
+            for article_data in self._iter_processed(tasks, len(article_links)):
+                if not include_content:
+                    article_data.pop('content', None)
+                processed += 1
+                yield article_data
+        finally:
+            print(f"🎉 Обработка завершена! Успешно: {processed}/{len(tasks)}")
+            print(self.waiter.report())
+            print(self.rate_limiter.report())
+    
+    def _iter_processed(self, tasks, total):
+        """Обработанные статьи по мере готовности (последовательно или в пуле)"""
+        # Поток с драйвером из пула (pooled_driver) не берет второй - пул мог бы исчерпаться
+        if self.workers > 1 and getattr(self._local, 'driver', None) is None:
+            print(f"⚡ Параллельная обработка в {self.workers} потоков...")
+            for article_data in self._iter_in_pool(self._process_article_fast, tasks):
+                if article_data:
+                    yield article_data
+            return
+        
+        for article_url, article_number in tasks:
+            print(f"📥 Обрабатываем статью {article_number}/{total}...")
+            
+            try:
+                article_data = self._process_article_fast(article_url, article_number)
+                if article_data:
+                    print(f"✅ Статья {article_number} успешно обработана")
+                    yield article_data
+                else:
+                    print(f"❌ Не удалось обработать статью {article_number}")
+                    
+            except Exception as e:
+                print(f"⚠️ Ошибка при обработке статьи {article_number}: {e}")
+                continue
+    
+    async def aiter_articles(self, query, max_results=3, include_content=True):
+        """Асинхронный вариант iter_articles (работа идет в отдельном потоке).
+        
+        Поток не обрабатывает следующую статью, пока предыдущую не забрали.
+        Для досрочной остановки используйте contextlib.aclosing.
+        """
+        loop = asyncio.get_running_loop()
+        results = asyncio.Queue()
+        taken = threading.Semaphore(0)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(results.put_nowait, item)
+            except RuntimeError:
+                # Цикл событий уже закрыт
+                stop.set()
+        
+        def produce():
+            articles = self.iter_articles(query, max_results, include_content)
+            try:
+                for article_data in articles:
+                    put(article_data)
+                    taken.acquire()
+                    if stop.is_set():
+                        break
+            finally:
+                articles.close()
+                put(done)
+        
+        loop.run_in_executor(None, produce)
+        try:
+            while True:
+                article_data = await results.get()
+                if article_data is done:
+                    break
+                taken.release()
+                yield article_data
+        finally:
+            stop.set()
+            taken.release()
+    
+    def _get_article_links(self, query, max_results):
+        """Первые max_results ссылок на статьи (при необходимости с нескольких страниц)"""
+        return list(itertools.islice(self._iter_search_links(query), max_results))
+    
+    def _iter_search_links(self, query):
+        """Ссылки на статьи со всех страниц выдачи; обход до страницы без новых статей"""
+        seen = set()
+        for page in itertools.count(1):
+            new_links = [link for link in self._get_page_links(query, page) if link not in seen]
+            if not new_links:
+                return
+            seen.update(new_links)
+            yield from new_links
+    
+    def _get_page_links(self, query, page):
+        """Ссылки одной страницы поиска из кэша или через браузер"""
+        page_url = f"{self.base_url}/search?q={quote(query)}"
+        if page > 1:
+            page_url += f"&page={page}"
+        cached_links = self.cache.get_json(page_url, 'links')
+        if cached_links:
+            print(f"📦 Ссылки страницы поиска {page} взяты из кэша")
+            return cached_links
+        
+        with self.rate_limiter.request(page_url), metrics.timer("navigation", page="search"):
+            self.driver.get(page_url)
+        if not self.waiter.wait_for(self.driver, 'search'):
+            print(f"⚠️ Результаты поиска (страница {page}) не появились за отведенное время")
+        
+        article_links = self._find_article_links(self.PAGE_LINK_LIMIT)
+        if article_links:
+            self.cache.put_json(page_url, article_links, 'links')
+        return article_links
+    
+    def harvest(self, query, max_articles=1000, queue_size=100):
+        """Массовая обработка статей со всех страниц выдачи.
+        
+        Страницы поиска обходятся в фоновом потоке, ссылки идут через
+        ограниченную очередь в пул драйверов (workers потоков). Статьи
+        отдаются без полного текста, чтобы память не росла; скорость
+        в статьях в минуту печатается по ходу и в конце.
+        """
+        print(f"🌾 Массовая обработка по запросу '{query}' (до {max_articles} статей)")
+        meter = ThroughputMeter()
+        producer = LinkProducer(self._iter_search_links(query), max_articles, queue_size=queue_size)
+        
+        def process(article_url, article_number):
+            article_data = self._process_article_fast(article_url, article_number)
+            meter.add(article_data is not None)
+            return article_data
+        
+        # Основной драйвер занят обходом страниц, статьи обрабатываются только в пуле
+        tasks = ((url, number) for number, url in producer.start())
+        try:
+            for article_data in self._iter_in_pool(process, tasks):
+                if article_data:
+                    article_data.pop('content', None)
+                    yield article_data
+        finally:
+            producer.stop()
+            print(meter.report())
+            print(self.waiter.report())
+            print(self.rate_limiter.report())
     
     def _find_article_links(self, max_results):
-        """Поиск ссылок на статьи"""
-        article_links = []
+        """Поиск ссылок на статьи (один запрос к браузеру на страницу)"""
         try:
-            elements = self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/article/"]')
-            for element in elements:
-                href = element.get_attribute("href")
-                if (href and "/article/" in href and 
-                    "search" not in href and 
-                    href not in article_links):
-                    article_links.append(href)
-                    if len(article_links) >= max_results:
-                        break
+            with metrics.timer("dom", page="search"):
+                return find_article_links(self.driver, ['a[href*="/article/"]'], max_results)
         except Exception as e:
             print(f"⚠️ Ошибка при поиске ссылок: {e}")
-        
-        return article_links[:max_results]
+            return []
     
     def _process_article_fast(self, article_url, article_number):
         """Быстрая обработка статьи с качественным пересказом"""
+        with metrics.timer("article"):
+            article_data = self._process_article(article_url, article_number)
+        metrics.count("articles_total", result="ok" if article_data else "failed")
+        return article_data
+    
+    def _process_article(self, article_url, article_number):
         try:
-            print(f"   📄 Переходим на страницу статьи: {article_url}")
-            self.driver.get(article_url)
-            time.sleep(1)
+            page = self._fetch_article_http(article_url) if self.http_mode else None
             
-            title = self._get_article_title()
+            if page:
+                title = page['title']
+                content_data = page['content_data']
+                print(f"   ⚡ Статья загружена без браузера: {article_url}")
+            else:
+                # Запасной путь: в статическом HTML нет .fulltext
+                print(f"   📄 Переходим на страницу статьи: {article_url}")
+                with self.rate_limiter.request(article_url), metrics.timer("navigation", page="article"):
+                    self.driver.get(article_url)
+                self.waiter.wait_for(self.driver, 'article')
+                
+                with metrics.timer("dom", page="article"):
+                    title = self._get_article_title()
+                content_data = None
             print(f"   📝 Заголовок статьи: {title}")
             
             safe_title = self._create_safe_filename(title)
             filename = f"{article_number:02d}_{safe_title}"
             
             article_dir = os.path.join(self.output_dir, filename)
-            os.makedirs(article_dir, exist_ok=True)
             
-            content_data = self._get_article_content_fast()
+            if content_data is None:
+                with metrics.timer("dom", page="article"):
+                    content_data = self._get_article_content_fast()
             if not content_data:
                 return None
             
-            summary = self._fast_quality_summary(content_data['content'])
+            # С пулом процессов пересказ готовится параллельно, пока грузятся следующие статьи
+            if self.summaries:
+                summary = None
+            else:
+                with metrics.timer("summary"):
+                    summary = fast_quality_summary(content_data['content'])
             
-            self._create_files_fast(article_dir, filename, title, article_url, content_data, summary)
+            self._save_article(article_dir, filename, title, article_url, content_data,
+                               summary or PENDING_SUMMARY)
+            if self.summaries:
+                self.summaries.submit(filename, content_data['content'])
             
             return {
+                'number': article_number,
                 'title': title,
                 'url': article_url,
                 'filename': filename,
@@ -128,6 +397,39 @@ class CyberLeninkaParser:
             print(f"   ❌ Ошибка при обработке статьи: {e}")
             return None
     
+    def _fetch_article_http(self, article_url):
+        """Загрузка статьи по HTTP и разбор HTML теми же селекторами.
+
+        Возвращает None, если в статическом HTML нет .fulltext.
+        """
+        try:
+            fields = self.cache.get_json(article_url, 'text')
+            if fields is None:
+                with metrics.timer("fetch"):
+                    page_html = self.cache.fetch(self.session, article_url, 'page',
+                                                 limiter=self.rate_limiter, timeout=15)
+                with metrics.timer("parse"):
+                    fields = extract_article_fields(page_html.decode('utf-8', errors='replace'))
+                self.cache.put_json(article_url, fields, 'text')
+        except Exception as e:
+            print(f"   ⚠️ HTTP-загрузка не удалась: {e}")
+            return None
+        
+        if not fields.get('fulltext'):
+            return None
+        
+        title = fields.get('title', '')
+        if not (5 < len(title) < 200):
+            title = fields['page_title'].replace(" - КиберЛенинка", "").strip() or f"Статья_{int(time.time())}"
+        
+        return {
+            'title': title,
+            'content_data': {
+                'content': fields['content'],
+                'annotation': fields.get('annotation') or "Аннотация не найдена"
+            }
+        }
+    
     def _get_article_content_fast(self):
         """Быстрое получение содержимого статьи"""
         try:
@@ -163,141 +465,20 @@ class CyberLeninkaParser:
             
         return self.driver.title.replace(" - КиберЛенинка", "").strip() or f"Статья_{int(time.time())}"
     
-    def _fast_quality_summary(self, text):
-        """БЫСТРЫЙ и КАЧЕСТВЕННЫЙ пересказ"""
-        try:
-            if not text or len(text.strip()) < 100:
-                return "Текст слишком короткий для создания пересказа"
-            
-            # Извлекаем ключевые части для быстрого и качественного пересказа
-            key_parts = self._extract_key_content(text)
-            
-            # Создаем качественный пересказ локально
-            return self._create_quality_summary(key_parts)
-                
-        except Exception as e:
-            print(f"   ❌ Ошибка при создании пересказа: {e}")
-            return self._fallback_summary(text)
-    
-    def _extract_key_content(self, text):
-        """Извлечение ключевых частей текста"""
-        try:
-            paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-            
-            if len(paragraphs) <= 3:
-                return text[:1500] if len(text) > 1500 else text
-            
-            # Интеллектуальный отбор ключевых частей
-            key_parts = []
-            
-            # Введение (первый абзац)
-            key_parts.append(paragraphs[0])
-            
-            # Ключевые абзацы из середины (2-3)
-            if len(paragraphs) > 4:
-                mid_point = len(paragraphs) // 2
-                key_parts.extend(paragraphs[mid_point:mid_point+2])
-            
-            # Заключение (последний абзац)
-            key_parts.append(paragraphs[-1])
-            
-            result = "\n\n".join(key_parts)
-            return result[:1500] if len(result) > 1500 else result
-            
-        except:
-            return text[:1500] if len(text) > 1500 else text
-    
-    def _create_quality_summary(self, text):
-        """Создание качественного пересказа"""
-        try:
-            paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-            
-            if len(paragraphs) == 1:
-                # Один абзац - выделяем основную идею
-                content = paragraphs[0]
-                sentences = re.split(r'[.!?]+', content)
-                sentences = [s.strip() for s in sentences if s.strip()]
-                if len(sentences) >= 3:
-                    return f"Основная тема: {' '.join(sentences[:2])}. Ключевой вывод: {sentences[-1]}"
-                else:
-                    return f"Тема исследования: {content[:300]}..."
-            
-            elif len(paragraphs) == 2:
-                # Два абзаца - введение и основное
-                return f"ТЕМА: {paragraphs[0]}\n\nОСНОВНОЕ СОДЕРЖАНИЕ: {paragraphs[1][:300]}..."
-            
-            else:
-                # Много абзацев - структурированный пересказ
-                intro = paragraphs[0][:200] + "..." if len(paragraphs[0]) > 200 else paragraphs[0]
-                
-                # Находим ключевой абзац (обычно в середине)
-                key_idx = len(paragraphs) // 2
-                key_content = paragraphs[key_idx][:150] + "..." if len(paragraphs[key_idx]) > 150 else paragraphs[key_idx]
-                
-                conclusion = paragraphs[-1][:150] + "..." if len(paragraphs[-1]) > 150 else paragraphs[-1]
-                
-                return f"ВВЕДЕНИЕ: {intro}\n\nКЛЮЧЕВАЯ ИДЕЯ: {key_content}\n\nВЫВОДЫ: {conclusion}"
-                
-        except Exception as e:
-            return f"Качественный пересказ: {text[:300]}..."
-    
-    def _fallback_summary(self, text):
-        """Запасной вариант пересказа"""
-        try:
-            # Простое резюмирование
-            sentences = re.split(r'[.!?]+', text)
-            sentences = [s.strip() for s in sentences if s.strip()]
-            
-            if len(sentences) >= 5:
-                # Берем первые 2 и последние 2 предложения
-                selected = sentences[:2] + sentences[-2:]
-                return " ".join(selected) + "."
-            else:
-                return " ".join(sentences[:3]) + "." if sentences else "Пересказ недоступен"
-        except:
-            return "Быстрый качественный пересказ"
-    
-    def _create_files_fast(self, article_dir, filename, title, url, content_data, summary):
-        """Быстрое создание файлов статьи"""
+    def _save_article(self, article_dir, filename, title, url, content_data, summary):
+        """Сохранение статьи одной записью в хранилище и в поисковый индекс.
+
+        article_dir - папка, в которую статью выгрузит ArticleStore.export().
+        """
         try:
-            # Оригинал (имитация PDF)
-            with open(os.path.join(article_dir, f"{filename}.pdf"), "w", encoding="utf-8") as f:
-                f.write("=== Оригинал статьи ===\n")
-                f.write(f"Название: {title}\n")
-                f.write(f"URL: {url}\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(content_data['content'][:2000] + "..." if len(content_data['content']) > 2000 else content_data['content'])
-            
-            # TXT-версия
-            with open(os.path.join(article_dir, f"{filename}.txt"), "w", encoding="utf-8") as f:
-                f.write(content_data['content'])
-            
-            # Файл краткого пересказа
-            with open(os.path.join(article_dir, f"{filename}_sh.txt"), "w", encoding="utf-8") as f:
-                f.write(summary)
-            
-            # Файл аннотации
-            with open(os.path.join(article_dir, f"{filename}_an.txt"), "w", encoding="utf-8") as f:
-                f.write(content_data['annotation'])
-            
-            # Метаданные
-            metadata = {
-                'title': title,
-                'url': url,
-                'filename': filename,
-                'files': {
-                    'original': f"{filename}.pdf",
-                    'text': f"{filename}.txt",
-                    'summary': f"{filename}_sh.txt",
-                    'annotation': f"{filename}_an.txt"
-                }
-            }
-            
-            with open(os.path.join(article_dir, "metadata.json"), "w", encoding="utf-8") as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
-                
+            with metrics.timer("write"):
+                self.store.put(filename, title, url, content_data['content'],
+                               content_data['annotation'], summary)
+            with metrics.timer("index"):
+                self.search_index.add_article(article_dir, filename, title, url,
+                                              content_data['content'], content_data['annotation'])
         except Exception as e:
-            print(f"   ❌ Ошибка создания файлов: {e}")
+            print(f"   ❌ Ошибка сохранения статьи: {e}")
             raise
     
     def _create_safe_filename(self, title):
@@ -311,23 +492,43 @@ class CyberLeninkaParser:
         return safe_title
     
     def close(self):
-        """Закрытие драйвера"""
+        """Закрытие драйвера, пула, HTTP-сессии, кэша, индекса, хранилища и процессов пересказа"""
+        self.session.close()
+        if self._owns_index:
+            self.search_index.close()
+        # Сначала дожидаемся пересказов - они записываются в хранилище
+        if self.summaries:
+            self.summaries.close()
+        if self._owns_store:
+            self.store.close()
+        if self._owns_cache:
+            self.cache.close()
+        if self.pool:
+            self.pool.close()
         if self.driver:
             self.driver.quit()
 
 # Простой пример использования
-def main():
-    parser = CyberLeninkaParser("articles")
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Поиск и пересказ статей CyberLeninka")
+    arg_parser.add_argument("query", nargs="?", default=None, help="тема (по умолчанию - спросить)")
+    arg_parser.add_argument("-n", "--count", type=int, default=3, help="число статей (по умолчанию 3)")
+    arg_parser.add_argument("--full-browser", action="store_true",
+                            help="обычный профиль Chrome (с картинками, стилями и шрифтами)")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+    
+    parser = CyberLeninkaParser("articles", lean=not args.full_browser)
     
     try:
-        query = input("Введите тему для поиска статей: ")
-        articles = parser.search_articles(query, 3)
+        query = args.query or input("Введите тему для поиска статей: ")
+        articles = parser.search_articles(query, args.count)
         
         if articles:
             print(f"\n🎉 Найдено и обработано {len(articles)} статей:")
             for i, article in enumerate(articles, 1):
                 print(f"{i}. {article['title']}")
-                print(f"   Папка: {article['directory']}")
+                print(f"   Файл в хранилище: {article['filename']}")
                 print(f"   Пересказ: {article['summary'][:200]}...")
                 print()
         else:
@@ -339,6 +540,7 @@ def main():
         print(f"❌ Ошибка: {e}")
     finally:
         parser.close()
+        metrics.dump_metrics(args.metrics)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,259 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+
+INDEX_FILENAME = ".search_index.sqlite"
+
+WORD_RE = re.compile(r'[а-яёa-z0-9]+')
+
+# Облегченный вариант стеммера Портера (Snowball) для русского языка
+RV_RE = re.compile(r'^(.*?[аеиоуыэюя])(.*)$')
+PERFECTIVE_GERUND_RE = re.compile(r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+REFLEXIVE_RE = re.compile(r'(с[яь])$')
+ADJECTIVE_RE = re.compile(r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$')
+PARTICIPLE_RE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB_RE = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)'
+    r'|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN_RE = re.compile(r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$')
+DERIVATIONAL_RE = re.compile(r'.*[^аеиоуыэюя]+[аеиоуыэюя]+[^аеиоуыэюя]+[аеиоуыэюя].*ость?$')
+DERIVATIONAL_SUFFIX_RE = re.compile(r'ость?$')
+SUPERLATIVE_RE = re.compile(r'(ейше|ейш)$')
+
+# Заголовок важнее текста: его слова учитываются с таким весом
+TITLE_WEIGHT = 5
+ANNOTATION_WEIGHT = 2
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    """Основа русского слова (английские слова и числа не изменяются)"""
+    match = RV_RE.match(word)
+    if not match:
+        return word
+    prefix, rv = match.groups()
+
+    without_gerund = PERFECTIVE_GERUND_RE.sub('', rv, 1)
+    if without_gerund != rv:
+        rv = without_gerund
+    else:
+        rv = REFLEXIVE_RE.sub('', rv, 1)
+        without_adjective = ADJECTIVE_RE.sub('', rv, 1)
+        if without_adjective != rv:
+            rv = PARTICIPLE_RE.sub('', without_adjective, 1)
+        else:
+            without_verb = VERB_RE.sub('', rv, 1)
+            rv = without_verb if without_verb != rv else NOUN_RE.sub('', rv, 1)
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    if DERIVATIONAL_RE.match(rv):
+        rv = DERIVATIONAL_SUFFIX_RE.sub('', rv, 1)
+    if rv.endswith('ь'):
+        rv = rv[:-1]
+    else:
+        rv = SUPERLATIVE_RE.sub('', rv, 1)
+        if rv.endswith('нн'):
+            rv = rv[:-1]
+    return prefix + rv
+
+
+def terms(text):
+    """Нормализованные термины текста: нижний регистр, ё -> е, основы слов"""
+    return [
+        stem(word) for word in WORD_RE.findall(text.lower().replace('ё', 'е'))
+        if len(word) > 1
+    ]
+
+
+class SearchIndex:
+    """Инвертированный индекс по скачанным статьям (SQLite).
+
+    Статья добавляется сразу после записи ее файлов; поиск ранжирует
+    статьи по BM25 и не требует обращения к сайту.
+    """
+
+    def __init__(self, articles_dir, db_name=INDEX_FILENAME, k1=1.5, b=0.75):
+        self.articles_dir = articles_dir
+        self.k1 = k1
+        self.b = b
+        os.makedirs(articles_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(articles_dir, db_name), check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                directory TEXT NOT NULL UNIQUE,
+                filename TEXT NOT NULL,
+                title TEXT,
+                url TEXT,
+                length INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        """)
+        self._db.commit()
+
+    def add_article(self, article_dir, filename, title, url, content, annotation=""):
+        """Индексация (или переиндексация) одной статьи"""
+        counts = Counter(terms(content))
+        for term in terms(annotation or ""):
+            counts[term] += ANNOTATION_WEIGHT
+        for term in terms(title or ""):
+            counts[term] += TITLE_WEIGHT
+
+        text_path = os.path.join(article_dir, f"{filename}.txt")
+        mtime = os.path.getmtime(text_path) if os.path.exists(text_path) else time.time()
+        directory = os.path.abspath(article_dir)
+
+        with self._lock:
+            self._remove(directory)
+            cursor = self._db.execute(
+                "INSERT INTO documents (directory, filename, title, url, length, mtime, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (directory, filename, title, url, sum(counts.values()), mtime, time.time())
+            )
+            self._db.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                ((term, cursor.lastrowid, tf) for term, tf in counts.items())
+            )
+            self._db.commit()
+
+    def _remove(self, directory):
+        row = self._db.execute("SELECT id FROM documents WHERE directory = ?", (directory,)).fetchone()
+        if row:
+            self._db.execute("DELETE FROM postings WHERE doc_id = ?", row)
+            self._db.execute("DELETE FROM documents WHERE id = ?", row)
+
+    def sync(self, stored=()):
+        """Доиндексация папок, которых нет в индексе или которые изменились.
+
+        stored - имена статей хранилища: они индексируются при сохранении,
+        поэтому их папки (выгрузка article_store export) повторно не
+        разбираются. Из индекса убираются статьи, которых нет ни в папках,
+        ни в хранилище. Возвращает число проиндексированных статей.
+        """
+        stored = set(stored)
+        with self._lock:
+            known = {
+                directory: (filename, mtime)
+                for directory, filename, mtime in self._db.execute("SELECT directory, filename, mtime FROM documents")
+            }
+
+        indexed = 0
+        present = set()
+        for name in sorted(os.listdir(self.articles_dir)):
+            article_dir = os.path.abspath(os.path.join(self.articles_dir, name))
+            text_path = os.path.join(article_dir, f"{name}.txt")
+            if not os.path.isfile(text_path):
+                continue
+            present.add(article_dir)
+            if article_dir in known and (name in stored or known[article_dir][1] == os.path.getmtime(text_path)):
+                continue
+
+            article = self._read_article(article_dir, name)
+            self.add_article(article_dir, name, article['title'], article['url'],
+                             article['content'], article['annotation'])
+            indexed += 1
+
+        with self._lock:
+            for directory, (filename, _) in known.items():
+                if directory not in present and filename not in stored:
+                    self._remove(directory)
+            self._db.commit()
+        return indexed
+
+    def _read_article(self, article_dir, filename):
+        def read(name):
+            path = os.path.join(article_dir, name)
+            if not os.path.exists(path):
+                return ""
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+
+        try:
+            metadata = json.loads(read("metadata.json") or "{}")
+        except ValueError:
+            metadata = {}
+        return {
+            'title': metadata.get('title', filename),
+            'url': metadata.get('url'),
+            'content': read(f"{filename}.txt"),
+            'annotation': read(f"{filename}_an.txt")
+        }
+
+    def search(self, query, limit=20):
+        """Статьи по запросу в порядке релевантности (BM25).
+
+        Каждый результат - словарь с title, url, directory, filename и score.
+        """
+        query_terms = set(terms(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            documents, average_length = self._db.execute(
+                "SELECT COUNT(*), AVG(length) FROM documents"
+            ).fetchone()
+            if not documents:
+                return []
+
+            placeholders = ", ".join("?" * len(query_terms))
+            rows = self._db.execute(
+                "SELECT postings.term, postings.doc_id, postings.tf, documents.length FROM postings "
+                "JOIN documents ON documents.id = postings.doc_id "
+                f"WHERE postings.term IN ({placeholders})", tuple(query_terms)
+            ).fetchall()
+
+        document_frequency = Counter(term for term, _, _, _ in rows)
+        scores = Counter()
+        for term, doc_id, tf, length in rows:
+            idf = math.log(1 + (documents - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / (average_length or 1))
+            scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+
+        best = scores.most_common(limit)
+        if not best:
+            return []
+
+        with self._lock:
+            placeholders = ", ".join("?" * len(best))
+            details = {
+                row[0]: row[1:]
+                for row in self._db.execute(
+                    f"SELECT id, title, url, directory, filename FROM documents WHERE id IN ({placeholders})",
+                    tuple(doc_id for doc_id, _ in best)
+                )
+            }
+
+        results = []
+        for doc_id, score in best:
+            title, url, directory, filename = details[doc_id]
+            results.append({
+                'title': title,
+                'url': url,
+                'directory': directory,
+                'filename': filename,
+                'score': score
+            })
+        return results
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,307 @@
+import argparse
+import functools
+import os
+import re
+import sys
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from article_store import ArticleStore
+from textrank import IDF_FILENAME, IDF_VERSION, IDFTable, get_summarizer, load_summarizer, tokenize
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common import metrics
+
+
+SUMMARY_SUFFIX = "_sh.txt"
+PENDING_SUMMARY = "Пересказ готовится..."
+# Текстов на процесс пула за раз: весь корпус в память не читается
+BATCH_PER_PROCESS = 8
+# Таблица IDF пересчитывается, если корпус вырос больше чем на эту долю
+IDF_STALE_RATIO = 0.1
+
+
+def fast_quality_summary(text):
+    """Экстрактивный пересказ: ключевые предложения по TF-IDF/TextRank"""
+    try:
+        if not text or len(text.strip()) < 100:
+            return "Текст слишком короткий для создания пересказа"
+
+        return get_summarizer().summarize(text) or fallback_summary(text)
+
+    except Exception as e:
+        print(f"   ❌ Ошибка при создании пересказа: {e}")
+        return fallback_summary(text)
+
+
+def fallback_summary(text):
+    """Запасной вариант пересказа"""
+    try:
+        # Простое резюмирование
+        sentences = re.split(r'[.!?]+', text)
+        sentences = [s.strip() for s in sentences if s.strip()]
+
+        if len(sentences) >= 5:
+            # Берем первые 2 и последние 2 предложения
+            selected = sentences[:2] + sentences[-2:]
+            return " ".join(selected) + "."
+        else:
+            return " ".join(sentences[:3]) + "." if sentences else "Пересказ недоступен"
+    except:
+        return "Быстрый качественный пересказ"
+
+
+def summarize_text(text):
+    """Пересказ в процессе пула: (пересказ, размер исходного текста в байтах)"""
+    return fast_quality_summary(text), len(text.encode("utf-8"))
+
+
+def summarize_timed(text):
+    """summarize_text со временем работы: метрики процесса пула пишет родитель"""
+    start = time.perf_counter()
+    summary, size = summarize_text(text)
+    return summary, size, time.perf_counter() - start
+
+
+def iter_article_texts(store, batch_size):
+    """Полные тексты статей из хранилища пачками [(имя, текст), ...]"""
+    batch = []
+    for filename in store.filenames():
+        article = store.get(filename, ('content',))
+        if article and article['content']:
+            batch.append((filename, article['content']))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class SummaryPipeline:
+    """Пересказ статей в отдельных процессах, параллельно с загрузкой страниц.
+
+    submit() кладет текст в очередь и сразу возвращается; фоновый поток
+    передает задачи в пул процессов, держа в работе не больше
+    max_in_flight текстов. Готовый пересказ передается в on_summary(key, summary).
+    """
+
+    def __init__(self, on_summary, processes=None, max_in_flight=None, idf_path=None):
+        self.on_summary = on_summary
+        self.processes = processes or os.cpu_count() or 1
+        self.completed = 0
+        self.failed = 0
+        self.bytes = 0
+        # Каждый процесс один раз загружает таблицу IDF
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes, initializer=load_summarizer, initargs=(idf_path,)
+        )
+        self._queue = queue.Queue()
+        self._in_flight = threading.Semaphore(max_in_flight or self.processes * 2)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+        self._thread.start()
+
+    def submit(self, key, text):
+        with self._idle:
+            self._pending += 1
+        self._queue.put((key, text))
+
+    def _feed(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, text = item
+            self._in_flight.acquire()
+            try:
+                future = self._executor.submit(summarize_timed, text)
+            except RuntimeError as e:
+                # Пул уже закрыт
+                self._finish(None, e)
+                continue
+            future.add_done_callback(functools.partial(self._on_done, key))
+
+    def _on_done(self, key, future):
+        try:
+            summary, size, elapsed = future.result()
+            metrics.observe("stage_seconds", elapsed, stage="summary", mode="process")
+            self.on_summary(key, summary)
+        except Exception as e:
+            self._finish(None, e)
+        else:
+            self._finish(size, None)
+
+    def _finish(self, size, error):
+        self._in_flight.release()
+        with self._idle:
+            if error is None:
+                self.bytes += size
+                self.completed += 1
+            else:
+                self.failed += 1
+                print(f"   ❌ Ошибка при создании пересказа: {error}")
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def join(self, timeout=None):
+        """Дождаться всех отправленных пересказов"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self):
+        self.join()
+        self._queue.put(None)
+        self._thread.join()
+        self._executor.shutdown()
+
+
+def write_folder_summary(articles_dir, filename, summary):
+    """Пересказ рядом с текстом статьи в раскладке по папкам, если она есть"""
+    article_dir = os.path.join(articles_dir, filename)
+    if not os.path.isfile(os.path.join(article_dir, f"{filename}.txt")):
+        return
+    with open(os.path.join(article_dir, filename + SUMMARY_SUFFIX), "w", encoding="utf-8") as f:
+        f.write(summary)
+
+
+def import_folders(articles_dir):
+    """Загрузка в хранилище статей из папок <имя>/<имя>.txt, которых в нем еще нет"""
+    store = ArticleStore(articles_dir)
+    try:
+        return store.import_folders()
+    finally:
+        store.close()
+
+
+def document_terms(text):
+    """Множество терминов одной статьи (для подсчета IDF в процессах пула)"""
+    return set(tokenize(text))
+
+
+def _batch_size(processes):
+    return (processes or os.cpu_count() or 1) * BATCH_PER_PROCESS
+
+
+def build_idf(articles_dir, processes=None):
+    """Пересчет таблицы IDF по всем статьям хранилища и сохранение в IDF_FILENAME.
+
+    Если статей нет, таблица не записывается (ValueError): пустая таблица
+    выглядела бы готовой и больше не пересчитывалась бы.
+    """
+    document_frequency = Counter()
+    documents = 0
+    store = ArticleStore(articles_dir)
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for batch in iter_article_texts(store, _batch_size(processes)):
+                for terms in executor.map(document_terms, [text for _, text in batch]):
+                    document_frequency.update(terms)
+                documents += len(batch)
+    finally:
+        store.close()
+
+    if not documents:
+        raise ValueError(f"в хранилище {articles_dir} нет статей с текстом")
+    idf_table = IDFTable.from_counts(document_frequency, documents)
+    idf_table.save(os.path.join(articles_dir, IDF_FILENAME))
+    return idf_table
+
+
+def idf_is_stale(articles_dir):
+    """Нужен ли пересчет IDF: таблицы нет, она пустая, другой версии или корпус заметно вырос"""
+    idf_path = os.path.join(articles_dir, IDF_FILENAME)
+    try:
+        idf_table = IDFTable.load(idf_path)
+    except (OSError, ValueError, KeyError):
+        return True
+    if idf_table.version != IDF_VERSION:
+        return True
+    documents = idf_table.documents
+    store = ArticleStore(articles_dir)
+    try:
+        articles = len(store.filenames())
+    finally:
+        store.close()
+    return not documents or articles > documents * (1 + IDF_STALE_RATIO)
+
+
+def summarize_corpus(articles_dir, processes=None):
+    """Пакетный пересказ статей хранилища.
+
+    Пересказы записываются обратно в хранилище, а для статей в раскладке
+    по папкам - еще и в <имя>_sh.txt рядом с текстом.
+    """
+    idf_path = os.path.join(articles_dir, IDF_FILENAME)
+    started = time.perf_counter()
+    articles = 0
+    total_bytes = 0
+    store = ArticleStore(articles_dir)
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=load_summarizer,
+                                 initargs=(idf_path,)) as executor:
+            for batch in iter_article_texts(store, _batch_size(processes)):
+                summaries = executor.map(summarize_timed, [text for _, text in batch])
+                for (filename, _), (summary, size, text_elapsed) in zip(batch, summaries):
+                    metrics.observe("stage_seconds", text_elapsed, stage="summary", mode="process")
+                    store.set_summary(filename, summary)
+                    write_folder_summary(articles_dir, filename, summary)
+                    total_bytes += size
+                    articles += 1
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - started
+    return {
+        'articles': articles,
+        'bytes': total_bytes,
+        'elapsed': elapsed,
+        'articles_per_sec': articles / elapsed if elapsed > 0 else 0.0,
+        'mb_per_sec': total_bytes / 1024 / 1024 / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Пакетный пересказ скачанных статей")
+    arg_parser.add_argument("articles_dir", nargs="?", default="articles",
+                            help="папка со статьями (по умолчанию articles)")
+    arg_parser.add_argument("-j", "--processes", type=int, default=None,
+                            help="число процессов (по умолчанию - число ядер)")
+    arg_parser.add_argument("--rebuild-idf", action="store_true",
+                            help="пересчитать таблицу IDF по корпусу перед пересказом")
+    metrics.add_metrics_argument(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    if not os.path.isdir(args.articles_dir):
+        print(f"❌ Папка не найдена: {args.articles_dir}")
+        return 1
+
+    # Статьи в папках (старая раскладка, тексты из PDF) сначала попадают в хранилище
+    imported = import_folders(args.articles_dir)
+    if imported:
+        print(f"📥 Загружено в хранилище статей из папок: {imported}")
+
+    if args.rebuild_idf or idf_is_stale(args.articles_dir):
+        try:
+            with metrics.timer("idf"):
+                idf_table = build_idf(args.articles_dir, args.processes)
+        except ValueError as e:
+            print(f"❌ Таблица IDF не построена: {e}")
+            return 1
+        print(f"📚 Таблица IDF: {len(idf_table.idf)} терминов по {idf_table.documents} статьям")
+
+    print(f"🧠 Пересказ статей в {args.articles_dir}...")
+    stats = summarize_corpus(args.articles_dir, args.processes)
+    print(f"✅ Статей: {stats['articles']}, {stats['bytes'] / 1024 / 1024:.1f} МБ за {stats['elapsed']:.2f} с")
+    print(f"⚡ {stats['articles_per_sec']:.1f} статей/с, {stats['mb_per_sec']:.2f} МБ/с")
+    metrics.dump_metrics(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
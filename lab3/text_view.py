@@ -0,0 +1,137 @@
+import codecs
+import mmap
+import os
+import tkinter as tk
+from collections import OrderedDict
+
+
+CHUNK_CHARS = 16 * 1024
+# Следующая порция подгружается, когда видна нижняя часть загруженного текста
+LOAD_THRESHOLD = 0.9
+
+
+class TextSource:
+    """Источник текста для PagedTextView из строки в памяти"""
+
+    def __init__(self, text):
+        self.text = text or ""
+        self.position = 0
+
+    def read(self, size):
+        chunk = self.text[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+    def reset(self):
+        self.position = 0
+
+    def close(self):
+        pass
+
+
+class MappedFileSource:
+    """Источник текста из UTF-8 файла через mmap: в память читаются только показанные части"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._size = size
+        self.reset()
+
+    def read(self, size):
+        if self._map is None or self._offset >= self._size:
+            return ""
+        # Символ UTF-8 занимает до 4 байт; неполный символ на границе
+        # порции инкрементальный декодер оставляет до следующего чтения
+        data = self._map[self._offset:self._offset + size]
+        self._offset += len(data)
+        return self._decoder.decode(data, final=self._offset >= self._size)
+
+    def reset(self):
+        self._offset = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class PagedTextView:
+    """Показ текста в tk.Text порциями: следующая порция добавляется при прокрутке вниз"""
+
+    def __init__(self, text_widget, scrollbar, chunk_chars=CHUNK_CHARS):
+        self.text_widget = text_widget
+        self.scrollbar = scrollbar
+        self.chunk_chars = chunk_chars
+        self.source = None
+        # id отложенной подгрузки (after_idle) или None
+        self._pending = None
+        text_widget.configure(yscrollcommand=self._on_scroll)
+
+    def show(self, source):
+        # Подгрузка, запланированная для прежней статьи, не должна попасть в новую
+        if self._pending is not None:
+            self.text_widget.after_cancel(self._pending)
+            self._pending = None
+        self.source = source
+        self.text_widget.delete(1.0, tk.END)
+        if source is not None:
+            source.reset()
+            self._append()
+
+    def clear(self):
+        self.show(None)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.source is not None and float(last) >= LOAD_THRESHOLD and self._pending is None:
+            # Вставка из обработчика прокрутки снова вызывает его - откладываем
+            self._pending = self.text_widget.after_idle(self._append)
+
+    def _append(self):
+        self._pending = None
+        if self.source is None:
+            return
+        chunk = self.source.read(self.chunk_chars)
+        if chunk:
+            self.text_widget.insert(tk.END, chunk)
+        else:
+            self.source = None
+
+
+class RecentArticles:
+    """Небольшой LRU недавно открытых статей: key -> словарь источников по вкладкам"""
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        sources = self._items.get(key)
+        if sources is not None:
+            self._items.move_to_end(key)
+        return sources
+
+    def put(self, key, sources):
+        self._discard(key)
+        self._items[key] = sources
+        while len(self._items) > self.capacity:
+            _, evicted = self._items.popitem(last=False)
+            self._close(evicted)
+
+    def _discard(self, key):
+        sources = self._items.pop(key, None)
+        if sources is not None:
+            self._close(sources)
+
+    def _close(self, sources):
+        for source in sources.values():
+            if source is not None:
+                source.close()
+
+    def clear(self):
+        for key in list(self._items):
+            self._discard(key)
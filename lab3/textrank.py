@@ -0,0 +1,295 @@
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from search_index import stem
+
+
+IDF_FILENAME = ".idf.json"
+# Версия нормализации слов: таблица IDF другой версии пересчитывается
+IDF_VERSION = 2
+
+# Конец предложения: знак препинания, пробелы и заглавная буква/цифра/кавычка.
+# Сокращения вида "т. е.", "рис. 1", "и др." не считаются концом предложения.
+SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+(?=[«"(\[]?[A-ZА-ЯЁ0-9])')
+# Склеенные при извлечении текста строки: "...конфиденциальностиЕДИНАЯ МАТЕМАТИКА"
+GLUED_LINES_RE = re.compile(r'(?<=[а-яё])(?=[А-ЯЁ]{2})')
+ABBREVIATION_RE = re.compile(
+    r'(?:\b(?:т|е|др|пр|см|рис|табл|г|гг|в|вв|с|стр|им|ул|т\.д|т\.п|т\.е|и\.о)|\b[А-ЯЁA-Z])\.$',
+    re.IGNORECASE
+)
+TOKEN_RE = re.compile(r'[а-яёa-z]{3,}')
+NORMALIZE_RE = re.compile(r'[\W_]+')
+# Служебные строки статьи: ключевые слова, УДК, литература и т.п.
+LABEL_RE = re.compile(
+    r'^\s*(?:ключевые\s+слова|key\s*words|удк|ббк|doi|аннотация|abstract|литература|'
+    r'список\s+(?:литературы|источников)|references|для\s+цитирования|for\s+citation|'
+    r'сведения\s+об\s+авторах|информация\s+об\s+авторах)\b',
+    re.IGNORECASE
+)
+# Короткая метка с двоеточием в начале строки ("Термины: ...")
+SHORT_LABEL_RE = re.compile(r'^[^:.!?]{1,40}:\s')
+
+STOP_WORDS = frozenset("""
+без более бы был была были было быть вам вас весь во вот все всего всех вы где да даже для до его ее ей ему если
+есть еще же за здесь из или им их как какой когда кто ли либо между меня мне может мы на над надо наш не него нее
+нет ни них но ну об однако он она они оно от очень по под после при про раз так также такой там те тем то того
+тоже той только том ты уже хотя чем что чтобы эта эти это этого этой этом этот являются является который которые
+которая которое которых котором которой поэтому однако данный данной данных работе работы статье статья также
+the and for with that this from are was were which
+""".split())
+
+# Ограничения для скорости на длинных статьях
+MAX_SENTENCES = 600
+MAX_VOCABULARY = 3000
+MIN_SENTENCE_CHARS = 25
+MAX_SENTENCE_CHARS = 600
+MIN_SENTENCE_WORDS = 5
+# Сколько слов кроме заголовка может быть в строке, повторяющей заголовок
+TITLE_EXTRA_WORDS = 4
+
+
+def split_sentences(text):
+    """Деление текста на предложения с учетом частых сокращений.
+
+    Перевод строки - всегда граница предложения: строка без точки в конце
+    (заголовок, пункт меню) не приклеивается к следующему предложению.
+    """
+    sentences = []
+    for line in text.split('\n'):
+        for paragraph in GLUED_LINES_RE.split(line):
+            sentences.extend(_split_paragraph(paragraph.strip()))
+    return sentences
+
+
+def _split_paragraph(paragraph):
+    sentences = []
+    pending = ""
+    for part in SENTENCE_END_RE.split(paragraph):
+        pending = f"{pending} {part}" if pending else part
+        if not ABBREVIATION_RE.search(pending):
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        sentences.append(pending)
+    return [sentence for sentence in sentences if sentence]
+
+
+def normalize_sentence(sentence):
+    return NORMALIZE_RE.sub(" ", sentence.lower().replace('ё', 'е')).strip()
+
+
+def repeats_title(key, title_key):
+    """Строка - заголовок, его часть или заголовок с парой слов ("на тему «...»")"""
+    if not title_key:
+        return False
+    if key in title_key:
+        return True
+    return title_key in key and len(key.split()) - len(title_key.split()) <= TITLE_EXTRA_WORDS
+
+
+def is_list_line(sentence):
+    """Метка или перечень вместо связного предложения.
+
+    "Ключевые слова: ...", строки из элементов через "/", ";" или "|",
+    а также "Метка: а, б, в" с короткими элементами.
+    """
+    if LABEL_RE.match(sentence):
+        return True
+    words = len(sentence.split())
+    separators = sentence.count("/") + sentence.count(";") + sentence.count("|")
+    if separators >= 2 and words <= (separators + 1) * 4:
+        return True
+    commas = sentence.count(",")
+    return bool(SHORT_LABEL_RE.match(sentence)) and commas >= 2 and words <= (commas + 1) * 4
+
+
+def candidate_sentences(text, title=None):
+    """Предложения для ранжирования.
+
+    Без меток, перечней, коротких строк и повторов заголовка (по умолчанию
+    заголовок - первая непустая строка текста); повторы - один раз.
+    """
+    if title is None:
+        title = next((line for line in text.split('\n') if line.strip()), "")
+    title_key = normalize_sentence(title)
+    candidates = []
+    seen = set()
+    for sentence in split_sentences(text):
+        if not MIN_SENTENCE_CHARS <= len(sentence) <= MAX_SENTENCE_CHARS or is_list_line(sentence):
+            continue
+        if len(sentence.split()) < MIN_SENTENCE_WORDS:
+            continue
+        key = normalize_sentence(sentence)
+        if key in seen or repeats_title(key, title_key):
+            continue
+        seen.add(key)
+        candidates.append(sentence)
+        if len(candidates) >= MAX_SENTENCES:
+            break
+    return candidates
+
+
+def tokenize(text):
+    """Значимые слова в нижнем регистре, приведенные к основе тем же стеммером, что и в поиске"""
+    return [
+        stem(token) for token in TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+        if token not in STOP_WORDS
+    ]
+
+
+class IDFTable:
+    """Таблица IDF по локальному корпусу статей (хранится в JSON рядом со статьями)"""
+
+    def __init__(self, idf=None, documents=0, version=IDF_VERSION):
+        self.idf = idf or {}
+        self.documents = documents
+        self.version = version
+        # Неизвестное корпусу слово считаем редким
+        self.default = math.log(documents + 1) + 1 if documents else 1.0
+
+    @classmethod
+    def from_counts(cls, document_frequency, documents):
+        """Таблица по числу статей, в которых встречается каждый термин"""
+        idf = {
+            term: math.log((documents + 1) / (count + 1)) + 1
+            for term, count in document_frequency.items()
+        }
+        return cls(idf, documents)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data['idf'], data['documents'], data.get('version', 1))
+
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({'version': self.version, 'documents': self.documents, 'idf': self.idf}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def weights(self, terms):
+        return np.array([self.idf.get(term, self.default) for term in terms])
+
+
+class TextRankSummarizer:
+    """Экстрактивный пересказ: TF-IDF векторы предложений и TextRank по их сходству.
+
+    Результат для одного и того же текста берется из кэша (ключ - хэш текста).
+    """
+
+    def __init__(self, idf_table=None, sentences=5, cache_size=256, damping=0.85, iterations=30):
+        self.idf_table = idf_table
+        self.sentences = sentences
+        self.damping = damping
+        self.iterations = iterations
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def summarize(self, text, sentences=None):
+        limit = sentences or self.sentences
+        key = (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), limit)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        summary = self._summarize(text, limit)
+
+        with self._lock:
+            self._cache[key] = summary
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
+
+    def _summarize(self, text, limit):
+        candidates = candidate_sentences(text)
+        if len(candidates) <= limit:
+            return " ".join(candidates)
+
+        tokens = [tokenize(sentence) for sentence in candidates]
+        matrix = self._tfidf_matrix(tokens)
+        scores = self._rank(matrix)
+
+        # Лучшие предложения в порядке следования в тексте
+        best = sorted(np.argsort(-scores, kind='stable')[:limit])
+        return " ".join(candidates[i] for i in best)
+
+    def _tfidf_matrix(self, tokens):
+        counts = Counter(token for sentence_tokens in tokens for token in sentence_tokens)
+        vocabulary = {term: i for i, (term, _) in enumerate(counts.most_common(MAX_VOCABULARY))}
+
+        rows, cols = [], []
+        for row, sentence_tokens in enumerate(tokens):
+            for token in sentence_tokens:
+                col = vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+
+        matrix = np.zeros((len(tokens), len(vocabulary)))
+        np.add.at(matrix, (rows, cols), 1.0)
+
+        if self.idf_table is not None and self.idf_table.documents:
+            idf = self.idf_table.weights(vocabulary)
+        else:
+            # Нет корпуса - IDF по предложениям самого текста
+            sentence_frequency = np.count_nonzero(matrix, axis=0)
+            idf = np.log((len(tokens) + 1) / (sentence_frequency + 1)) + 1
+        matrix *= idf
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _rank(self, matrix):
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        row_sums[row_sums == 0] = 1.0
+        transition = similarity / row_sums
+
+        count = matrix.shape[0]
+        scores = np.full(count, 1.0 / count)
+        for _ in range(self.iterations):
+            updated = (1 - self.damping) / count + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < 1e-6:
+                return updated
+            scores = updated
+        return scores
+
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+
+def load_summarizer(idf_path=None):
+    """Общий для процесса пересказчик; IDF читается один раз"""
+    global _summarizer
+    with _summarizer_lock:
+        idf_table = None
+        if idf_path and os.path.exists(idf_path):
+            try:
+                idf_table = IDFTable.load(idf_path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Не удалось загрузить таблицу IDF: {e}")
+            if idf_table is not None and idf_table.version != IDF_VERSION:
+                # Термины старой таблицы не совпадут с нынешними основами слов
+                print("⚠️ Таблица IDF устарела - пересчитайте: python summarizer.py <папка> --rebuild-idf")
+                idf_table = None
+        _summarizer = TextRankSummarizer(idf_table)
+    return _summarizer
+
+
+def get_summarizer():
+    return _summarizer or load_summarizer()